@@ -21,17 +21,19 @@ from variantplaner import Vcf, VcfParsingBehavior
 DATA_DIR = pathlib.Path(__file__).parent.parent / "tests" / "data"
 
 
-def __worker(input_path: pathlib.Path) -> polars.LazyFrame:
+def __worker(input_path: pathlib.Path, *, native: bool = True) -> polars.LazyFrame:
     """Benchmark worker."""
     vcf_df = Vcf()
 
-    vcf_df.from_path(input_path, DATA_DIR / "grch38.92.csv", behavior=VcfParsingBehavior.MANAGE_SV)
+    vcf_df.from_path(input_path, DATA_DIR / "grch38.92.csv", behavior=VcfParsingBehavior.MANAGE_SV, native=native)
 
     return vcf_df.variants()
 
 
 def __generate_parse_vcf(
     number_of_line: int,
+    *,
+    native: bool = True,
 ) -> typing.Callable[[pathlib.Path, pytest_benchmark.BenchmarkSession], None]:
     @pytest.mark.benchmark(group="vcf_parsing")
     def inner(
@@ -44,10 +46,11 @@ def __generate_parse_vcf(
         __generate_vcf(input_path, number_of_line)
 
         benchmark(
-            lambda: __worker(input_path).collect(),
+            lambda: __worker(input_path, native=native).collect(),
         )
 
-    inner.__doc__ = f"""Parsing a vcf of {number_of_line} variant"""
+    reader = "native reader" if native else "scan_csv"
+    inner.__doc__ = f"""Parsing a vcf of {number_of_line} variant with {reader}"""
 
     return inner
 
@@ -55,3 +58,4 @@ def __generate_parse_vcf(
 for i in range(5, 15):
     number_of_line = 2**i
     globals()[f"parse_vcf_{number_of_line}"] = __generate_parse_vcf(number_of_line)
+    globals()[f"parse_vcf_scan_csv_{number_of_line}"] = __generate_parse_vcf(number_of_line, native=False)
@@ -12,6 +12,7 @@ import pathlib
 
 # 3rd party import
 import click
+import polars
 
 # project import
 from variantplaner import cli
@@ -95,6 +96,50 @@ def variants(
     vp_struct.variants.merge(input_paths, output_prefix, chunk_size, polars_threads, append=append)
 
 
+@struct.command("collisions")
+@click.pass_context
+@click.option(
+    "-o",
+    "--output-path",
+    help="Path where alleles of colliding variant id will be written.",
+    type=click.Path(writable=True, path_type=pathlib.Path),
+    required=True,
+)
+@click.option(
+    "-c",
+    "--counters-path",
+    help="Path where number of packed and hashed variant id of each input will be written.",
+    type=click.Path(writable=True, path_type=pathlib.Path),
+)
+def collisions(
+    ctx: click.Context,
+    output_path: pathlib.Path,
+    counters_path: pathlib.Path | None,
+) -> None:
+    """Find variant id shared by many alleles in variants files."""
+    logger = logging.getLogger("struct.collisions")
+
+    ctx.ensure_object(dict)
+
+    input_paths = ctx.obj["input_paths"]
+
+    logger.debug(f"parameter: {output_path=} {counters_path=}")
+
+    alleles = vp_struct.variants.collisions(input_paths).collect(streaming=True)
+    alleles.write_parquet(output_path)
+
+    counters = vp_struct.variants.id_counters(input_paths)
+    if counters_path is not None:
+        counters.write_parquet(counters_path)
+
+    ids = alleles.get_column("id").n_unique()
+    hashed = alleles.filter(polars.col("hashed")).get_column("id").n_unique()
+    logger.info(
+        f"{counters.get_column('packed').sum()} packed and {counters.get_column('hashed').sum()} hashed variant id, "
+        f"{ids} id collide ({ids - hashed} packed, {hashed} hashed)"
+    )
+
+
 @struct.command("genotypes")
 @click.pass_context
 @click.option(
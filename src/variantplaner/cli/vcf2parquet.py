@@ -3,9 +3,13 @@
 # std import
 from __future__ import annotations
 
+import concurrent.futures
+import glob
 import logging
+import os
 import pathlib
 import sys
+import typing
 
 # 3rd party import
 import click
@@ -13,24 +17,62 @@ import polars
 
 # project import
 from variantplaner import Vcf, VcfParsingBehavior, cli, exception
+from variantplaner.io import parquet
+from variantplaner.io.cache import ConversionCache, options_digest
+from variantplaner.io.vcf import parse_region, read_regions_file
+from variantplaner.objects.vcf import INFO_STRUCT_COLUMN
+
+# type checking block
+if typing.TYPE_CHECKING:  # pragma: no cover
+    Plan = tuple[polars.LazyFrame, dict[str, str]]
 
 logger = logging.getLogger("__name__")
 
 
+def __parse_regions(
+    _ctx: click.Context,
+    _param: click.Parameter,
+    value: tuple[str, ...],
+) -> list[tuple[str, int, int]]:
+    """Convert region parameter in list of chromosome, start, end."""
+    try:
+        return [parse_region(region) for region in value]
+    except ValueError as e:
+        raise click.BadParameter(str(e)) from e
+
+
+def __expand_inputs(
+    _ctx: click.Context,
+    _param: click.Parameter,
+    value: tuple[str, ...],
+) -> list[pathlib.Path]:
+    """Expand glob pattern of input parameter, path without glob pattern must exist."""
+    inputs: list[pathlib.Path] = []
+    for pattern in value:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise click.BadParameter(f"pattern {pattern} match no file")
+            inputs.extend(pathlib.Path(match) for match in matches)
+        elif pattern == "-" or (pathlib.Path(pattern).exists() and not pathlib.Path(pattern).is_dir()):
+            inputs.append(pathlib.Path(pattern))
+        else:
+            raise click.BadParameter(f"file {pattern} does not exist")
+
+    return inputs
+
+
 @cli.main.group("vcf2parquet", chain=True)  # type: ignore[has-type]
 @click.pass_context
 @click.option(
     "-i",
     "--input-path",
-    help="Path to vcf input file.",
-    type=click.Path(
-        exists=True,
-        dir_okay=False,
-        readable=True,
-        allow_dash=True,
-        path_type=pathlib.Path,
-    ),
+    "input_paths",
+    help="Path to vcf or bcf input file, could be gzip or bgzip compressed, - or a FIFO are read as a stream. Could be repeated or a glob pattern, with many inputs output paths are template where {name} is replaced by input file name without vcf extension.",
+    type=str,
+    multiple=True,
     required=True,
+    callback=__expand_inputs,
 )
 @click.option(
     "-c",
@@ -52,44 +94,396 @@ logger = logging.getLogger("__name__")
     type=bool,
     is_flag=False,
 )
+@click.option(
+    "-m",
+    "--split-multiallelic",
+    help="Split multi-allelic records in biallelic records, Number=A/R/G fields and GT are re-indexed.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "-g",
+    "--gvcf",
+    help="Input is a gVCF, reference blocks are dropped and <NON_REF> or <*> allele are removed, blocks are available for coverage subcommand.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "--wide-id",
+    help="Compute a 128 bits variant id, a struct of two UInt64 hi and lo, variants with longer alleles keep a packed id.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "-f",
+    "--reference-path",
+    help="Trim and left align variants against this reference fasta, index must be present at same path with .fai extension.",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=pathlib.Path),
+)
+@click.option(
+    "-r",
+    "--region",
+    "regions",
+    help="Only read variants overlapping region chr, chr:start or chr:start-end (1-based, inclusive), could be repeated.",
+    type=str,
+    multiple=True,
+    callback=__parse_regions,
+)
+@click.option(
+    "-R",
+    "--regions-file",
+    help="Only read variants overlapping regions of a bed file.",
+    type=click.Path(exists=True, dir_okay=False, readable=True, path_type=pathlib.Path),
+)
+@click.option(
+    "-q",
+    "--quarantine-path",
+    help="Malformed records didn't stop conversion, they are written in this file with line number and reason. With many inputs, path must contains {name}.",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+)
+@click.option(
+    "--cache-path",
+    help="Json file where fingerprint of converted inputs are stored, input unchanged since last conversion with same options and outputs that still exist are skipped.",
+    type=click.Path(dir_okay=False, writable=True, path_type=pathlib.Path),
+)
+@click.option(
+    "--content-hash",
+    help="Cache fingerprint include a hash of all input content, modification time is ignored.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "--force",
+    help="Convert inputs even if cache said they are unchanged, cache is updated.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "-j",
+    "--jobs",
+    help="Number of vcf converted in parallel with many inputs, threads are shared between jobs.",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+)
 def vcf2parquet(
     ctx: click.Context,
-    input_path: pathlib.Path,
+    input_paths: list[pathlib.Path],
     chrom2length_path: pathlib.Path | None,
+    regions: list[tuple[str, int, int]],
+    regions_file: pathlib.Path | None,
     *,
+    reference_path: pathlib.Path | None = None,
+    quarantine_path: pathlib.Path | None = None,
+    cache_path: pathlib.Path | None = None,
+    content_hash: bool = False,
+    force: bool = False,
+    jobs: int = 1,
     append: bool,
     keep_star: bool,
+    split_multiallelic: bool = False,
+    gvcf: bool = False,
+    wide_id: bool = False,
 ) -> None:
-    """Convert a vcf in parquet."""
+    """Convert a vcf in parquet.
+
+    If input is a bgzip vcf with a tabix or csi index, only blocks overlapping regions are read.
+
+    If quarantine path is set, malformed records are skipped and written in it, number of quarantined records is reported at end of conversion.
+
+    With many inputs, subcommands are apply on each vcf by a pool of jobs, contigs length and header parsing are shared between them.
+
+    If cache path is set, inputs with same size, modification time and header than at last conversion are skipped if options are the same and outputs still exist, number of hits and misses is reported.
+    """
     logger = logging.getLogger("vcf2parquet")
 
-    logger.debug(f"parameter: {input_path=} {chrom2length_path=} {append=} {keep_star=}")
+    logger.debug(
+        f"parameter: {input_paths=} {chrom2length_path=} {append=} {keep_star=} {regions=} {regions_file=} {jobs=} {split_multiallelic=} {reference_path=} {gvcf=} {wide_id=} {quarantine_path=} {cache_path=} {content_hash=} {force=}",
+    )
+
+    if regions_file is not None:
+        regions = [*regions, *read_regions_file(regions_file)]
+
+    beahvior = VcfParsingBehavior.MANAGE_SV
+    if keep_star:
+        beahvior |= VcfParsingBehavior.KEEP_STAR
+    if split_multiallelic:
+        beahvior |= VcfParsingBehavior.SPLIT_MULTIALLELIC
+    if gvcf:
+        beahvior |= VcfParsingBehavior.GVCF
+    if wide_id:
+        beahvior |= VcfParsingBehavior.WIDE_ID
+
+    read_args = {
+        "chrom2length_path": chrom2length_path,
+        "behavior": beahvior,
+        "regions": regions if regions else None,
+        "reference_path": reference_path,
+        "quarantine_path": quarantine_path,
+    }
+
+    ctx.obj["append"] = append
+    ctx.obj["tasks"] = []
+    ctx.obj["cache"] = (
+        None if cache_path is None else ConversionCache(cache_path, content_hash=content_hash, force=force)
+    )
+
+    if len(input_paths) > 1:
+        if quarantine_path is not None and "{name}" not in str(quarantine_path):
+            logging.error(f"With many inputs quarantine path {quarantine_path} must contains {{name}}.")
+            sys.exit(15)
+        ctx.obj["batch"] = {"inputs": input_paths, "jobs": jobs, "read_args": read_args}
+        return
+
+    ctx.obj["vcf_path"] = input_paths[0]
+    ctx.obj["read_args"] = read_args
+
 
+@vcf2parquet.result_callback()
+@click.pass_context
+def run_tasks(ctx: click.Context, _results: list[typing.Any], **_kwargs: typing.Any) -> None:
+    """Apply subcommands on input, or on each input in batch mode."""
+    logger = logging.getLogger("vcf2parquet.batch")
+
+    if "batch" not in ctx.obj:
+        input_path = ctx.obj["vcf_path"]
+        try:
+            __convert(
+                input_path,
+                ctx.obj["read_args"],
+                ctx.obj["tasks"],
+                threads=ctx.obj["threads"],
+                append=ctx.obj["append"],
+                cache=ctx.obj["cache"],
+            )
+        except exception.NotVcfHeaderError:
+            logging.error(f"Path {input_path} seems not contains Vcf.")  # noqa: TRY400  we are in cli exception isn't readable
+            sys.exit(11)
+        except exception.NotAVCFError:
+            logging.error(f"Path {input_path} seems not contains Vcf.")  # noqa: TRY400  we are in cli exception isn't readable
+            sys.exit(12)
+        except exception.NoContigsLengthInformationError:
+            logging.exception(
+                "Vcf didn't contains contigs length information you could use chrom2length-path argument."
+            )
+            sys.exit(13)
+        except exception.NoGenotypeError:
+            logger.error("It's seems vcf not contains genotypes information.")  # noqa: TRY400  we are in cli exception isn't readable
+            sys.exit(12)
+
+        __save_cache(ctx.obj["cache"])
+        return
+
+    batch = ctx.obj["batch"]
+    jobs = min(batch["jobs"], len(batch["inputs"]))
+    threads = max(1, ctx.obj["threads"] // jobs)
+
+    logger.info(f"Start convert {len(batch['inputs'])} vcf with {jobs} jobs of {threads} threads")
+    failed = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(
+                __convert,
+                input_path,
+                batch["read_args"],
+                ctx.obj["tasks"],
+                threads=threads,
+                append=ctx.obj["append"],
+                cache=ctx.obj["cache"],
+            ): input_path
+            for input_path in batch["inputs"]
+        }
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except (
+                exception.NotVcfHeaderError,
+                exception.NotAVCFError,
+                exception.NoContigsLengthInformationError,
+                exception.NoGenotypeError,
+            ) as e:
+                logger.error(f"Conversion of {futures[future]} failed: {e}")  # noqa: TRY400  we are in cli exception isn't readable
+                failed += 1
+    logger.info(f"End convert {len(batch['inputs']) - failed} vcf")
+
+    __save_cache(ctx.obj["cache"])
+
+    if failed:
+        logger.error(f"{failed} vcf conversion failed")
+        sys.exit(14)
+
+
+def __read_vcf(
+    input_path: pathlib.Path,
+    chrom2length_path: pathlib.Path | None,
+    behavior: VcfParsingBehavior,
+    regions: list[tuple[str, int, int]] | None,
+    *,
+    reference_path: pathlib.Path | None,
+    quarantine_path: pathlib.Path | None,
+    threads: int,
+) -> Vcf:
+    """Read vcf with vcf2parquet parameter."""
     lf = Vcf()
+    lf.from_path(
+        input_path,
+        chrom2length_path,
+        behavior=behavior,
+        threads=threads,
+        regions=regions,
+        reference=reference_path,
+        quarantine=quarantine_path,
+    )
+
+    return lf
+
+
+def __input_name(input_path: pathlib.Path) -> str:
+    """Name of input file without vcf, bcf and compression extension."""
+    name = input_path.name
+    for suffix in (".gz", ".bgz", ".vcf", ".bcf"):
+        name = name.removesuffix(suffix)
+
+    return name
+
+
+def __convert(
+    input_path: pathlib.Path,
+    read_args: dict[str, typing.Any],
+    tasks: list[tuple[typing.Callable[..., typing.Any], pathlib.Path, dict[str, typing.Any]]],
+    *,
+    threads: int,
+    append: bool,
+    cache: ConversionCache | None = None,
+) -> None:
+    """Read one vcf and apply all subcommands on it, vcf isn't read if cache said it's unchanged."""
+    logger = logging.getLogger("vcf2parquet.batch")
+
+    name = __input_name(input_path)
+
+    read_args = dict(read_args)
+    if read_args["quarantine_path"] is not None:
+        read_args["quarantine_path"] = pathlib.Path(str(read_args["quarantine_path"]).replace("{name}", name))
+
+    tasks = [
+        (task, pathlib.Path(str(output_template).replace("{name}", name)), kwargs)
+        for (task, output_template, kwargs) in tasks
+    ]
+
+    options = options_digest(
+        {
+            "read_args": read_args,
+            "append": append,
+            "tasks": [(task.__name__, kwargs) for (task, _, kwargs) in tasks],
+        }
+    )
+    outputs = [output_path for (_, output_path, _) in tasks]
+    if cache is not None and cache.hit(input_path, options, outputs):
+        logger.info(f"Skip convert {input_path}, unchanged since last conversion")
+        return
+
+    logger.info(f"Start convert {input_path}")
+    lf = __read_vcf(input_path, threads=threads, **read_args)
+    obj = {
+        "vcf_path": input_path,
+        "quarantine_path": read_args["quarantine_path"],
+        "lazyframe": lf,
+        "append": append,
+        "headers": lf.header,
+    }
+
+    __run(obj, tasks)
+
+    if cache is not None:
+        cache.record(input_path, options, outputs)
+    logger.info(f"End convert {input_path}")
+
+
+def __save_cache(cache: ConversionCache | None) -> None:
+    """Report cache hits and misses and write cache."""
+    if cache is None:
+        return
+
+    logging.getLogger("vcf2parquet.cache").info(f"Cache {cache.path}: {cache.hits} hits, {cache.misses} misses")
+    cache.save()
+
+
+def __dispatch(
+    ctx: click.Context,
+    task: typing.Callable[..., Plan | None],
+    output_path: pathlib.Path,
+    **kwargs: typing.Any,
+) -> None:
+    """Register a task, tasks are run when all subcommands are parsed."""
+    if "batch" in ctx.obj and "{name}" not in str(output_path):
+        logging.error(f"With many inputs output path {output_path} must contains {{name}}.")
+        sys.exit(15)
 
-    # Read vcf and manage structural variant
-    logger.debug("Start read vcf")
+    ctx.obj["tasks"].append((task, output_path, kwargs))
+
+
+def __run(
+    obj: dict[str, typing.Any],
+    tasks: list[tuple[typing.Callable[..., Plan | None], pathlib.Path, dict[str, typing.Any]]],
+) -> None:
+    """Build plan of each task and write them, vcf is read and parsed once whatever the number of outputs.
+
+    A task return a lazyframe with parquet metadata to write in output path, or None if it write output itself. With many tasks parsed records are spooled in a temporary parquet file, see [Vcf.spool][variantplaner.objects.Vcf.spool]. Each plan is write with streaming engine, memory usage doesn't depend on number of outputs.
+    """
+    logger = logging.getLogger("vcf2parquet.run")
+
+    if len(tasks) > 1:
+        logger.info(f"Spool records of {obj['vcf_path']}")
+        obj["lazyframe"].spool()
+
+    for task, output_path, kwargs in tasks:
+        if (plan := task(obj, output_path, **kwargs)) is not None:
+            lf, metadata = plan
+            logger.info(f"Start write {output_path}")
+            __sink(lf, output_path)
+            __write_metadata(output_path, metadata)
+
+    __report_quarantine(obj)
+
+
+def __write_metadata(output_path: pathlib.Path, metadata: dict[str, str]) -> None:
+    """Write metadata of output if there are some."""
+    if metadata:
+        parquet.write_metadata(output_path, metadata)
+    logging.getLogger("vcf2parquet.run").info(f"End write {output_path}")
+
+
+def __report_quarantine(obj: dict[str, typing.Any]) -> None:
+    """Log number of malformed records written in quarantine file."""
+    logger = logging.getLogger("vcf2parquet.quarantine")
+
+    quarantine_path = obj.get("quarantine_path")
+    if quarantine_path is None or not quarantine_path.exists():
+        return
+
+    with open(quarantine_path, "rb") as fh:
+        rejected = sum(1 for _ in fh)
+
+    if rejected:
+        logger.warning(f"{rejected} malformed records of {obj['vcf_path']} written in {quarantine_path}")
+    else:
+        logger.info(f"No malformed records in {obj['vcf_path']}")
+
+
+def __sink(lf: polars.LazyFrame, output_path: pathlib.Path) -> None:
+    """Write lf in output_path with streaming engine if plan support it.
+
+    Data are written in a temporary file replaced atomically, in append mode lf read output_path while it's written.
+    """
+    tmp_path = output_path.with_name(f".{output_path.name}.{os.getpid()}")
     try:
-        beahvior = VcfParsingBehavior.MANAGE_SV
-        if keep_star:
-            beahvior |= VcfParsingBehavior.KEEP_STAR
-
-        lf.from_path(input_path, chrom2length_path, behavior=beahvior)
-    except exception.NotVcfHeaderError:
-        logging.error(f"Path {input_path} seems not contains Vcf.")  # noqa: TRY400  we are in cli exception isn't readable
-        sys.exit(11)
-    except exception.NotAVCFError:
-        logging.error(f"Path {input_path} seems not contains Vcf.")  # noqa: TRY400  we are in cli exception isn't readable
-        sys.exit(12)
-    except exception.NoContigsLengthInformationError:
-        logging.exception("Vcf didn't contains contigs length information you could use chrom2length-path argument.")
-        sys.exit(13)
-    logger.debug("End read vcf")
-
-    ctx.obj["vcf_path"] = input_path
-    ctx.obj["lazyframe"] = lf
-    ctx.obj["append"] = append
-    ctx.obj["headers"] = lf.header
+        try:
+            lf.sink_parquet(tmp_path, maintain_order=False)
+        except polars.exceptions.InvalidOperationError:
+            lf.collect(streaming=True).write_parquet(tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
 
 
 @vcf2parquet.command("variants")
@@ -108,22 +502,22 @@ def variants(
     """Write variants."""
     logger = logging.getLogger("vcf2parquet.variants")
 
-    lf = ctx.obj["lazyframe"]
-    append = ctx.obj["append"]
-
     logger.debug(f"parameter: {output_path=}")
 
-    logger.info(f"Start write variants in {output_path}")
+    __dispatch(ctx, __variants_plan, output_path)
+
+
+def __variants_plan(obj: dict[str, typing.Any], output_path: pathlib.Path) -> tuple[polars.LazyFrame, dict[str, str]]:
+    """Build plan of variants."""
+    lf = obj["lazyframe"]
+    append = obj["append"]
+
     variants = lf.variants()
 
     if append:
         variants = __append(output_path, variants)
 
-    try:
-        variants.sink_parquet(output_path, maintain_order=False)
-    except polars.exceptions.InvalidOperationError:
-        variants.collect(streaming=True).write_parquet(output_path)
-    logger.info(f"End write variants in {output_path}")
+    return (variants, {})
 
 
 @vcf2parquet.command("genotypes")
@@ -143,34 +537,132 @@ def variants(
     default="GT:AD:DP:GQ",
     show_default=True,
 )
+@click.option(
+    "-p",
+    "--per-record-format",
+    help="Resolve format-string keys in FORMAT of each record, line with another FORMAT are kept and missing keys are set to null.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "-b",
+    "--samples-batch-size",
+    help="Number of sample columns unpivot together, lower value reduce memory usage on vcf with many samples.",
+    type=click.IntRange(min=1),
+    default=512,
+    show_default=True,
+)
+@click.option(
+    "-C",
+    "--compact",
+    help="Store genotypes with a compact schema chosen from vcf header, gq, dp, ad and pl quantised on UInt8 or UInt16, other integer as Int32 and float as Float32, schema is record in a JSON sidecar file next to output.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "--gt-packed",
+    help="Keep GT without loss in gt_packed column, allele indexes, phase and ploidy packed in an integer.",
+    type=bool,
+    is_flag=True,
+)
+@click.option(
+    "--min-gq",
+    help="Drop calls with GQ lower than this value, GQ must be in format-string.",
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "--min-dp",
+    help="Drop calls with DP lower than this value, DP must be in format-string.",
+    type=click.IntRange(min=0),
+)
+@click.option(
+    "--min-ab",
+    help="Drop calls with allele balance (alternative AD over sum of AD) lower than this value, AD must be in format-string.",
+    type=click.FloatRange(min=0.0, max=1.0),
+)
+@click.option(
+    "--pass-only",
+    help="Keep only genotypes of records with FILTER equal to PASS.",
+    type=bool,
+    is_flag=True,
+)
 def genotypes(
     ctx: click.Context,
     output_path: pathlib.Path,
     format_string: str = "GT:AD:DP:GQ",
+    samples_batch_size: int = 512,
+    *,
+    per_record_format: bool = False,
+    compact: bool = False,
+    gt_packed: bool = False,
+    min_gq: int | None = None,
+    min_dp: int | None = None,
+    min_ab: float | None = None,
+    pass_only: bool = False,
 ) -> None:
     """Write genotypes."""
     logger = logging.getLogger("vcf2parquet.genotypes")
 
-    lf = ctx.obj["lazyframe"]
-    append = ctx.obj["append"]
-
-    logger.debug(f"parameter: {output_path=} {format_string=}")
-
-    try:
-        genotypes_data = lf.genotypes(format_string)
-    except exception.NoGenotypeError:
-        logger.error("It's seems vcf not contains genotypes information.")  # noqa: TRY400  we are in cli exception isn't readable
-        sys.exit(12)
+    logger.debug(
+        f"parameter: {output_path=} {format_string=} {samples_batch_size=} {per_record_format=} {compact=} {gt_packed=} {min_gq=} {min_dp=} {min_ab=} {pass_only=}"
+    )
+
+    keys = format_string.split(":")
+    for key, name, value in (("GQ", "--min-gq", min_gq), ("DP", "--min-dp", min_dp), ("AD", "--min-ab", min_ab)):
+        if value is not None and key not in keys:
+            raise click.BadParameter(f"require {key} in format-string", param_hint=name)
+
+    __dispatch(
+        ctx,
+        __genotypes_plan,
+        output_path,
+        format_string=format_string,
+        samples_batch_size=samples_batch_size,
+        per_record_format=per_record_format,
+        compact=compact,
+        gt_packed=gt_packed,
+        min_gq=min_gq,
+        min_dp=min_dp,
+        min_ab=min_ab,
+        pass_only=pass_only,
+    )
+
+
+def __genotypes_plan(
+    obj: dict[str, typing.Any],
+    output_path: pathlib.Path,
+    format_string: str,
+    samples_batch_size: int,
+    *,
+    per_record_format: bool,
+    compact: bool,
+    gt_packed: bool,
+    min_gq: int | None,
+    min_dp: int | None,
+    min_ab: float | None,
+    pass_only: bool,
+) -> Plan:
+    """Build plan of genotypes."""
+    lf = obj["lazyframe"]
+    append = obj["append"]
+
+    genotypes_data = lf.genotypes(
+        format_string,
+        samples_batch_size=samples_batch_size,
+        per_record_format=per_record_format,
+        compact=compact,
+        gt_packed=gt_packed,
+        min_gq=min_gq,
+        min_dp=min_dp,
+        min_ab=min_ab,
+        pass_only=pass_only,
+    )
 
     if append:
-        genotypes_data = __append(output_path, genotypes_data)
+        # compact schema only depends on header, appended data and output share it
+        genotypes_data.lf = __append(output_path, genotypes_data.lf)
 
-    logger.info(f"Start write genotypes in {output_path}")
-    try:
-        genotypes_data.lf.sink_parquet(output_path, maintain_order=False)
-    except polars.exceptions.InvalidOperationError:
-        genotypes_data.lf.collect(streaming=True).write_parquet(output_path)
-    logger.info(f"End write genotypes in {output_path}")
+    return (genotypes_data.lf, genotypes_data.metadata)
 
 
 @vcf2parquet.command("annotations")
@@ -204,15 +696,30 @@ def annotations_subcommand(
     """Write annotations."""
     logger = logging.getLogger("vcf2parquet.annotations")
 
-    lf = ctx.obj["lazyframe"]
-    append = ctx.obj["append"]
-    headers_obj = ctx.obj["headers"]
+    logger.debug(f"parameter: {output_path=} {info=} {rename_id=}")
 
-    logger.debug(f"parameter: {output_path=}")
+    __dispatch(ctx, __annotations_plan, output_path, info=info, rename_id=rename_id)
+
+
+def __annotations_plan(
+    obj: dict[str, typing.Any],
+    output_path: pathlib.Path,
+    info: set[str] | None,
+    rename_id: str | None,
+) -> tuple[polars.LazyFrame, dict[str, str]]:
+    """Build plan of annotations."""
+    logger = logging.getLogger("vcf2parquet.annotations")
+
+    lf = obj["lazyframe"]
+    append = obj["append"]
 
     logger.info("Start extract annotations")
-    annotations_data = lf.lf.with_columns(headers_obj.info_parser(info))
-    annotations_data = annotations_data.drop(["chr", "pos", "ref", "alt", "filter", "qual", "info"])
+    drop_columns = ["chr", "pos", "ref", "alt", "filter", "qual", "info", INFO_STRUCT_COLUMN]
+    info_struct = lf.info_struct(info)
+    if info_struct is None:
+        annotations_data = lf.lf.drop(drop_columns, strict=False)
+    else:
+        annotations_data = lf.lf.select(polars.exclude(drop_columns), info_struct).unnest("info")
 
     if rename_id:
         logger.info(f"Rename vcf variant id in {rename_id}")
@@ -222,12 +729,88 @@ def annotations_subcommand(
     if append:
         annotations_data = __append(output_path, annotations_data)
 
-    logger.info(f"Start write annotations in {output_path}")
-    try:
-        annotations_data.sink_parquet(output_path, maintain_order=False)
-    except polars.exceptions.InvalidOperationError:
-        annotations_data.collect(streaming=True).write_parquet(output_path)
-    logger.info(f"End write annotations in {output_path}")
+    return (annotations_data, {})
+
+
+@vcf2parquet.command("coverage")
+@click.pass_context
+@click.option(
+    "-o",
+    "--output-path",
+    help="Path where coverage intervals will be written.",
+    type=click.Path(writable=True, path_type=pathlib.Path),
+    required=True,
+)
+def coverage(
+    ctx: click.Context,
+    output_path: pathlib.Path,
+) -> None:
+    """Write coverage intervals of gVCF reference blocks, one row by block and by called sample, require --gvcf."""
+    logger = logging.getLogger("vcf2parquet.coverage")
+
+    logger.debug(f"parameter: {output_path=}")
+
+    __dispatch(ctx, __coverage_plan, output_path)
+
+
+def __coverage_plan(obj: dict[str, typing.Any], output_path: pathlib.Path) -> tuple[polars.LazyFrame, dict[str, str]]:
+    """Build plan of coverage intervals."""
+    lf = obj["lazyframe"]
+    append = obj["append"]
+
+    coverage_data = lf.coverage()
+
+    if append:
+        coverage_data = __append(output_path, coverage_data)
+
+    return (coverage_data, {})
+
+
+@vcf2parquet.command("stats")
+@click.pass_context
+@click.option(
+    "-o",
+    "--output-path",
+    help="Path where samples statistics will be written.",
+    type=click.Path(writable=True, path_type=pathlib.Path),
+    required=True,
+)
+@click.option(
+    "-b",
+    "--samples-batch-size",
+    help="Number of sample columns unpivot together, lower value reduce memory usage on vcf with many samples.",
+    type=click.IntRange(min=1),
+    default=512,
+    show_default=True,
+)
+def stats(
+    ctx: click.Context,
+    output_path: pathlib.Path,
+    samples_batch_size: int = 512,
+) -> None:
+    """Write quality control statistics of each sample: missingness, het/hom, SNV/indel, Ti/Tv, DP and GQ distribution."""
+    logger = logging.getLogger("vcf2parquet.stats")
+
+    logger.debug(f"parameter: {output_path=} {samples_batch_size=}")
+
+    __dispatch(ctx, __stats_plan, output_path, samples_batch_size=samples_batch_size)
+
+
+def __stats_plan(
+    obj: dict[str, typing.Any],
+    output_path: pathlib.Path,
+    samples_batch_size: int,
+) -> tuple[polars.LazyFrame, dict[str, str]]:
+    """Build plan of samples statistics."""
+    lf = obj["lazyframe"]
+    append = obj["append"]
+
+    stats_data = lf.stats(samples_batch_size=samples_batch_size)
+
+    if append:
+        stats_data = __append(output_path, stats_data)
+
+    return (stats_data, {})
 
 
 @vcf2parquet.command("headers")
@@ -246,13 +829,20 @@ def headers(
     """Write vcf headers."""
     logger = logging.getLogger("vcf2parquet.headers")
 
-    headers_obj = ctx.obj["headers"]
-
     logger.debug(f"parameter: {output_path=}")
 
+    __dispatch(ctx, __write_headers, output_path)
+
+
+def __write_headers(obj: dict[str, typing.Any], output_path: pathlib.Path) -> None:
+    """Write header of vcf."""
+    logger = logging.getLogger("vcf2parquet.headers")
+
+    headers_obj = obj["headers"]
+
     logger.info(f"Start write headers in {output_path}")
     with open(output_path, "w") as fh_out:
-        for line in headers_obj:
+        for line in headers_obj._header:
             print(line, file=fh_out)
     logger.info(f"End write headers in {output_path}")
 
@@ -52,6 +52,8 @@ def genotypes(
     lf: polars.LazyFrame,
     col2expr: dict[str, Callable[[polars.Expr, str], polars.Expr]],
     format_str: str = "GT:AD:DP:GQ",
+    *,
+    gt_packed: bool = False,
 ) -> polars.LazyFrame:
     """Extract genotypes information of raw [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html).
 
@@ -61,6 +63,7 @@ def genotypes(
         lf: The target [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html)
         col2expr: A dict associate column name and function to apply to create [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) column (produce by io.vcf.format2expr)
         format_str: Only variants match with this string format are considered
+        gt_packed: Keep GT without loss in gt_packed column
 
     Returns:
         A [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with variant id, sample information and genotypes information
@@ -96,7 +99,7 @@ def genotypes(
     # Split genotype column in sub value
     genotypes = genotypes.with_columns(
         [
-            polars.col("value").list.get(index).pipe(function=col2expr[col], name=col)  # type: ignore # noqa: PGH003
+            polars.col("value").list.get(index).pipe(function=col2expr[col], col_name=col)  # type: ignore # noqa: PGH003
             for col, index in col_index.items()
         ],
     )
@@ -104,7 +107,13 @@ def genotypes(
     # Select intrusting column
     genotypes = genotypes.select(["id", "sample", *[col.lower() for col in col_index]])
 
-    if "gt" in genotypes.columns:
+    schema = genotypes.collect_schema()
+    if isinstance(schema.get("gt"), polars.Struct):
+        genotypes = genotypes.unnest("gt")
+        if not gt_packed:
+            genotypes = genotypes.drop("gt_packed")
+
+    if "gt" in schema:
         return genotypes.filter(polars.col("gt") != 0)
 
     return genotypes
@@ -2,6 +2,6 @@
 
 from __future__ import annotations
 
-from variantplaner.io import vcf
+from variantplaner.io import cache, parquet, vcf
 
-__all__: list[str] = ["vcf"]
+__all__: list[str] = ["cache", "parquet", "vcf"]
@@ -0,0 +1,261 @@
+"""Fingerprint of converted inputs, use to skip conversion of unchanged vcf, and process level cache.
+
+An input fingerprint is its size, its modification time and a hash of its header, a hash of its content could be add. Fingerprint is stored with a hash of conversion options and output paths in a json file.
+"""
+
+# std import
+from __future__ import annotations
+
+import collections
+import hashlib
+import json
+import logging
+import os
+import threading
+import typing
+
+# 3rd party import
+# project import
+from variantplaner.io.vcf import is_bcf, is_stream, open_vcf
+
+# type checking block
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
+HEADER_BYTES: int = 1 << 16
+"""Number of bytes hashed as header of a bcf, bcf header is compressed"""
+
+CHUNK_SIZE: int = 1 << 20
+"""Size of chunk read to compute content hash"""
+
+CACHE_SIZE: int = 128
+"""Maximal number of entries kept by process level caches"""
+
+logger = logging.getLogger("io.cache")
+
+K = typing.TypeVar("K")
+V = typing.TypeVar("V")
+
+
+class LruCache(typing.Generic[K, V]):
+    """Mapping that keep only the `max_size` most recently used entries, methods could be call from many threads."""
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """Initialise an empty cache."""
+        self.max_size = max_size
+        self.__data: collections.OrderedDict[K, V] = collections.OrderedDict()
+        self.__lock = threading.Lock()
+
+    def get(self, key: K) -> V | None:
+        """Get value of key and mark it as recently used, None if key isn't in cache."""
+        with self.__lock:
+            if key not in self.__data:
+                return None
+            self.__data.move_to_end(key)
+            return self.__data[key]
+
+    def __setitem__(self, key: K, value: V) -> None:
+        """Store value, least recently used entries are removed if cache is full."""
+        with self.__lock:
+            self.__data[key] = value
+            self.__data.move_to_end(key)
+            while len(self.__data) > self.max_size:
+                self.__data.popitem(last=False)
+
+    def __contains__(self, key: object) -> bool:
+        """Check if key is in cache."""
+        return key in self.__data
+
+    def __len__(self) -> int:
+        """Number of entries in cache."""
+        return len(self.__data)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self.__lock:
+            self.__data.clear()
+
+
+def header_digest(path: pathlib.Path) -> str:
+    """Compute sha256 of vcf header lines, for a bcf first bytes of file are hashed.
+
+    Args:
+        path: Path to vcf or bcf file.
+
+    Returns:
+        Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+
+    if is_bcf(path):
+        with open(path, "rb") as fh:
+            digest.update(fh.read(HEADER_BYTES))
+        return digest.hexdigest()
+
+    with open_vcf(path) as fh:
+        for line in fh:
+            if not line.startswith("#"):
+                break
+            digest.update(line.encode())
+
+    return digest.hexdigest()
+
+
+def content_digest(path: pathlib.Path) -> str:
+    """Compute sha256 of file content.
+
+    Args:
+        path: Path to file.
+
+    Returns:
+        Hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        while chunk := fh.read(CHUNK_SIZE):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def fingerprint(path: pathlib.Path, *, content_hash: bool = False) -> dict[str, typing.Any]:
+    """Compute fingerprint of an input file.
+
+    Args:
+        path: Path to vcf or bcf file.
+        content_hash: Add a sha256 of all file content.
+
+    Returns:
+        Fingerprint with size, mtime_ns, header and content (None if content_hash is False).
+    """
+    stat = path.stat()
+
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "header": header_digest(path),
+        "content": content_digest(path) if content_hash else None,
+    }
+
+
+def options_digest(options: typing.Any) -> str:
+    """Compute sha256 of conversion options, options are serialized in json, value that aren't json serializable are converted in string.
+
+    Args:
+        options: Any json serializable value.
+
+    Returns:
+        Hexadecimal digest.
+    """
+    return hashlib.sha256(json.dumps(options, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ConversionCache:
+    """Store fingerprint of converted inputs in a json file.
+
+    An input is unchanged if its size and modification time match stored fingerprint, header hash is recomputed to detect rewrite that preserve modification time. If `content_hash` is True, modification time isn't used, header and content hash must match.
+
+    If `force` is True, all inputs are misses but their fingerprints are still recorded. Standard input and FIFO are never cached. Methods could be call from many threads.
+    """
+
+    def __init__(self, path: pathlib.Path, *, content_hash: bool = False, force: bool = False):
+        """Load cache from path, if path didn't exist cache is empty."""
+        self.path = path
+        self.content_hash = content_hash
+        self.force = force
+        self.hits = 0
+        self.misses = 0
+        self.__lock = threading.Lock()
+
+        self.entries: dict[str, dict[str, typing.Any]] = {}
+        if path.is_file():
+            try:
+                with open(path) as fh:
+                    self.entries = json.load(fh)
+            except (OSError, json.JSONDecodeError):
+                logger.warning(f"Can't read conversion cache {path}, cache is ignored")
+
+    def hit(self, input_path: pathlib.Path, options: str, outputs: list[pathlib.Path]) -> bool:
+        """Check if input was already converted with same options in outputs that still exist, count hits and misses.
+
+        Args:
+            input_path: Path of input.
+            options: Digest of conversion options, see [options_digest][variantplaner.io.cache.options_digest].
+            outputs: Path of all outputs.
+
+        Returns:
+            True if conversion could be skipped.
+        """
+        result = self.__hit(input_path, options, outputs)
+
+        with self.__lock:
+            if result:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        return result
+
+    def __hit(self, input_path: pathlib.Path, options: str, outputs: list[pathlib.Path]) -> bool:
+        if self.force or is_stream(input_path):
+            return False
+
+        with self.__lock:
+            entry = self.entries.get(self.__key(input_path))
+
+        if entry is None or entry["options"] != options or entry["outputs"] != self.__outputs(outputs):
+            return False
+
+        if not all(path.exists() for path in outputs):
+            return False
+
+        stored = entry["fingerprint"]
+        stat = input_path.stat()
+        if stat.st_size != stored["size"]:
+            return False
+
+        if self.content_hash:
+            return (
+                stored["content"] is not None
+                and header_digest(input_path) == stored["header"]
+                and content_digest(input_path) == stored["content"]
+            )
+
+        return stat.st_mtime_ns == stored["mtime_ns"] and header_digest(input_path) == stored["header"]
+
+    def record(self, input_path: pathlib.Path, options: str, outputs: list[pathlib.Path]) -> None:
+        """Store fingerprint of a converted input, cache isn't written on disk see [save][variantplaner.io.cache.ConversionCache.save].
+
+        Args:
+            input_path: Path of input.
+            options: Digest of conversion options.
+            outputs: Path of all outputs.
+        """
+        if is_stream(input_path):
+            return
+
+        entry = {
+            "fingerprint": fingerprint(input_path, content_hash=self.content_hash),
+            "options": options,
+            "outputs": self.__outputs(outputs),
+        }
+
+        with self.__lock:
+            self.entries[self.__key(input_path)] = entry
+
+    def save(self) -> None:
+        """Write cache on disk, file is replaced atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+
+        with self.__lock, open(tmp_path, "w") as fh:
+            json.dump(self.entries, fh, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def __key(input_path: pathlib.Path) -> str:
+        return str(input_path.resolve())
+
+    @staticmethod
+    def __outputs(outputs: list[pathlib.Path]) -> list[str]:
+        return [str(path.resolve()) for path in outputs]
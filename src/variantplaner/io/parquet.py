@@ -0,0 +1,73 @@
+"""Read and write key value metadata of parquet file.
+
+polars can't write custom key value metadata in parquet footer, metadata are stored in a JSON sidecar file next to parquet file: metadata of `genotypes.parquet` are in `genotypes.parquet.metadata.json`.
+"""
+
+# std import
+from __future__ import annotations
+
+import json
+import os
+import typing
+
+# 3rd party import
+
+# project import
+
+# type checking block
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
+METADATA_SUFFIX: str = ".metadata.json"
+
+
+def metadata_path(path: pathlib.Path) -> pathlib.Path:
+    """Get path of sidecar file that store metadata of a parquet file.
+
+    Args:
+        path: Path of parquet file.
+
+    Returns:
+        Path of JSON sidecar file.
+    """
+    return path.with_name(path.name + METADATA_SUFFIX)
+
+
+def read_metadata(path: pathlib.Path) -> dict[str, str]:
+    """Read key value metadata of a parquet file.
+
+    Args:
+        path: Path of parquet file.
+
+    Returns:
+        Key value metadata, empty if parquet file has no sidecar file.
+    """
+    sidecar = metadata_path(path)
+    if not sidecar.is_file():
+        return {}
+
+    with open(sidecar) as fh:
+        return json.load(fh)
+
+
+def write_metadata(path: pathlib.Path, metadata: dict[str, str]) -> None:
+    """Add key value metadata to a parquet file, existing key are overwritten.
+
+    Sidecar file is written in a temporary file and moved, a reader never see a partial file.
+
+    Args:
+        path: Path of parquet file.
+        metadata: Key value to add.
+
+    Returns:
+        None
+    """
+    merged = read_metadata(path)
+    merged.update(metadata)
+
+    sidecar = metadata_path(path)
+    tmp_path = sidecar.with_name(f"{sidecar.name}.tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump(merged, fh, indent=4)
+
+    os.replace(tmp_path, sidecar)
@@ -5,19 +5,21 @@
 # std import
 from __future__ import annotations
 
+import gzip
+import io
 import logging
+import sys
 import typing
 
 # 3rd party import
 import polars
 
 # project import
-
+from variantplaner_rs import VcfFormat  # noqa: F401 ruff miss this import is use
 
 # type checking block
 if typing.TYPE_CHECKING:  # pragma: no cover
     import pathlib
-    import sys
 
     if sys.version_info >= (3, 11):
         from typing import ParamSpec
@@ -32,6 +34,11 @@ if typing.TYPE_CHECKING:  # pragma: no cover
 
 MINIMAL_COL_NUMBER: int = 8
 SAMPLE_COL_BEGIN: int = 9
+GZIP_MAGIC: bytes = b"\x1f\x8b"
+BCF_MAGIC: bytes = b"BCF\x02"
+MAX_POSITION: int = (1 << 63) - 1
+REGION_POSITION_BITS: int = 40
+STDIN_PATH: str = "-"
 
 logger = logging.getLogger("io.vcf")
 
@@ -67,6 +74,186 @@ DEFAULT_RENAME: RenameCol = {
 }
 
 
+def is_compressed(path: pathlib.Path) -> bool:
+    """Check if file is gzip or bgzip compressed.
+
+    Args:
+        path: Path to file.
+
+    Returns:
+        True if file starts with gzip magic number.
+    """
+    with open(path, "rb") as fh:
+        return fh.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def is_bcf(path: pathlib.Path) -> bool:
+    """Check if file is a bcf, bcf could be bgzip compressed or not.
+
+    Args:
+        path: Path to file.
+
+    Returns:
+        True if file, after decompression, starts with bcf magic number.
+    """
+    with gzip.open(path, "rb") if is_compressed(path) else open(path, "rb") as fh:
+        return fh.read(len(BCF_MAGIC)) == BCF_MAGIC
+
+
+def open_vcf(path: pathlib.Path) -> typing.TextIO:
+    """Open a vcf file in text mode, gzip and bgzip file are decompressed on the fly.
+
+    Args:
+        path: Path to vcf file.
+
+    Returns:
+        A text file object.
+    """
+    if is_compressed(path):
+        return gzip.open(path, "rt")
+
+    return open(path)
+
+
+def is_stream(path: pathlib.Path) -> bool:
+    """Check if path is standard input (`-`) or a FIFO, this input can be read only once.
+
+    Args:
+        path: Path to file.
+
+    Returns:
+        True if path is `-` or a FIFO.
+    """
+    return str(path) == STDIN_PATH or path.is_fifo()
+
+
+def open_stream(path: pathlib.Path) -> typing.TextIO:
+    """Open standard input or a FIFO in text mode, gzip and bgzip stream are decompressed on the fly.
+
+    Compression is detected without consuming data, stream didn't need to be seekable.
+
+    Args:
+        path: Path to FIFO or `-` for standard input.
+
+    Returns:
+        A text file object.
+    """
+    raw: typing.BinaryIO = sys.stdin.buffer if str(path) == STDIN_PATH else open(path, "rb")  # noqa: SIM115 file is return
+
+    # a replaced standard input could be a binary stream without peek, BufferedReader only require readinto
+    buffered = raw if isinstance(raw, io.BufferedReader) else io.BufferedReader(typing.cast("io.RawIOBase", raw))
+
+    if buffered.peek(len(GZIP_MAGIC))[: len(GZIP_MAGIC)] == GZIP_MAGIC:
+        return gzip.open(buffered, "rt")
+
+    return io.TextIOWrapper(buffered)
+
+
+def parse_region(region: str) -> tuple[str, int, int]:
+    """Parse a region string `chr`, `chr:start` or `chr:start-end`, positions are 1-based and inclusive.
+
+    Args:
+        region: Region string.
+
+    Returns:
+        Tuple of chromosome, start and end, missing start is 1 and missing end is the maximal position.
+
+    Raises:
+        ValueError: If start or end isn't an integer or if end is lower than start.
+    """
+    chrom, _, interval = region.rpartition(":")
+    if not chrom:
+        return (interval, 1, MAX_POSITION)
+
+    start, _, end = interval.replace(",", "").partition("-")
+    try:
+        result = (chrom, int(start) if start else 1, int(end) if end else MAX_POSITION)
+    except ValueError as e:
+        raise ValueError(f"region {region} isn't valid") from e
+
+    if result[2] < result[1]:
+        raise ValueError(f"region {region} end is lower than start")
+
+    return result
+
+
+def read_regions_file(path: pathlib.Path) -> list[tuple[str, int, int]]:
+    """Read a bed file, 0-based half-open intervals are convert in 1-based inclusive regions.
+
+    Args:
+        path: Path to bed file, could be gzip compressed.
+
+    Returns:
+        List of chromosome, start and end.
+    """
+    regions = []
+    with open_vcf(path) as fh:
+        for line in fh:
+            if not line.strip() or line.startswith(("#", "track", "browser")):
+                continue
+
+            chrom, start, end = line.split("\t")[:3]
+            regions.append((chrom, int(start) + 1, int(end)))
+
+    return regions
+
+
+def merge_regions(regions: list[tuple[str, int, int]]) -> list[tuple[str, int, int]]:
+    """Sort regions and merge overlapping or adjacent regions of same chromosome.
+
+    Args:
+        regions: List of chromosome, start and end, 1-based and inclusive.
+
+    Returns:
+        List of chromosome, start and end sorted by chromosome and start.
+    """
+    merged: list[tuple[str, int, int]] = []
+    for chrom, start, stop in sorted(regions):
+        if merged and merged[-1][0] == chrom and start <= merged[-1][2] + 1:
+            merged[-1] = (chrom, merged[-1][1], max(merged[-1][2], stop))
+        else:
+            merged.append((chrom, start, stop))
+
+    return merged
+
+
+def regions_filter(regions: list[tuple[str, int, int]]) -> polars.Expr:
+    """Build an expression true if variant overlap one of regions.
+
+    Variant cover positions between `pos` and `pos + len(ref) - 1`. Regions are merged and encoded in one sorted key, chromosome rank in high bits and position clipped to REGION_POSITION_BITS in low bits, variant overlap a region if last region that start before its end stop after its position. Expression size didn't depend on number of regions.
+
+    Args:
+        regions: List of chromosome, start and end, 1-based and inclusive.
+
+    Returns:
+        A boolean expression.
+    """
+    merged = merge_regions(regions)
+    if not merged:
+        return polars.lit(value=False)
+
+    rank = {chrom: index for (index, chrom) in enumerate(dict.fromkeys(chrom for (chrom, _, _) in merged))}
+    limit = (1 << REGION_POSITION_BITS) - 1
+
+    def key(chrom: str, position: int) -> int:
+        return rank[chrom] << REGION_POSITION_BITS | min(position, limit)
+
+    starts = polars.Series([key(chrom, start) for (chrom, start, _) in merged], dtype=polars.Int64)
+    stops = polars.Series([key(chrom, stop) for (chrom, _, stop) in merged], dtype=polars.Int64)
+
+    chrom_key = polars.col("chr").replace_strict(rank, default=None, return_dtype=polars.Int64) * (
+        1 << REGION_POSITION_BITS
+    )
+    begin = chrom_key + polars.col("pos").cast(polars.Int64).clip(upper_bound=limit)
+    end = chrom_key + (
+        polars.col("pos").cast(polars.Int64) + polars.col("ref").str.len_bytes().clip(lower_bound=1) - 1
+    ).clip(upper_bound=limit)
+
+    index = polars.lit(starts).search_sorted(end, side="right").cast(polars.Int64) - 1
+
+    return (index >= 0) & (polars.lit(stops).gather(index.clip(lower_bound=0)) >= begin).fill_null(value=False)
+
+
 def build_rename_column(
     chromosome: str,
     pos: str,
@@ -283,13 +470,12 @@ def __lazy2format(sample_name: str, format_string: str, col2type: dict[str, pola
     for col_name in format_string.split(":"):
         lazy_name = f"{sample_name}_{col_name.lower()}"
         if col_name == "GT":
-            expression.append(
-                polars.col(lazy_name)
-                .cast(polars.Utf8)
-                .fill_null("./.")
-                .str.replace("1", "0/1")
-                .str.replace("2", "1/1"),
+            gt = (
+                polars.col(lazy_name).cast(polars.Utf8).fill_null("./.").str.replace("1", "0/1").str.replace("2", "1/1")
             )
+            if f"{lazy_name}_packed" in col2type:
+                gt = polars.coalesce(polars.col(f"{lazy_name}_packed").vcf_format.encode_gt(), gt)  # type: ignore # noqa: PGH003
+            expression.append(gt)
         elif isinstance(col2type[lazy_name], polars.List):
             expression.append(
                 polars.col(lazy_name).cast(polars.List(polars.Utf8)).fill_null(["."]).list.join(","),
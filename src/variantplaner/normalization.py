@@ -4,17 +4,33 @@
 from __future__ import annotations
 
 import logging
+import re
+import typing
 
 # 3rd party import
 import polars
 
 # project import
-from variantplaner_rs import VariantId  # noqa: F401 ruff miss this import is use
+from variantplaner_rs import VariantId, VcfReference  # noqa: F401 ruff miss this import is use
+
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import pathlib
+
+    from polars._typing import JoinStrategy
+
+    from variantplaner.objects.vcf_header import VcfHeader
+
+GVCF_ALLELE: str = r"(?:<NON_REF>|<\*>)"
+
+WIDE_ALT_LENGTH: int = 29
+"""Maximal length of alternative sequence packed in a wide variant id"""
+
+FrameT = typing.TypeVar("FrameT", polars.DataFrame, polars.LazyFrame)
 
 logger = logging.getLogger("normalization")
 
 
-def add_variant_id(lf: polars.LazyFrame, chrom2length: polars.LazyFrame) -> polars.LazyFrame:
+def add_variant_id(lf: polars.LazyFrame, chrom2length: polars.LazyFrame, *, wide: bool = False) -> polars.LazyFrame:
     """Add a column id of variants.
 
     Id computation is based on
@@ -27,16 +43,21 @@ def add_variant_id(lf: polars.LazyFrame, chrom2length: polars.LazyFrame) -> pola
 
     If lf.columns contains SVTYPE and SVLEN variant with regex group in alt <([^:]+).*> match SVTYPE are replaced by concatenation of SVTYPE and SVLEN first value.
 
+    Contig offsets are collected once and resolved by plugin from chr and pos, variants on a contig absent of chrom2length get a null id.
+
+    If wide is True, id is a struct of two UInt64 `hi` and `lo`. `hi` contains position and reference length, `lo` contains alternative length and sequence, reference length use all bits not used by position and alternative sequence up to 29 bases is packed if reference and alternative contain only A, C, G or T, other variants (N, *, symbolic alleles) are hashed with two seeds. `hi` of a hashed wide id is equal to not wide hashed id, so partition of a variant didn't change if it's packed or hashed in both mode.
+
     Args:
         lf: [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) contains: chr, pos, ref, alt columns.
         chrom2length: [polars.DataFrame](https://pola-rs.github.io/polars/py-polars/html/reference/dataframe/index.html) contains: chr and length columns.
+        wide: Compute a 128 bits id.
 
     Returns:
         [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with chr column normalized
     """
-    real_pos_max = chrom2length.select([polars.col("length").sum()]).collect().get_column("length").max()
+    offsets, real_pos_max = __contigs_offsets(chrom2length)
 
-    large_variant_len = (64 - len(format(real_pos_max, "b")) - 2) // 2 + 1
+    large_variant_len = WIDE_ALT_LENGTH + 1 if wide else (64 - len(format(real_pos_max, "b")) - 2) // 2 + 1
 
     col_names = lf.collect_schema().names()
     if "SVTYPE" in col_names and "SVLEN" in col_names:
@@ -61,24 +82,58 @@ def add_variant_id(lf: polars.LazyFrame, chrom2length: polars.LazyFrame) -> pola
         )
 
     lf = lf.with_columns(alt=polars.col("alt").str.replace("\\*", "*" * large_variant_len))
-    lf = lf.join(chrom2length, right_on="contig", left_on="chr", how="left", coalesce=True)
-    lf = lf.with_columns(real_pos=polars.col("pos") + polars.col("offset"))
-
-    lf = lf.with_columns(
-        id=polars.col("real_pos").variant_id.compute(  # type: ignore # noqa: PGH003
+    return lf.with_columns(
+        id=polars.col("chr").variant_id.compute_contig(  # type: ignore # noqa: PGH003
+            polars.col("pos"),
             polars.col("ref"),
             polars.col("alt"),
+            offsets,
             real_pos_max,
+            wide=wide,
         ),
     )
 
-    return lf.drop(["real_pos", "length", "offset"])
+
+def decode_variant_id(
+    lf: polars.LazyFrame,
+    chrom2length: polars.LazyFrame,
+    *,
+    column: str = "id",
+) -> polars.LazyFrame:
+    """Add columns chr, pos, ref_len and alt decoded from variant id, without join against variants.
+
+    chrom2length must be the one used to compute id. chr and pos are decoded for all packed id. Reference length and alternative sequence share the same bits, they are decoded only if one interpretation is possible: reference of 1 to 3 bases and alternative of 1 base (N is decoded as G), otherwise they are null. A packed id of a variant with an empty alternative and a reference of 4 to 15 bases has same value than a substitution of one base, it's decoded as this substitution, normalize variants to keep an anchor base. Reference length and alternative sequence of a packed wide id are always decoded. Hashed id get null in all columns, they require a lookup in variants.
+
+    Args:
+        lf: [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) contains: `column` column.
+        chrom2length: [polars.DataFrame](https://pola-rs.github.io/polars/py-polars/html/reference/dataframe/index.html) contains: contig, length and offset columns.
+        column: Name of variant id column.
+
+    Returns:
+        [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with columns chr, pos, ref_len and alt added
+    """
+    offsets, real_pos_max = __contigs_offsets(chrom2length.filter(polars.col("length") > 0).sort("offset"))
+
+    return lf.with_columns(
+        polars.col(column)
+        .variant_id.decode(offsets, real_pos_max)  # type: ignore # noqa: PGH003
+        .alias("__decoded_id"),
+    ).unnest("__decoded_id")
+
+
+def __contigs_offsets(chrom2length: polars.LazyFrame) -> tuple[dict[str, int], int]:
+    """Collect offset of each contig and sum of contigs length."""
+    contigs = chrom2length.select("contig", "length", "offset").collect()
+
+    offsets = dict(zip(contigs.get_column("contig"), contigs.get_column("offset")))
+
+    return offsets, int(contigs.get_column("length").sum() or 0)
 
 
 def add_id_part(lf: polars.LazyFrame, number_of_bits: int = 8) -> polars.LazyFrame:
     """Add column id part.
 
-    If id is large variant id value, id_part are set to 255, other value most weigthed position 8 bits are use.
+    If id is large variant id value, id_part are set to 255, other value most weigthed position 8 bits are use. For a wide id, `hi` field is used.
 
     Args:
         lf: [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) contains: id column.
@@ -87,3 +142,316 @@ def add_id_part(lf: polars.LazyFrame, number_of_bits: int = 8) -> polars.LazyFra
         [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with column id_part added
     """
     return lf.with_columns(id_part=polars.col("id").variant_id.partition(number_of_bits=number_of_bits))  # type: ignore # noqa: PGH003
+
+
+def join_on_id(left: FrameT, right: FrameT, how: JoinStrategy, *, column: str = "id") -> FrameT:
+    """Join two frames on variant id, id of both frames are coalesced.
+
+    Polars can't join on a struct column, wide id are split in two UInt64 columns before join and rebuild after, id is the first column of result.
+
+    Args:
+        left: [polars.DataFrame](https://pola-rs.github.io/polars/py-polars/html/reference/dataframe/index.html) or [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) contains: `column` column.
+        right: Same type as left, contains: `column` column.
+        how: Join strategy.
+        column: Name of variant id column.
+
+    Returns:
+        Joined frame, same type as left.
+    """
+    if not isinstance(left.collect_schema()[column], polars.Struct):
+        return left.join(right, on=column, how=how, coalesce=True)
+
+    keys = [f"_{column}_hi", f"_{column}_lo"]
+
+    return (
+        __split_wide_id(left, column, keys)
+        .join(__split_wide_id(right, column, keys), on=keys, how=how, coalesce=True)
+        .select(
+            polars.struct(hi=polars.col(keys[0]), lo=polars.col(keys[1])).alias(column),
+            polars.exclude(keys),
+        )
+    )
+
+
+def __split_wide_id(frame: FrameT, column: str, keys: list[str]) -> FrameT:
+    """Replace wide id column by its hi and lo fields."""
+    return frame.with_columns(
+        polars.col(column).struct.field("hi").alias(keys[0]),
+        polars.col(column).struct.field("lo").alias(keys[1]),
+    ).drop(column)
+
+
+def split_multiallelic(lf: polars.LazyFrame, header: VcfHeader) -> polars.LazyFrame:
+    """Split multi-allelic records in biallelic records.
+
+    Each alternative allele get its own row. INFO and FORMAT fields declared in header with Number=A or Number=R are re-indexed, FORMAT fields with Number=G are re-indexed for haploid and diploid calls. In GT, allele of row is set to 1 and other alternative alleles to 0, haploid and diploid calls keep allele order and phase, polyploid calls are sorted.
+
+    Split only use columnar operations and explode, it could be apply on a streaming plan.
+
+    Args:
+        lf: [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) of vcf with string columns: alt, info and optionally format and samples.
+        header: Header of vcf.
+
+    Returns:
+        [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with one alternative allele by row.
+    """
+    names = lf.collect_schema().names()
+    alt_number = polars.col("alt").str.count_matches(",", literal=True) + 1
+
+    lf = lf.with_columns(
+        alt=polars.col("alt").str.split(","),
+        _alt_index=polars.int_ranges(0, alt_number, dtype=polars.Int64),
+        _alt_number=alt_number.cast(polars.Int64),
+    ).explode("alt", "_alt_index")
+
+    lf = __reindex(lf, header, names, __split_values, gt=True)
+
+    return lf.drop("_alt_index", "_alt_number")
+
+
+def is_reference_block() -> polars.Expr:
+    """Expression true if record is a gVCF reference block.
+
+    A reference block is a record without alternative allele other than `<NON_REF>` or `<*>`, its extent is set by END INFO field.
+
+    Returns:
+        A boolean expression on alt column.
+    """
+    return polars.col("alt").str.replace(f",?{GVCF_ALLELE}$", "").is_in(["", "."])
+
+
+def drop_reference_blocks(lf: polars.LazyFrame, header: VcfHeader) -> polars.LazyFrame:
+    """Remove gVCF reference blocks and `<NON_REF>` or `<*>` allele of variant records.
+
+    Symbolic allele must be the last alternative allele, as write by GATK and DeepVariant. INFO and FORMAT fields declared in header with Number=A, Number=R or Number=G lose values of this allele, GT isn't changed.
+
+    Args:
+        lf: [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) of gVCF with string columns: alt, info and optionally format and samples.
+        header: Header of gVCF.
+
+    Returns:
+        [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with only variant records.
+    """
+    names = lf.collect_schema().names()
+    alt = polars.col("alt")
+
+    lf = lf.filter(~is_reference_block()).with_columns(
+        alt=alt.str.replace(f",{GVCF_ALLELE}$", ""),
+        _non_ref=alt.str.contains(f",{GVCF_ALLELE}$"),
+        _alt_number=(alt.str.count_matches(",", literal=True) + 1).cast(polars.Int64),
+    )
+
+    lf = __reindex(lf, header, names, __drop_last_values, gt=False)
+
+    return lf.drop("_non_ref", "_alt_number")
+
+
+def __reindex(
+    lf: polars.LazyFrame,
+    header: VcfHeader,
+    names: list[str],
+    select: typing.Callable[[polars.Expr, str], polars.Expr],
+    *,
+    gt: bool,
+) -> polars.LazyFrame:
+    """Rewrite values of INFO and FORMAT fields with Number=A, R or G with select, GT is recoded for allele of row if gt is True."""
+    if "info" in names:
+        for name, (number, _) in header.model.info.items():
+            if number in {"A", "R"}:
+                lf = lf.with_columns(info=__split_info_field(name, number, select))
+        lf = lf.with_columns(info=polars.col("info").str.strip_chars_start(";"))
+
+    if "format" in names:
+        numbers = {key: number for (key, (number, _)) in header.model.format.items() if number in {"A", "R", "G"}}
+        if gt:
+            numbers["GT"] = "GT"
+        if not numbers:
+            return lf
+
+        format_keys = polars.col("format").str.split(":")
+        lf = lf.with_columns(
+            [
+                polars.when(format_keys.list.contains(key))
+                .then(format_keys.list.eval(polars.element() == key).list.arg_max())
+                .alias(f"_format_{key}")
+                for key in numbers
+            ],
+        )
+        samples = names[names.index("format") + 1 :]
+        lf = lf.with_columns([polars.col(sample).str.split(":") for sample in samples])
+        for key, number in numbers.items():
+            lf = lf.with_columns([__split_field(sample, key, number, select) for sample in samples])
+        lf = lf.with_columns([polars.col(sample).list.join(":") for sample in samples])
+        lf = lf.drop([f"_format_{key}" for key in numbers])
+
+    return lf
+
+
+def left_align(lf: polars.LazyFrame, fasta_path: pathlib.Path) -> polars.LazyFrame:
+    """Trim shared bases and left align indels against a reference genome.
+
+    Reference sequence is read through a memory map, a samtools faidx index must be present at `fasta_path` + `.fai`. Shared suffix is removed, indels are shifted to their leftmost position with an anchor base, then shared prefix is removed. SNV, symbolic, multi-allelic and variants on contigs absent of reference are left untouched.
+
+    Args:
+        lf: [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) contains: chr, pos, ref, alt columns.
+        fasta_path: Path to reference genome in fasta format, must be uncompressed.
+
+    Returns:
+        [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with pos, ref and alt normalized
+    """
+    lf = lf.with_columns(
+        _left_align=polars.col("chr").vcf_reference.left_align(  # type: ignore # noqa: PGH003
+            polars.col("pos"),
+            polars.col("ref"),
+            polars.col("alt"),
+            fasta_path,
+        ),
+    )
+
+    return lf.with_columns(
+        pos=polars.col("_left_align").struct.field("pos"),
+        ref=polars.col("_left_align").struct.field("ref"),
+        alt=polars.col("_left_align").struct.field("alt"),
+    ).drop("_left_align")
+
+
+def __split_values(values: polars.Expr, number: str) -> polars.Expr:
+    """Select values of allele of row in a comma separated list of values."""
+    split = values.str.split(",")
+    allele = polars.col("_alt_index") + 1
+
+    if number == "A":
+        selected = polars.concat_list([split.list.get(polars.col("_alt_index"), null_on_oob=True)])
+    else:
+        selected = polars.concat_list(
+            [split.list.get(0, null_on_oob=True), split.list.get(allele, null_on_oob=True)],
+        )
+
+    if number == "G":
+        # Number=G index of genotype 0/a, a/a follow it
+        het_index = (allele * (allele + 1)) // 2
+        diploid = polars.concat_list(
+            [
+                split.list.get(0, null_on_oob=True),
+                split.list.get(het_index, null_on_oob=True),
+                split.list.get(het_index + allele, null_on_oob=True),
+            ],
+        )
+        selected = polars.when(split.list.len() == polars.col("_alt_number") + 1).then(selected).otherwise(diploid)
+
+    return (
+        polars.when(values == ".")
+        .then(values)
+        .otherwise(selected.list.eval(polars.element().fill_null(".")).list.join(","))
+    )
+
+
+def __drop_last_values(values: polars.Expr, number: str) -> polars.Expr:
+    """Remove values of last alternative allele in a comma separated list of values, only on records with a symbolic allele."""
+    split = values.str.split(",")
+    alt_number = polars.col("_alt_number")
+
+    if number == "A":
+        length = alt_number - 1
+    elif number == "R":
+        length = alt_number
+    else:
+        # genotypes without last allele are the first ones, for haploid and diploid calls
+        length = (
+            polars.when(split.list.len() == alt_number + 1)
+            .then(alt_number)
+            .otherwise((alt_number * (alt_number + 1)) // 2)
+        )
+
+    return (
+        polars.when((values == ".") | ~polars.col("_non_ref"))
+        .then(values)
+        .otherwise(split.list.head(length).list.join(","))
+    )
+
+
+def __split_info_field(
+    name: str,
+    number: str,
+    select: typing.Callable[[polars.Expr, str], polars.Expr],
+) -> polars.Expr:
+    """Re-index an INFO field with Number=A or Number=R, a leading `;` could be added."""
+    info = polars.col("info")
+    values = info.str.extract(f"(?:^|;){re.escape(name)}=([^;]*)", 1)
+
+    return (
+        polars.when(values.is_not_null())
+        .then(
+            info.str.replace(
+                f"(?:^|;){re.escape(name)}=[^;]*",
+                polars.concat_str([polars.lit(f";{name}="), select(values, number)]),
+            ),
+        )
+        .otherwise(info)
+    )
+
+
+def __split_gt(gt: polars.Expr) -> polars.Expr:
+    """Set allele of row to 1 and other alternative alleles to 0 in GT."""
+    allele = (polars.col("_alt_index") + 1).cast(polars.String)
+    separator = polars.when(gt.str.contains("|", literal=True)).then(polars.lit("|")).otherwise(polars.lit("/"))
+    ploidy = gt.str.count_matches(r"[/|]") + 1
+
+    def recode(value: polars.Expr) -> polars.Expr:
+        return (
+            polars.when(value == allele)
+            .then(polars.lit("1"))
+            .when(value == ".")
+            .then(polars.lit("."))
+            .otherwise(polars.lit("0"))
+        )
+
+    first = recode(gt.str.extract(r"^([^/|]*)", 1))
+    second = recode(gt.str.extract(r"^[^/|]*[/|]([^/|]*)$", 1))
+
+    padded = polars.concat_str([polars.lit("/"), gt.str.replace_all(r"[/|]", "//"), polars.lit("/")])
+    alt_count = padded.str.count_matches(polars.concat_str([polars.lit("/"), allele, polars.lit("/")]))
+    missing_count = padded.str.count_matches("/./", literal=True)
+    polyploid = polars.concat_list(
+        [
+            polars.lit("0").repeat_by(ploidy - alt_count - missing_count),
+            polars.lit("1").repeat_by(alt_count),
+            polars.lit(".").repeat_by(missing_count),
+        ],
+    ).list.join(separator)
+
+    return (
+        polars.when(ploidy == 1)
+        .then(first)
+        .when(ploidy == 2)  # noqa: PLR2004 diploid
+        .then(polars.concat_str([first, separator, second]))
+        .otherwise(polyploid)
+    )
+
+
+def __split_field(
+    sample: str,
+    key: str,
+    number: str,
+    select: typing.Callable[[polars.Expr, str], polars.Expr],
+) -> polars.Expr:
+    """Re-index FORMAT field key in list of fields of a sample column."""
+    fields = polars.col(sample)
+    index = polars.col(f"_format_{key}")
+    value = fields.list.get(index, null_on_oob=True)
+    new_value = __split_gt(value) if number == "GT" else select(value, number)
+
+    return (
+        polars.when(value.is_not_null())
+        .then(
+            polars.concat_list(
+                [
+                    fields.list.slice(0, index),
+                    polars.concat_list([new_value]),
+                    fields.list.slice(index + 1),
+                ],
+            ),
+        )
+        .otherwise(fields)
+        .alias(sample)
+    )
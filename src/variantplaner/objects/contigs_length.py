@@ -3,13 +3,13 @@
 # std import
 from __future__ import annotations
 
-import re
 import typing
 
 # 3rd party import
 import polars
 
 # project import
+from variantplaner.io.cache import LruCache
 from variantplaner.objects.csv import Csv
 
 if typing.TYPE_CHECKING:
@@ -24,6 +24,9 @@ if typing.TYPE_CHECKING:
     else:
         from typing_extensions import Unpack
 
+CONTIGS_CACHE: LruCache[str, tuple[polars.DataFrame, int]] = LruCache()
+"""Process level cache of contigs table, key is header fingerprint or path, modification time and scan arguments"""
+
 
 class ContigsLength:
     """Store contigs -> length information."""
@@ -46,21 +49,23 @@ class ContigsLength:
 
         Returns: Number of contigs line view
         """
-        contigs_id = re.compile(r"ID=(?P<id>[^,]+)")
-        contigs_len = re.compile(r"length=(?P<length>[^,>]+)")
+        if (cached := CONTIGS_CACHE.get(header.fingerprint)) is not None:
+            self.lf = cached[0].lazy()
+            return cached[1]
 
-        count = 0
         contigs2len: dict[str, list] = {"contig": [], "length": []}
-        for contig_line in header.contigs:
-            if (len_match := contigs_len.search(contig_line)) and (id_match := contigs_id.search(contig_line)):
-                contigs2len["contig"].append(id_match.groupdict()["id"])
-                contigs2len["length"].append(int(len_match.groupdict()["length"]))
-            count += 1
+        for contig, length in header.model.contigs:
+            if length is not None:
+                contigs2len["contig"].append(contig)
+                contigs2len["length"].append(length)
 
         self.lf = polars.LazyFrame(contigs2len, schema={"contig": polars.String, "length": polars.UInt64})
 
         self.__compute_offset()
 
+        count = len(header.model.contigs)
+        CONTIGS_CACHE[header.fingerprint] = (self.lf.collect(), count)
+
         return count
 
     def from_path(self, path: pathlib.Path, /, **scan_csv_args: Unpack[ScanCsv]) -> int:
@@ -71,13 +76,21 @@ class ContigsLength:
 
         Returns: Number of contigs line view
         """
+        key = f"{path.resolve()}:{path.stat().st_mtime_ns}:{sorted(scan_csv_args.items())!r}"
+        if (cached := CONTIGS_CACHE.get(key)) is not None:
+            self.lf = cached[0].lazy()
+            return cached[1]
+
         csv = Csv()
         csv.from_path(path, **scan_csv_args)
         self.lf = csv.lf
 
         self.__compute_offset()
 
-        return self.lf.collect().shape[0]
+        data = self.lf.collect()
+        CONTIGS_CACHE[key] = (data, data.shape[0])
+
+        return data.shape[0]
 
     def __compute_offset(self) -> None:
         self.lf = self.lf.with_columns(offset=polars.col("length").cum_sum() - polars.col("length"))
@@ -3,11 +3,22 @@
 # std import
 from __future__ import annotations
 
+import json
+import typing
+
 # 3rd party import
 import polars
 
 # project import
 
+# type checking block
+if typing.TYPE_CHECKING:  # pragma: no cover
+    from variantplaner.objects.vcf_header import VcfHeader
+
+COMPACT_METADATA_KEY: str = "variantplaner:genotypes_schema"
+FIXED_COLUMNS: set[str] = {"id", "gt", "gt_packed"}
+QUANTISED_COLUMNS: dict[str, int] = {"gq": 255, "dp": 65535, "ad": 65535, "pl": 255}
+
 
 class Genotypes(polars.LazyFrame):
     """Object to manage lazyframe as Genotypes."""
@@ -19,10 +30,85 @@ class Genotypes(polars.LazyFrame):
         else:
             self.lf = data
 
+        self.metadata: dict[str, str] = {}
+
     def samples_names(self) -> list[str]:
         """Get list of sample name."""
         return self.lf.select("sample").collect().get_column("sample").to_list()
 
+    def compact(self, header: VcfHeader | None = None) -> dict[str, str]:
+        """Cast genotypes columns to a compact schema that depends only on column names and types, not on values.
+
+        Schema is the same for every file produced with same FORMAT, so outputs of a hive, batches or appended data can be concatenated. Columns `id`, `gt` and `gt_packed` keep their type. Integer and integer list columns listed in QUANTISED_COLUMNS (gq, dp, ad and pl) are quantised, values are clipped between 0 and column limit and stored in smallest unsigned type sufficient for this limit. Other integer columns are stored as Int32, VCF Integer are signed 32 bits values, values out of this range are set to null. If `header` is set, FORMAT fields declared as Float are stored as Float32 even if they were parsed as String and FORMAT Number and Type are recorded in metadata.
+
+        Data isn't collected, lf is replaced by compact plan.
+
+        Returns:
+        Parquet key value metadata that describe compact schema, also store in metadata attribute.
+        """
+        schema = self.lf.collect_schema()
+        definitions = {} if header is None else Genotypes.__definitions(header, schema.names())
+
+        integers = [name for (name, dtype) in schema.items() if name not in FIXED_COLUMNS and dtype.is_integer()]
+        lists = [
+            name for (name, dtype) in schema.items() if isinstance(dtype, polars.List) and dtype.inner.is_integer()
+        ]
+        floats = [name for (name, (_, kind)) in definitions.items() if kind == "Float"]
+
+        quantised = {name: limit for (name, limit) in QUANTISED_COLUMNS.items() if name in integers + lists}
+        integers = [name for name in integers if name not in quantised]
+        lists = [name for name in lists if name not in quantised]
+
+        self.lf = self.lf.with_columns(
+            [polars.col(name).cast(polars.Int32, strict=False) for name in integers]
+            + [polars.col(name).cast(polars.List(polars.Int32), strict=False) for name in lists]
+            + [
+                polars.col(name)
+                .list.eval(polars.element().clip(0, limit))
+                .cast(polars.List(Genotypes.__smallest_unsigned(limit)))
+                if isinstance(schema[name], polars.List)
+                else polars.col(name).clip(0, limit).cast(Genotypes.__smallest_unsigned(limit))
+                for (name, limit) in quantised.items()
+            ]
+            + [
+                polars.col(name).cast(
+                    polars.List(polars.Float32) if isinstance(schema[name], polars.List) else polars.Float32,
+                    strict=False,
+                )
+                for name in floats
+            ],
+        )
+
+        description: dict[str, typing.Any] = {
+            "schema": {name: str(dtype) for (name, dtype) in self.lf.collect_schema().items()},
+            "quantised": quantised,
+            "out_of_range": "null",
+        }
+        if definitions:
+            description["format"] = {name: list(definition) for (name, definition) in definitions.items()}
+
+        self.metadata = {COMPACT_METADATA_KEY: json.dumps(description)}
+
+        return self.metadata
+
+    @staticmethod
+    def __definitions(header: VcfHeader, names: list[str]) -> dict[str, tuple[str, str]]:
+        """Get FORMAT Number and Type of genotypes columns, gt is a count of alleles and isn't a FORMAT value."""
+        return {
+            name.lower(): definition
+            for (name, definition) in header.model.format.items()
+            if name != "GT" and name.lower() in names
+        }
+
+    @staticmethod
+    def __smallest_unsigned(maximum: int) -> polars.PolarsDataType:
+        """Get smallest unsigned integer type that can store maximum."""
+        for dtype, bits in ((polars.UInt8, 8), (polars.UInt16, 16), (polars.UInt32, 32)):
+            if maximum < 1 << bits:
+                return dtype
+
+        return polars.UInt64
+
     @classmethod
     def minimal_schema(cls) -> dict[str, type]:
         """Get minimal schema of genotypes polars.LazyFrame."""
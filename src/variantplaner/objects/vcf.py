@@ -3,12 +3,22 @@
 # std import
 from __future__ import annotations
 
+import contextlib
 import enum
+import itertools
+import logging
+import pathlib
+import tempfile
 import typing
 
 # 3rd party import
 import polars
 
+try:
+    from polars.io.plugins import register_io_source
+except ImportError:  # pragma: no cover  polars version without io plugins
+    register_io_source = None
+
 # project import
 from variantplaner import normalization
 from variantplaner.exception import (
@@ -17,18 +27,25 @@ from variantplaner.exception import (
     NotAVCFError,
     NotVcfHeaderError,
 )
+from variantplaner.io.vcf import is_bcf, is_compressed, is_stream, open_stream, open_vcf, regions_filter
 from variantplaner.objects.contigs_length import ContigsLength
 from variantplaner.objects.genotypes import Genotypes
 from variantplaner.objects.variants import Variants
-from variantplaner.objects.vcf_header import VcfHeader
+from variantplaner.objects.vcf_header import SAMPLE_COL_BEGIN, VcfHeader
+from variantplaner_rs import vcf_reader
 
 # type checking block
 if typing.TYPE_CHECKING:  # pragma: no cover
     import collections
-    import pathlib
 
     from variantplaner import Annotations
 
+STREAM_BATCH_SIZE: int = 1 << 16
+
+INFO_STRUCT_COLUMN: str = "info_struct"
+
+logger = logging.getLogger("objects.vcf")
+
 
 class VcfParsingBehavior(enum.IntFlag):
     """Enumeration use to control behavior of IntoLazyFrame."""
@@ -42,6 +59,15 @@ class VcfParsingBehavior(enum.IntFlag):
     KEEP_STAR = enum.auto()
     """Keep star variant."""
 
+    SPLIT_MULTIALLELIC = enum.auto()
+    """Split multi-allelic records in biallelic records before id computation, see [variantplaner.normalization.split_multiallelic][]."""
+
+    GVCF = enum.auto()
+    """Input is a gVCF, reference blocks are removed from records and kept for coverage, see [variantplaner.normalization.drop_reference_blocks][]."""
+
+    WIDE_ID = enum.auto()
+    """Compute a 128 bits variant id, a struct of two UInt64, see [variantplaner.normalization.add_variant_id][]."""
+
 
 class Vcf:
     """Object to manage lazyframe as Vcf."""
@@ -52,18 +78,62 @@ class Vcf:
 
         self.header = VcfHeader()
 
+        self.__spool: tempfile.TemporaryDirectory[str] | None = None
+
+        self.__blocks: polars.LazyFrame | None = None
+
     def from_path(
         self,
         path: pathlib.Path,
         chr2len_path: pathlib.Path | None,
         behavior: VcfParsingBehavior = VcfParsingBehavior.NOTHING,
+        *,
+        native: bool = True,
+        threads: int = 1,
+        regions: list[tuple[str, int, int]] | None = None,
+        reference: pathlib.Path | None = None,
+        quarantine: pathlib.Path | None = None,
     ) -> None:
-        """Populate Vcf object with vcf file."""
-        with open(path) as fh:
-            try:
-                self.header.from_lines(fh)
-            except NotVcfHeaderError as e:
-                raise NotAVCFError(path) from e
+        """Populate Vcf object with vcf file.
+
+        Vcf could be gzip or bgzip compressed.
+
+        If `native` is True and variantplaner_rs provide a vcf reader, records are tokenized by it, otherwise [polars.scan_csv][] is used. Native reader decompress bgzip blocks with `threads` threads and decode INFO in a typed struct column `info_struct`, insert after info, used by [annotations][variantplaner.objects.Vcf.annotations]. INFO is only kept as string if `behavior` rewrite it (GVCF or SPLIT_MULTIALLELIC).
+
+        Native reader is lazy only if polars provide io plugins (`polars.io.plugins.register_io_source`), otherwise vcf are read with [polars.scan_csv][] whatever `native` value.
+
+        Bcf file are read by native reader whatever `native` value, records are decoded in same columns than the equivalent vcf. Without polars io plugins, bcf records are decoded once when Vcf is populated and spooled in temporary parquet files (in `TMPDIR`, it needs space for all records) that live as long as Vcf object.
+
+        If `regions` is set (chromosome, start, end 1-based inclusive) only variants overlapping a region are kept. With native reader, if a tabix or csi index is present next to a bgzip vcf, only blocks overlapping regions are read.
+
+        If `path` is `-` (standard input) or a FIFO, input is read once: header first, then records by batch of fixed size spooled in temporary parquet files (in `TMPDIR`) that live as long as Vcf object.
+
+        If `reference` is set, variants are trimmed and left aligned against this indexed fasta before id computation, see [variantplaner.normalization.left_align][].
+
+        If `quarantine` is set, malformed records (invalid utf-8, empty chromosome or position, position not an integer, less fields than header) didn't stop parsing, they are written in this file, one line by record: line number, reason and record separate by tabulation. Native reader write records as they are consumed, with polars reader malformed records are detected by an extra pass on file. Bcf records aren't checked.
+        """
+        typed_info = not behavior & (VcfParsingBehavior.GVCF | VcfParsingBehavior.SPLIT_MULTIALLELIC)
+
+        stream = is_stream(path)
+        if stream:
+            self.lf = self.__stream_scan(
+                path,
+                threads,
+                regions,
+                native=native,
+                quarantine=quarantine,
+                typed_info=typed_info,
+            )
+        elif is_bcf(path):
+            native = True
+            self.__parse_header(self.__bcf_header(path), path)
+        else:
+            with open_vcf(path) as fh:
+                self.__parse_header(fh, path)
+
+            if native and register_io_source is None:
+                logger.info("polars didn't provide io plugins, fallback on polars.scan_csv")
+                native = False
 
         chr2len = ContigsLength()
         if chr2len_path is not None:
@@ -72,30 +142,312 @@ class Vcf:
         elif chr2len.from_vcf_header(self.header) == 0:
             raise NoContigsLengthInformationError
 
-        self.lf = polars.scan_csv(
-            path,
-            separator="\t",
-            comment_prefix="#",
-            has_header=False,
-            schema_overrides=Vcf.schema(),
-            new_columns=list(Vcf.schema().keys()),
-        )
+        if not stream and native:
+            try:
+                self.lf = self.__native_scan(path, threads, regions, quarantine=quarantine, typed_info=typed_info)
+            except ImportError:
+                logger.info("variantplaner_rs didn't provide vcf reader, fallback on polars.scan_csv")
+                native = False
 
-        schema = self.lf.collect_schema()
-        self.lf = self.lf.rename(dict(zip(schema.names(), self.header.column_name(schema.len()))))
-        self.lf = self.lf.cast(Vcf.schema())  # type: ignore # noqa: PGH003  polars 1.0 typing stuff
+        if not stream and not native:
+            self.lf = self.__csv_scan(path, quarantine=quarantine)
+            if regions is not None:
+                self.lf = self.lf.filter(regions_filter(regions))
+
+        if behavior & VcfParsingBehavior.GVCF:
+            self.__blocks = self.lf.filter(normalization.is_reference_block())
+            self.lf = normalization.drop_reference_blocks(self.lf, self.header)
+
+        if behavior & VcfParsingBehavior.SPLIT_MULTIALLELIC:
+            self.lf = normalization.split_multiallelic(self.lf, self.header)
+
+        if reference is not None:
+            self.lf = normalization.left_align(self.lf, reference)
 
         if behavior & VcfParsingBehavior.MANAGE_SV:
-            self.lf = self.lf.with_columns(self.header.info_parser({"SVTYPE", "SVLEN"}))
+            self.lf = self.lf.with_columns(self.__info_fields({"SVTYPE", "SVLEN"}))
 
         if behavior & VcfParsingBehavior.KEEP_STAR:
             self.lf = self.lf.filter(polars.col("alt") != "*")
 
-        self.lf = normalization.add_variant_id(self.lf, chr2len.lf)
+        self.lf = normalization.add_variant_id(self.lf, chr2len.lf, wide=bool(behavior & VcfParsingBehavior.WIDE_ID))
 
         if behavior & VcfParsingBehavior.MANAGE_SV:
             self.lf = self.lf.drop("SVTYPE", "SVLEN", strict=False)
 
+    def __parse_header(self, lines: typing.Iterable[str], path: pathlib.Path) -> None:
+        """Parse header lines, raise NotAVCFError if lines isn't a vcf header."""
+        try:
+            self.header.from_lines(iter(lines))
+        except NotVcfHeaderError as e:
+            raise NotAVCFError(path) from e
+
+    @staticmethod
+    def __bcf_header(path: pathlib.Path) -> list[str]:
+        """Read header lines of a bcf with native reader, raise NotAVCFError if variantplaner_rs didn't provide it."""
+        try:
+            reader = vcf_reader(path, [])
+        except ImportError as e:
+            logger.error("variantplaner_rs didn't provide vcf reader, bcf can't be read")  # noqa: TRY400 error is reraise with another type
+            raise NotAVCFError(path) from e
+
+        try:
+            return reader.header()
+        except polars.exceptions.ComputeError as e:
+            raise NotAVCFError(path) from e
+
+    def __stream_scan(
+        self,
+        path: pathlib.Path,
+        threads: int,
+        regions: list[tuple[str, int, int]] | None,
+        *,
+        native: bool,
+        quarantine: pathlib.Path | None = None,
+        typed_info: bool = False,
+    ) -> polars.LazyFrame:
+        """Read header of a stream and spool its records in temporary parquet files, one file by batch."""
+        reader = None
+        if native:
+            try:
+                reader = vcf_reader(path, [], threads=threads, regions=regions, quarantine=quarantine)
+            except ImportError:
+                logger.info("variantplaner_rs didn't provide vcf reader, fallback on polars.read_csv")
+
+        fh = None
+        if reader is not None:
+            try:
+                lines = reader.header()
+            except polars.exceptions.ComputeError as e:
+                raise NotAVCFError(path) from e
+            self.__parse_header(lines, path)
+        else:
+            fh = open_stream(path)
+            self.__parse_header(fh, path)
+
+        column_names = list(self.header.column_name(SAMPLE_COL_BEGIN))
+        schema = {name: Vcf.schema().get(name, polars.String) for name in column_names}
+
+        batches: typing.Iterable[polars.DataFrame]
+        if reader is not None:
+            reader.column_names = column_names
+            if typed_info:
+                reader.info = self.__info_definitions()
+            batches = reader
+        else:
+            batches = Vcf.__csv_batches(
+                fh,  # type: ignore[arg-type]
+                schema,
+                regions,
+                first_line=len(self.header._header) + 1,
+                quarantine=quarantine,
+            )
+
+        return self.__spool_batches(batches, schema)
+
+    def __spool_batches(
+        self,
+        batches: typing.Iterable[polars.DataFrame],
+        schema: dict[str, polars.PolarsDataType],
+    ) -> polars.LazyFrame:
+        """Write batches in temporary parquet files of spool directory, one file by batch."""
+        spool_path = pathlib.Path(tempfile.mkdtemp(prefix="records_", dir=self.__spool_path()))
+
+        empty = True
+        for index, batch in enumerate(batches):
+            batch.write_parquet(spool_path / f"{index:010}.parquet")
+            empty = False
+
+        if empty:
+            return polars.LazyFrame(schema=schema)
+
+        return polars.scan_parquet(spool_path / "*.parquet")
+
+    def __spool_lazyframe(self, lf: polars.LazyFrame, prefix: str) -> polars.LazyFrame:
+        """Write lazyframe with streaming engine in a temporary parquet file of spool directory and scan it."""
+        spool_path = pathlib.Path(tempfile.mkdtemp(prefix=prefix, dir=self.__spool_path())) / "data.parquet"
+        lf.sink_parquet(spool_path)
+
+        return polars.scan_parquet(spool_path)
+
+    def __spool_path(self) -> pathlib.Path:
+        """Directory of temporary parquet files (in `TMPDIR`), it lives as long as Vcf object."""
+        if self.__spool is None:
+            self.__spool = tempfile.TemporaryDirectory(prefix="variantplaner_")
+
+        return pathlib.Path(self.__spool.name)
+
+    @staticmethod
+    def __csv_batches(
+        fh: typing.TextIO,
+        schema: dict[str, polars.PolarsDataType],
+        regions: list[tuple[str, int, int]] | None,
+        *,
+        first_line: int = 1,
+        quarantine: pathlib.Path | None = None,
+    ) -> typing.Iterator[polars.DataFrame]:
+        """Parse records of fh by batch of STREAM_BATCH_SIZE lines with polars.read_csv.
+
+        If `quarantine` is set, malformed records are written in it, `first_line` is the line number of first record.
+        """
+        keep = None if regions is None else regions_filter(regions)
+
+        with fh, open(quarantine, "wb") if quarantine is not None else contextlib.nullcontext() as rejected_fh:
+            while lines := list(itertools.islice(fh, STREAM_BATCH_SIZE)):
+                data = "".join(lines).encode()
+                if rejected_fh is None:
+                    batch = polars.read_csv(
+                        data,
+                        separator="\t",
+                        comment_prefix="#",
+                        has_header=False,
+                        schema=schema,
+                    )
+                else:
+                    raw = polars.read_csv(
+                        data,
+                        separator="\t",
+                        comment_prefix="#",
+                        has_header=False,
+                        new_columns=list(schema.keys()),
+                        infer_schema_length=0,
+                        truncate_ragged_lines=True,
+                    ).lazy()
+                    valid, rejected = Vcf.__split_malformed(raw, first_line)
+                    Vcf.__write_malformed(rejected, rejected_fh)
+                    batch = valid.cast(schema).collect()  # type: ignore # noqa: PGH003  polars 1.0 typing stuff
+                    first_line += len(lines)
+
+                if keep is not None:
+                    batch = batch.filter(keep)
+
+                yield batch
+
+    def __native_scan(
+        self,
+        path: pathlib.Path,
+        threads: int,
+        regions: list[tuple[str, int, int]] | None,
+        *,
+        quarantine: pathlib.Path | None = None,
+        typed_info: bool = False,
+    ) -> polars.LazyFrame:
+        """Build a lazyframe on top of variantplaner_rs vcf reader.
+
+        Without polars io plugins, only bcf use native reader, records are read once and spooled in temporary parquet files.
+        """
+        column_names = list(self.header.column_name(SAMPLE_COL_BEGIN))
+        info = self.__info_definitions() if typed_info and "info" in column_names else None
+
+        schema: dict[str, polars.PolarsDataType] = {}
+        for name in column_names:
+            schema[name] = Vcf.schema().get(name, polars.String)
+            if name == "info" and info:
+                schema[INFO_STRUCT_COLUMN] = Vcf.__info_dtype(info)
+
+        def open_reader() -> typing.Any:
+            reader = vcf_reader(path, column_names, threads=threads, regions=regions, quarantine=quarantine)
+            reader.info = info
+
+            return reader
+
+        readers = [open_reader()]
+
+        if register_io_source is None:
+            return self.__spool_batches(readers.pop(), schema)
+
+        def source(
+            with_columns: list[str] | None,
+            predicate: polars.Expr | None,
+            n_rows: int | None,
+            _batch_size: int | None,
+        ) -> typing.Iterator[polars.DataFrame]:
+            reader = readers.pop() if readers else open_reader()
+            for batch in reader:
+                df = batch if predicate is None else batch.filter(predicate)
+                if with_columns is not None:
+                    df = df.select(with_columns)
+                if n_rows is not None:
+                    df = df.head(n_rows)
+                    n_rows -= df.height
+
+                yield df
+
+                if n_rows is not None and n_rows <= 0:
+                    return
+
+        return register_io_source(source, schema=schema)
+
+    def __csv_scan(self, path: pathlib.Path, *, quarantine: pathlib.Path | None = None) -> polars.LazyFrame:
+        """Build a lazyframe with polars.scan_csv.
+
+        polars can't scan compressed csv, compressed vcf are read with [polars.read_csv][].
+
+        If `quarantine` is set, all columns are read as string, malformed records are written in it and removed.
+        """
+        csv_args: dict[str, typing.Any] = {
+            "separator": "\t",
+            "comment_prefix": "#",
+            "has_header": False,
+            "schema_overrides": Vcf.schema(),
+            "new_columns": list(Vcf.schema().keys()),
+        }
+        if quarantine is not None:
+            del csv_args["schema_overrides"]
+            csv_args["infer_schema_length"] = 0
+            csv_args["truncate_ragged_lines"] = True
+
+        lf = polars.read_csv(path, **csv_args).lazy() if is_compressed(path) else polars.scan_csv(path, **csv_args)
+
+        schema = lf.collect_schema()
+        lf = lf.rename(dict(zip(schema.names(), self.header.column_name(schema.len()))))
+
+        if quarantine is not None:
+            lf, rejected = Vcf.__split_malformed(lf, len(self.header._header) + 1)
+            with open(quarantine, "wb") as fh:
+                Vcf.__write_malformed(rejected, fh)
+
+        return lf.cast(Vcf.schema())  # type: ignore # noqa: PGH003  polars 1.0 typing stuff
+
+    @staticmethod
+    def __split_malformed(lf: polars.LazyFrame, first_line: int) -> tuple[polars.LazyFrame, polars.LazyFrame]:
+        """Split records read as string in valid and malformed records.
+
+        Malformed records lazyframe contains line number (computed from `first_line`), reason and record.
+        """
+        columns = lf.collect_schema().names()
+        pos = polars.col(columns[1])
+
+        reason = (
+            polars.when(polars.col(columns[0]).is_null())
+            .then(polars.lit("chromosome is empty"))
+            .when(pos.is_null())
+            .then(polars.lit("position is empty"))
+            .when(pos.cast(polars.UInt64, strict=False).is_null())
+            .then(polars.format("position '{}' isn't an integer", pos))
+            .when(polars.col(columns[-1]).is_null())
+            .then(polars.lit(f"record is truncated, {len(columns)} fields expected"))
+            .alias("reason")
+        )
+
+        lf = lf.with_row_index("line", offset=first_line).with_columns(reason)
+
+        valid = lf.filter(polars.col("reason").is_null()).drop("line", "reason")
+        rejected = lf.filter(polars.col("reason").is_not_null()).select(
+            "line",
+            "reason",
+            polars.concat_str(columns, separator="\t", ignore_nulls=True).alias("record"),
+        )
+
+        return valid, rejected
+
+    @staticmethod
+    def __write_malformed(rejected: polars.LazyFrame, fh: typing.BinaryIO) -> None:
+        """Append malformed records in quarantine file."""
+        df = rejected.collect()
+        if df.height:
+            df.write_csv(fh, separator="\t", include_header=False, quote_style="never")
+
     def variants(self) -> Variants:
         """Get variants of vcf."""
         return self.lf.select(Variants.minimal_schema())
@@ -104,30 +456,110 @@ class Vcf:
         """Set variants of vcf."""
         self.lf = variants.lf
 
-    def genotypes(self, format_str: str = "GT:AD:DP:GQ") -> Genotypes:
-        """Get genotype of vcf."""
+    def spool(self) -> None:
+        """Write parsed records with streaming engine in a temporary parquet file (in `TMPDIR`) and read them from it.
+
+        Vcf is parsed and variant id computed once, next plans (variants, genotypes, annotations) read spooled records, it's useful to write many outputs of the same vcf with bounded memory.
+        """
+        self.lf = self.__spool_lazyframe(self.lf, "spool_")
+
+    def genotypes(
+        self,
+        format_str: str = "GT:AD:DP:GQ",
+        *,
+        samples_batch_size: int | None = None,
+        per_record_format: bool = False,
+        compact: bool = False,
+        gt_packed: bool = False,
+        min_gq: int | None = None,
+        min_dp: int | None = None,
+        min_ab: float | None = None,
+        pass_only: bool = False,
+    ) -> Genotypes:
+        """Get genotype of vcf.
+
+        By default only records with a FORMAT that starts with `format_str` are kept. If `per_record_format` is True, position of each `format_str` key is resolved for each record, once by distinct FORMAT value, all records are kept and missing keys are set to null.
+
+        If format contains GT, it's decoded in `gt`, number of alternative alleles. If `gt_packed` is True, GT is also kept without loss in `gt_packed`, allele index + 1 on 8 bits for each allele from bit 8 (0 is a missing allele), phase in bit 4 and ploidy in bits 0-3. Calls without alternative allele are dropped in each sample column before unpivot. If `samples_batch_size` is set, sample columns are unpivot by batch of this size: records are parsed once and written with streaming engine in a temporary parquet file (in `TMPDIR`, it needs space for selected columns), each batch only read its columns in it, memory usage stay bounded for vcf with many samples.
+
+        Quality filters are applied in the same way before unpivot: calls with GQ lower than `min_gq`, DP lower than `min_dp` or allele balance (alternative AD over sum of AD) lower than `min_ab` are dropped, a missing value fails the filter. Key used by a filter must be present in `format_str`. If `pass_only` is True only records with FILTER equal to PASS are kept.
+
+        If `compact` is True, Float fields are parsed as Float32, Integer fields as Int32 and [Genotypes.compact][variantplaner.objects.Genotypes.compact] is applied with vcf header, compact schema only depends on vcf header so it's the same for all outputs of same FORMAT.
+        """
         schema = self.lf.collect_schema()
 
         if "format" not in schema.names():
             raise NoGenotypeError
 
-        lf = self.lf.select([*schema.names()[schema.names().index("format") :]])
+        lf = self.lf.filter(polars.col("filter") == "PASS") if pass_only else self.lf
+        lf = lf.select([*schema.names()[schema.names().index("format") :]])
         schema = lf.collect_schema()
 
-        # Clean bad variant
-        lf = lf.filter(polars.col("format").str.starts_with(format_str)).select(*schema.names()[1:])
+        samples = [name for name in schema.names()[1:] if name != "id"]
+        if not samples:
+            raise NoGenotypeError
 
         # Found index of genotype value
-        col_index = {
-            key: index
-            for (index, key) in enumerate(
-                format_str.split(":"),
+        col_index: dict[str, int | polars.Expr]
+        if per_record_format:
+            keys = format_str.split(":")
+            lf = lf.select(
+                polars.col("format").vcf_format.index(keys).alias("format_index"),  # type: ignore # noqa: PGH003
+                *schema.names()[1:],
             )
+            col_index = {key: polars.col("format_index").struct.field(key) for key in keys}
+            index_columns = ["id", "format_index"]
+        else:
+            # Clean bad variant
+            lf = lf.filter(polars.col("format").str.starts_with(format_str)).select(*schema.names()[1:])
+            col_index = {
+                key: index
+                for (index, key) in enumerate(
+                    format_str.split(":"),
+                )
+            }
+            index_columns = ["id"]
+
+        # Split genotype column in sub value
+        col2expr = self.header.format_parser(compact=compact)
+        filter_gt = "GT" in col_index and "GT" in col2expr
+
+        thresholds = {
+            key: value for key, value in (("GQ", min_gq), ("DP", min_dp), ("AD", min_ab)) if value is not None
         }
+        missing = [key for key in thresholds if key not in col_index]
+        if missing:
+            msg = f"quality filter require {', '.join(missing)} in format string {format_str}"
+            raise ValueError(msg)
+
+        # Drop call without alternative allele or with low quality before pivot
+        if filter_gt or thresholds:
+            samples_expr = [
+                polars.when(self.__keep_call(sample, col_index, thresholds, gt=filter_gt))
+                .then(polars.col(sample))
+                .alias(sample)
+                for sample in samples
+            ]
+        else:
+            samples_expr = [polars.col(sample) for sample in samples]
 
         # Pivot value
+        batch_size = len(samples) if samples_batch_size is None else max(samples_batch_size, 1)
+        if batch_size < len(samples):
+            # parse source once, batches project their columns in spooled records
+            lf = self.__spool_lazyframe(lf.select(*index_columns, *samples_expr), "genotypes_")
+            samples_expr = [polars.col(sample) for sample in samples]
+
+        batches = []
+        for begin in range(0, len(samples), batch_size):
+            batch = lf.select(*index_columns, *samples_expr[begin : begin + batch_size]).unpivot(index=index_columns)
+            if filter_gt or thresholds:
+                batch = batch.drop_nulls("value")
+            batches.append(batch)
+
         genotypes = Genotypes()
-        genotypes.lf = lf.unpivot(index=["id"]).with_columns(
+        genotypes.lf = polars.concat(batches, how="vertical") if len(batches) > 1 else batches[0]
+        genotypes.lf = genotypes.lf.with_columns(
             [
                 polars.col("id"),
                 polars.col("variable").alias("sample"),
@@ -135,12 +567,9 @@ class Vcf:
             ],
         )
 
-        # Split genotype column in sub value
-        col2expr = self.header.format_parser()
-
         genotypes.lf = genotypes.lf.with_columns(
             [
-                polars.col("value").list.get(index).pipe(function=col2expr[col], col_name=col)
+                polars.col("value").list.get(index, null_on_oob=True).pipe(function=col2expr[col], col_name=col)
                 for col, index in col_index.items()
             ],
         )
@@ -148,11 +577,59 @@ class Vcf:
         # Select intrusting column
         genotypes.lf = genotypes.lf.select(["id", "sample", *[col.lower() for col in col_index]])
 
-        if "gt".upper() in col2expr:
-            genotypes.lf = genotypes.lf.filter(polars.col("gt") != 0)
+        if filter_gt:
+            genotypes.lf = genotypes.lf.unnest("gt").filter(polars.col("gt") != 0)
+            if not gt_packed:
+                genotypes.lf = genotypes.lf.drop("gt_packed")
+
+        if compact:
+            genotypes.compact(self.header)
 
         return genotypes
 
+    @staticmethod
+    def __keep_call(
+        sample: str,
+        col_index: dict[str, int | polars.Expr],
+        thresholds: dict[str, int | float],
+        *,
+        gt: bool,
+    ) -> polars.Expr:
+        """Expression true if call of sample column is carrier (if `gt` is True) and pass all quality thresholds."""
+        keep = Vcf.__carrier(sample, col_index["GT"]) if gt else polars.lit(value=True)
+
+        for key, threshold in thresholds.items():
+            value = Vcf.__subfield(sample, col_index[key])
+            if key == "AD":
+                depths = value.str.split(",").list.eval(polars.element().cast(polars.Int64, strict=False))
+                total = depths.list.sum()
+                value = polars.when(total > 0).then((total - depths.list.first()) / total)
+            else:
+                value = value.cast(polars.Int64, strict=False)
+
+            keep &= (value >= threshold).fill_null(value=False)
+
+        return keep
+
+    @staticmethod
+    def __subfield(sample: str, index: int | polars.Expr) -> polars.Expr:
+        """Expression extract subfield at index of sample column, null if subfield is missing."""
+        if isinstance(index, polars.Expr):
+            return polars.col(sample).str.split(":").list.get(index, null_on_oob=True)
+
+        return polars.col(sample).str.splitn(":", index + 2).struct.field(f"field_{index}")
+
+    @staticmethod
+    def __carrier(sample: str, gt_index: int | polars.Expr) -> polars.Expr:
+        """Expression true if GT subfield of sample column contains an alternative allele.
+
+        If position of GT is resolved per record, GT is the first subfield as required by vcf specification.
+        """
+        if isinstance(gt_index, polars.Expr):
+            return gt_index.is_not_null() & Vcf.__carrier(sample, 0)
+
+        return Vcf.__subfield(sample, gt_index).str.contains("[1-9]")
+
     def add_genotypes(self, genotypes_lf: Genotypes) -> None:
         """Add genotypes information in vcf."""
         for sample in genotypes_lf.samples_names():
@@ -164,13 +641,225 @@ class Vcf:
                 .drop("sample")
             )
 
-            self.lf = self.lf.join(geno2sample, on="id", how="full", coalesce=True)
+            self.lf = normalization.join_on_id(self.lf, geno2sample, "full")
+
+    def coverage(self) -> polars.LazyFrame:
+        """Get coverage intervals of gVCF reference blocks.
+
+        Each reference block produce one row by sample with a called genotype: chr, start and end (1-based inclusive, end is END INFO field), sample, dp (MIN_DP if present otherwise DP) and gq. If vcf wasn't read with [VcfParsingBehavior.GVCF][variantplaner.objects.VcfParsingBehavior.GVCF] result is empty.
+        """
+        if self.__blocks is None:
+            return polars.LazyFrame(schema=Vcf.coverage_schema())
+
+        names = self.__blocks.collect_schema().names()
+        if "format" not in names:
+            raise NoGenotypeError
+
+        key_index = Vcf.__key_index
+        ref_end = polars.col("pos") + polars.col("ref").str.len_bytes().clip(lower_bound=1) - 1
+        lf = self.__blocks.select(
+            "chr",
+            *names[names.index("format") + 1 :],
+            start=polars.col("pos"),
+            end=polars.col("info").str.extract(r"(?:^|;)END=(\d+)", 1).cast(polars.UInt64).fill_null(ref_end),
+            _gt=key_index("GT"),
+            _dp=polars.coalesce(key_index("MIN_DP"), key_index("DP")),
+            _gq=key_index("GQ"),
+        ).unpivot(index=["chr", "start", "end", "_gt", "_dp", "_gq"], variable_name="sample")
+
+        fields = polars.col("value").str.split(":")
+        lf = lf.with_columns(
+            gt=fields.list.get(polars.col("_gt"), null_on_oob=True),
+            dp=fields.list.get(polars.col("_dp"), null_on_oob=True).cast(polars.UInt32, strict=False),
+            gq=fields.list.get(polars.col("_gq"), null_on_oob=True).cast(polars.UInt32, strict=False),
+        )
+
+        return lf.filter(polars.col("gt").str.contains(r"\d")).select(Vcf.coverage_schema().keys())
+
+    def stats(self, *, samples_batch_size: int | None = None) -> polars.LazyFrame:
+        """Get quality control statistics of each sample.
+
+        One row by sample with number of records, missing genotypes and missingness, heterozygous and homozygous alternative calls and their ratio, SNV, indel, transition and transversion calls and Ti/Tv ratio, minimum, first quartile, median, third quartile, maximum and mean of DP and GQ of called genotypes. Variant type of a call is type of its highest alternative allele, ratio with a null denominator are null.
+
+        Statistics are aggregated from sample columns of parsed vcf, if `samples_batch_size` is set sample columns are unpivot by batch of this size.
+        """
+        names = self.lf.collect_schema().names()
+        if "format" not in names:
+            raise NoGenotypeError
+
+        samples = [name for name in names[names.index("format") + 1 :] if name != "id"]
+        if not samples:
+            raise NoGenotypeError
+
+        index_columns = ["ref", "alt", "_gt", "_dp", "_gq"]
+        lf = self.lf.select(
+            "ref",
+            "alt",
+            *samples,
+            _gt=Vcf.__key_index("GT"),
+            _dp=Vcf.__key_index("DP"),
+            _gq=Vcf.__key_index("GQ"),
+        )
+
+        fields = polars.col("value").str.split(":")
+        gt = fields.list.get(polars.col("_gt"), null_on_oob=True)
+        alleles = gt.str.extract_all(r"\d+").list.eval(polars.element().cast(polars.UInt32))
+        allele = alleles.list.max()
+        alt = polars.col("alt").str.split(",").list.get(allele.cast(polars.Int64) - 1, null_on_oob=True)
+        ref = polars.col("ref")
+
+        carrier = polars.col("called") & (allele > 0)
+        snv = carrier & ref.str.contains(r"^[ACGT]$") & alt.str.contains(r"^[ACGT]$")
+        transition = snv & (ref + alt).is_in(["AG", "GA", "CT", "TC"])
+
+        def ratio(numerator: str, denominator: str) -> polars.Expr:
+            return polars.when(polars.col(denominator) > 0).then(polars.col(numerator) / polars.col(denominator))
+
+        def distribution(name: str) -> list[polars.Expr]:
+            value = polars.col(name).filter(polars.col("called"))
+            return [
+                value.min().alias(f"{name}_min"),
+                value.quantile(0.25, interpolation="nearest").alias(f"{name}_q1"),
+                value.median().alias(f"{name}_median"),
+                value.quantile(0.75, interpolation="nearest").alias(f"{name}_q3"),
+                value.max().alias(f"{name}_max"),
+                value.mean().alias(f"{name}_mean"),
+            ]
+
+        batch_size = len(samples) if samples_batch_size is None else max(samples_batch_size, 1)
+        batches = []
+        for begin in range(0, len(samples), batch_size):
+            batch = (
+                lf.select(*index_columns, *samples[begin : begin + batch_size])
+                .unpivot(index=index_columns, variable_name="sample")
+                .with_columns(
+                    called=gt.str.contains(r"\d").fill_null(value=False),
+                    dp=fields.list.get(polars.col("_dp"), null_on_oob=True).cast(polars.UInt32, strict=False),
+                    gq=fields.list.get(polars.col("_gq"), null_on_oob=True).cast(polars.UInt32, strict=False),
+                )
+                .group_by("sample", maintain_order=True)
+                .agg(
+                    polars.len().cast(polars.UInt64).alias("records"),
+                    (~polars.col("called")).sum().cast(polars.UInt64).alias("missing"),
+                    (carrier & (alleles.list.n_unique() > 1)).sum().cast(polars.UInt64).alias("het"),
+                    (carrier & (alleles.list.n_unique() == 1)).sum().cast(polars.UInt64).alias("hom_alt"),
+                    snv.sum().cast(polars.UInt64).alias("snv"),
+                    (carrier & ~alt.str.contains(r"[<>\[\]*]") & (ref.str.len_bytes() != alt.str.len_bytes()))
+                    .sum()
+                    .cast(polars.UInt64)
+                    .alias("indel"),
+                    transition.sum().cast(polars.UInt64).alias("transition"),
+                    (snv & ~transition).sum().cast(polars.UInt64).alias("transversion"),
+                    *distribution("dp"),
+                    *distribution("gq"),
+                )
+            )
+            batches.append(batch)
+
+        stats = polars.concat(batches, how="vertical") if len(batches) > 1 else batches[0]
+        return stats.with_columns(
+            missingness=ratio("missing", "records"),
+            het_hom_ratio=ratio("het", "hom_alt"),
+            ti_tv=ratio("transition", "transversion"),
+        ).select(Vcf.stats_schema().keys())
+
+    @staticmethod
+    def __key_index(key: str) -> polars.Expr:
+        """Expression get index of key in FORMAT of each record, null if key is missing."""
+        keys = polars.col("format").str.split(":")
+
+        return polars.when(keys.list.contains(key)).then(keys.list.eval(polars.element() == key).list.arg_max())
 
     def annotations(self, select_info: set[str] | None = None) -> Annotations:
         """Get annotations of vcf."""
-        lf = self.lf.with_columns(self.lf.header.info_parser(select_info))
+        drop_columns = ["chr", "pos", "ref", "alt", "format", "info", INFO_STRUCT_COLUMN]
+
+        info_struct = self.info_struct(select_info)
+        if info_struct is None:
+            return self.lf.drop(drop_columns, strict=False)
+
+        return self.lf.select(polars.exclude(drop_columns), info_struct).unnest("info")
+
+    def info_struct(self, select_info: set[str] | None = None) -> polars.Expr | None:
+        """Get an expression that produce a struct named info with selected INFO fields.
+
+        If native reader decoded INFO in `info_struct` column, fields are taken from it, otherwise info column is parsed by [VcfHeader.info_struct][variantplaner.objects.VcfHeader.info_struct].
+
+        Returns:
+        A [polars.Expr](https://pola-rs.github.io/polars/py-polars/html/reference/expressions/index.html), None if no info field are selected.
+        """
+        if INFO_STRUCT_COLUMN not in self.lf.collect_schema().names():
+            return self.header.info_struct(select_info)
+
+        fields = self.__info_fields(select_info)
+        if not fields:
+            return None
+
+        return polars.struct(fields).alias("info")
+
+    def __info_fields(self, select_info: set[str] | None = None) -> list[polars.Expr]:
+        """Expressions of selected INFO fields, taken in `info_struct` column if present, otherwise parsed from info column."""
+        if INFO_STRUCT_COLUMN not in self.lf.collect_schema().names():
+            return self.header.info_parser(select_info)
+
+        return [
+            polars.col(INFO_STRUCT_COLUMN).struct.field(name)
+            for name in self.header.model.info
+            if not select_info or name in select_info
+        ]
+
+    def __info_definitions(self) -> list[tuple[str, str, str]] | None:
+        """Get name, number and type of INFO fields declared in header, None if header didn't declare INFO field."""
+        return [(name, number, info_type) for (name, (number, info_type)) in self.header.model.info.items()] or None
 
-        return lf.drop("chr", "pos", "ref", "alt", "format", "info")
+    @staticmethod
+    def __info_dtype(definitions: list[tuple[str, str, str]]) -> polars.PolarsDataType:
+        """Get type of `info_struct` column decoded by native reader."""
+        types = {"Integer": polars.Int64, "Float": polars.Float64}
+
+        fields: dict[str, polars.PolarsDataType] = {}
+        for name, number, info_type in definitions:
+            dtype = types.get(info_type, polars.String)
+            fields[name] = dtype if number == "1" else polars.List(dtype)
+
+        return polars.Struct(fields)
+
+    @classmethod
+    def coverage_schema(cls) -> collections.abc.Mapping[str, polars._typing.PolarsDataType]:
+        """Get schema of coverage polars.LazyFrame."""
+        return {
+            "chr": polars.String,
+            "start": polars.UInt64,
+            "end": polars.UInt64,
+            "sample": polars.String,
+            "dp": polars.UInt32,
+            "gq": polars.UInt32,
+        }
+
+    @classmethod
+    def stats_schema(cls) -> collections.abc.Mapping[str, polars._typing.PolarsDataType]:
+        """Get schema of stats polars.LazyFrame."""
+        distribution = {
+            f"{name}_{stat}": polars.UInt32 if stat in {"min", "max"} else polars.Float64
+            for name in ("dp", "gq")
+            for stat in ("min", "q1", "median", "q3", "max", "mean")
+        }
+
+        return {
+            "sample": polars.String,
+            "records": polars.UInt64,
+            "missing": polars.UInt64,
+            "missingness": polars.Float64,
+            "het": polars.UInt64,
+            "hom_alt": polars.UInt64,
+            "het_hom_ratio": polars.Float64,
+            "snv": polars.UInt64,
+            "indel": polars.UInt64,
+            "transition": polars.UInt64,
+            "transversion": polars.UInt64,
+            "ti_tv": polars.Float64,
+            **distribution,
+        }
 
     @classmethod
     def schema(cls) -> collections.abc.Mapping[str, polars._typing.PolarsDataType]:
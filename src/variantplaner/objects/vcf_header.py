@@ -3,8 +3,15 @@
 # std import
 from __future__ import annotations
 
+import dataclasses
 import functools
+import hashlib
+import json
+import logging
+import os
+import pathlib
 import re
+import threading
 import typing
 
 # 3rd party import
@@ -12,17 +19,105 @@ import polars
 
 # project import
 from variantplaner.exception import NotVcfHeaderError
-
-# type checking block
-if typing.TYPE_CHECKING:  # pragma: no cover
-    import pathlib
+from variantplaner.io.cache import LruCache
+from variantplaner.io.vcf import open_vcf
+from variantplaner_rs import VcfFormat, VcfInfo  # noqa: F401 ruff miss this import is use
 
 MINIMAL_COL_NUMBER: int = 8
 SAMPLE_COL_BEGIN: int = 9
 
+INFO_RE = re.compile(
+    r"ID=(?P<id>([A-Za-z_][0-9A-Za-z_.]*|1000G)),Number=(?P<number>[ARG0-9\.]+),Type=(?P<type>Integer|Float|String|Character)",
+)
+FORMAT_RE = re.compile(
+    r"ID=(?P<id>[A-Za-z_][0-9A-Za-z_.]*),Number=(?P<number>[ARG0-9\.]+),Type=(?P<type>Integer|Float|String|Character)",
+)
+FILTER_RE = re.compile(r"ID=(?P<id>[^,>]+)")
+CONTIG_ID_RE = re.compile(r"ID=(?P<id>[^,]+)")
+CONTIG_LENGTH_RE = re.compile(r"length=(?P<length>[^,>]+)")
+
+logger = logging.getLogger("objects.vcf_header")
+
+
+@dataclasses.dataclass
+class HeaderModel:
+    """Structured content of a vcf header."""
+
+    info: dict[str, tuple[str, str]]
+    """Info id associate to number and type"""
+
+    format: dict[str, tuple[str, str]]
+    """Format id associate to number and type"""
+
+    filters: list[str]
+    """Filter id"""
+
+    contigs: list[tuple[str, int | None]]
+    """Contig id and length, length is None if not present"""
+
+    samples: list[str] | None
+    """Samples name, None if vcf didn't have FORMAT column"""
+
+    @classmethod
+    def from_lines(cls, lines: list[str]) -> HeaderModel:
+        """Parse header lines.
+
+        Raises:
+        NotVcfHeaderError: If no line start by '#CHROM'
+        """
+        model = cls(info={}, format={}, filters=[], contigs=[], samples=None)
+
+        for line in lines:
+            if line.startswith("#CHROM"):
+                split_line = line.strip().split("\t")
+                if len(split_line) > MINIMAL_COL_NUMBER:
+                    model.samples = split_line[SAMPLE_COL_BEGIN:]
+                return model
+
+            if line.startswith("##INFO") and (search := INFO_RE.search(line)):
+                model.info[search["id"]] = (search["number"], search["type"])
+            elif line.startswith("##FORMAT") and (search := FORMAT_RE.search(line)):
+                model.format[search["id"]] = (search["number"], search["type"])
+            elif line.startswith("##FILTER") and (search := FILTER_RE.search(line)):
+                model.filters.append(search["id"])
+            elif line.startswith("##contig"):
+                id_match = CONTIG_ID_RE.search(line)
+                len_match = CONTIG_LENGTH_RE.search(line)
+                model.contigs.append(
+                    (
+                        id_match["id"] if id_match else "",
+                        int(len_match["length"]) if len_match and id_match else None,
+                    ),
+                )
+
+        raise NotVcfHeaderError
+
+    @classmethod
+    def from_json(cls, data: dict[str, typing.Any]) -> HeaderModel:
+        """Build model from result of json serialization."""
+        return cls(
+            info={key: tuple(value) for (key, value) in data["info"].items()},
+            format={key: tuple(value) for (key, value) in data["format"].items()},
+            filters=data["filters"],
+            contigs=[tuple(contig) for contig in data["contigs"]],
+            samples=data["samples"],
+        )
+
+
+MODEL_CACHE: LruCache[str, HeaderModel] = LruCache()
+"""Process level cache of header model, key is header fingerprint"""
+
+EXPRESSIONS_CACHE: LruCache[tuple[str, str, frozenset[str] | None, bool], typing.Any] = LruCache()
+"""Process level cache of expression build from header"""
+
 
 class VcfHeader:
-    """Object that parse and store vcf information."""
+    """Object that parse and store vcf information.
+
+    Header is parsed once in a [HeaderModel][variantplaner.objects.vcf_header.HeaderModel], model and expressions build from it are cached in process by header fingerprint, only the [CACHE_SIZE][variantplaner.io.cache.CACHE_SIZE] most recently used are kept. If `cache_dir` is set, or environment variable `VARIANTPLANER_CACHE_DIR` when model is parsed, models are also cached on disk.
+    """
+
+    cache_dir: pathlib.Path | None = None
 
     def __init__(self):
         """Initialise VcfHeader."""
@@ -32,16 +127,18 @@ class VcfHeader:
         """Populate VcfHeader object with content of only header file.
 
         Args:
-        path: Path of file
+        path: Path of file, could be gzip or bgzip compressed
 
         Returns:
         None
         """
-        with open(path) as fh:
+        with open_vcf(path) as fh:
             for full_line in fh:
                 line = full_line.strip()
                 self._header.append(line)
 
+        self.__clear_cache()
+
     def from_lines(self, lines: typing.Iterator[str]) -> None:
         """Extract all header information of vcf lines.
 
@@ -64,12 +161,99 @@ class VcfHeader:
 
             if line.startswith("#CHROM"):
                 self._header.append(line)
+                self.__clear_cache()
                 return
 
             self._header.append(line)
 
         raise NotVcfHeaderError
 
+    def __clear_cache(self) -> None:
+        """Remove value of cached property compute on previous header content."""
+        for name in ("fingerprint", "model", "samples_index"):
+            self.__dict__.pop(name, None)
+
+    @functools.cached_property
+    def fingerprint(self) -> str:
+        """Fingerprint of header content."""
+        return hashlib.sha256("\n".join(self._header).encode()).hexdigest()
+
+    @functools.cached_property
+    def model(self) -> HeaderModel:
+        """Structured content of header, get from cache if an header with same fingerprint was already parsed.
+
+        Raises:
+        NotVcfHeaderError: If no line start by '#CHROM'
+        """
+        if (model := MODEL_CACHE.get(self.fingerprint)) is not None:
+            return model
+
+        cache_dir = VcfHeader.__cache_dir()
+        cache_path = None if cache_dir is None else cache_dir / f"{self.fingerprint}.json"
+
+        model = None if cache_path is None else VcfHeader.__read_cache(cache_path)
+        if model is None:
+            model = HeaderModel.from_lines(self._header)
+
+            if cache_path is not None:
+                VcfHeader.__write_cache(cache_path, model)
+
+        MODEL_CACHE[self.fingerprint] = model
+
+        return model
+
+    @staticmethod
+    def __read_cache(cache_path: pathlib.Path) -> HeaderModel | None:
+        """Read model in disk cache, None if entry is missing or can't be read."""
+        if not cache_path.is_file():
+            return None
+
+        try:
+            with open(cache_path) as fh:
+                return HeaderModel.from_json(json.load(fh))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            logger.warning(f"Can't read header cache {cache_path}, entry is ignored")
+            return None
+
+    @staticmethod
+    def __write_cache(cache_path: pathlib.Path, model: HeaderModel) -> None:
+        """Write model in disk cache, file is replaced atomically, a concurrent reader never see a partial entry."""
+        tmp_path = cache_path.with_name(f".{cache_path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w") as fh:
+                json.dump(dataclasses.asdict(model), fh)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            logger.warning(f"Can't write header cache in {cache_path}")
+            tmp_path.unlink(missing_ok=True)
+
+    @staticmethod
+    def __cache_dir() -> pathlib.Path | None:
+        """Directory of disk cache, `cache_dir` or environment variable `VARIANTPLANER_CACHE_DIR` read at call."""
+        if VcfHeader.cache_dir is not None:
+            return VcfHeader.cache_dir
+
+        env_dir = os.environ.get("VARIANTPLANER_CACHE_DIR")
+
+        return None if not env_dir else pathlib.Path(env_dir)
+
+    def __cached_expressions(
+        self,
+        kind: str,
+        select: set[str] | None,
+        build: typing.Callable[[], typing.Any],
+        *,
+        compact: bool = False,
+    ) -> typing.Any:
+        """Get expressions build from header in cache or build and store them."""
+        key = (kind, self.fingerprint, frozenset(select) if select else None, compact)
+        if (expressions := EXPRESSIONS_CACHE.get(key)) is None:
+            expressions = build()
+            EXPRESSIONS_CACHE[key] = expressions
+
+        return expressions
+
     def info_parser(self, select_info: set[str] | None = None) -> list[polars.Expr]:
         """Generate a list of [polars.Expr](https://pola-rs.github.io/polars/py-polars/html/reference/expressions/index.html) to extract variants information.
 
@@ -84,61 +268,97 @@ class VcfHeader:
         Raises:
         NotVcfHeaderError: If all line not start by '#CHR'
         """
-        info_re = re.compile(
-            r"ID=(?P<id>([A-Za-z_][0-9A-Za-z_.]*|1000G)),Number=(?P<number>[ARG0-9\.]+),Type=(?P<type>Integer|Float|String|Character)",
+        return list(
+            self.__cached_expressions("info_parser", select_info, lambda: self.__build_info_parser(select_info)),
         )
 
+    def __build_info_parser(self, select_info: set[str] | None) -> list[polars.Expr]:
+        """Build expressions return by info_parser."""
         expressions: list[polars.Expr] = []
 
-        for line in self._header:
-            if line.startswith("#CHROM"):
-                return expressions
+        for name, number, info_type in self.__info_definitions(select_info):
+            regex = rf"{name}=([^;]+);?"
 
-            if not line.startswith("##INFO"):
-                continue
+            local_expr = polars.col("info").str.extract(regex, 1)
 
-            if (search := info_re.search(line)) and (not select_info or search["id"] in select_info):
-                regex = rf"{search['id']}=([^;]+);?"
+            if number == "1":
+                if info_type == "Integer":
+                    local_expr = local_expr.cast(polars.Int64)
+                elif info_type == "Float":
+                    local_expr = local_expr.cast(polars.Float64)
+                elif info_type in {"String", "Character"}:
+                    pass  # Not do anything on string or character
+                else:
+                    pass  # Not reachable
 
-                local_expr = polars.col("info").str.extract(regex, 1)
+            else:
+                local_expr = local_expr.str.split(",")
+                if info_type == "Integer":
+                    local_expr = local_expr.cast(polars.List(polars.Int64))
+                elif info_type == "Float":
+                    local_expr = local_expr.cast(polars.List(polars.Float64))
+                elif info_type in {"String", "Character"}:
+                    pass  # Not do anything on string or character
+                else:
+                    pass  # Not reachable
 
-                if search["number"] == "1":
-                    if search["type"] == "Integer":
-                        local_expr = local_expr.cast(polars.Int64)
-                    elif search["type"] == "Float":
-                        local_expr = local_expr.cast(polars.Float64)
-                    elif search["type"] in {"String", "Character"}:
-                        pass  # Not do anything on string or character
-                    else:
-                        pass  # Not reachable
+            expressions.append(local_expr.alias(name))
 
-                else:
-                    local_expr = local_expr.str.split(",")
-                    if search["type"] == "Integer":
-                        local_expr = local_expr.cast(polars.List(polars.Int64))
-                    elif search["type"] == "Float":
-                        local_expr = local_expr.cast(polars.List(polars.Float64))
-                    elif search["type"] in {"String", "Character"}:
-                        pass  # Not do anything on string or character
-                    else:
-                        pass  # Not reachable
+        return expressions
 
-                expressions.append(local_expr.alias(search["id"]))
+    def info_struct(self, select_info: set[str] | None = None) -> polars.Expr | None:
+        """Generate a [polars.Expr](https://pola-rs.github.io/polars/py-polars/html/reference/expressions/index.html) that parse info column in a struct.
 
-        raise NotVcfHeaderError
+        Contrary to [info_parser][variantplaner.objects.VcfHeader.info_parser] each info string is split only once, whatever number of fields. Struct have a field by info definition, value are cast like with info_parser, value that can't be cast are set to null.
+
+        Args:
+        select_info: List of target info field
+
+        Returns:
+        A [polars.Expr](https://pola-rs.github.io/polars/py-polars/html/reference/expressions/index.html) that produce a struct named info, None if no info field are selected.
+
+        Raises:
+        NotVcfHeaderError: If all line not start by '#CHR'
+        """
+        return self.__cached_expressions("info_struct", select_info, lambda: self.__build_info_struct(select_info))
+
+    def __build_info_struct(self, select_info: set[str] | None) -> polars.Expr | None:
+        """Build expression return by info_struct."""
+        definitions = list(self.__info_definitions(select_info))
+        if not definitions:
+            return None
+
+        return polars.col("info").vcf_info.parse(  # type: ignore # noqa: PGH003
+            [name for (name, _, _) in definitions],
+            [number for (_, number, _) in definitions],
+            [info_type for (_, _, info_type) in definitions],
+        )
+
+    def __info_definitions(self, select_info: set[str] | None = None) -> typing.Iterator[tuple[str, str, str]]:
+        """Iterate over id, number and type of selected info definitions.
+
+        Raises:
+        NotVcfHeaderError: If all line not start by '#CHR'
+        """
+        for name, (number, info_type) in self.model.info.items():
+            if not select_info or name in select_info:
+                yield (name, number, info_type)
 
     def format_parser(
         self,
         select_format: set[str] | None = None,
+        *,
+        compact: bool = False,
     ) -> dict[str, typing.Callable[[polars.Expr, str], polars.Expr]]:
         """Generate a list of [polars.Expr](https://pola-rs.github.io/polars/py-polars/html/reference/expressions/index.html) to extract genotypes information.
 
-        **Warning**: Float values can't be converted for the moment they are stored as String to keep information
+        **Warning**: By default Float values are stored as String to keep information, if `compact` is True they are stored as Float32 and Integer values as signed Int32, values that can't be parsed are set to null.
 
         Args:
         header: Line of vcf header.
         input_path: Path to vcf file.
         select_format: List of target format field.
+        compact: Parse Float values as Float32 and Integer values as Int32.
 
         Returns:
         A dict to link format id to pipeable function with Polars.Expr
@@ -146,31 +366,37 @@ class VcfHeader:
         Raises:
         NotVcfHeaderError: If all line not start by '#CHR'
         """
-        format_re = re.compile(
-            "ID=(?P<id>[A-Za-z_][0-9A-Za-z_.]*),Number=(?P<number>[ARG0-9\\.]+),Type=(?P<type>Integer|Float|String|Character)",
+        return dict(
+            self.__cached_expressions(
+                "format_parser",
+                select_format,
+                lambda: self.__build_format_parser(select_format, compact=compact),
+                compact=compact,
+            ),
         )
 
+    def __build_format_parser(
+        self,
+        select_format: set[str] | None,
+        *,
+        compact: bool,
+    ) -> dict[str, typing.Callable[[polars.Expr, str], polars.Expr]]:
+        """Build dict return by format_parser."""
         expressions: dict[str, typing.Callable[[polars.Expr, str], polars.Expr]] = {}
 
-        for line in self._header:
-            if line.startswith("#CHROM"):
-                return expressions
-
-            if not line.startswith("##FORMAT"):
-                continue
-
-            if (search := format_re.search(line)) and (not select_format or search["id"] in select_format):
-                name = search["id"]
-                number = search["number"]
-                format_type = search["type"]
-
+        for name, (number, format_type) in self.model.format.items():
+            if not select_format or name in select_format:
                 if name == "GT":
                     expressions["GT"] = VcfHeader.__format_gt
                     continue
 
                 if number == "1":
-                    if format_type == "Integer":
+                    if format_type == "Integer" and compact:
+                        expressions[name] = VcfHeader.__format_one_int32
+                    elif format_type == "Integer":
                         expressions[name] = VcfHeader.__format_one_int
+                    elif format_type == "Float" and compact:
+                        expressions[name] = VcfHeader.__format_one_float
                     elif format_type == "Float":  # noqa: SIM114 Float isn't already support but in future
                         expressions[name] = VcfHeader.__format_one_str
                     elif format_type in {"String", "Character"}:
@@ -178,8 +404,12 @@ class VcfHeader:
                     else:
                         pass  # Not reachable
 
+                elif format_type == "Integer" and compact:
+                    expressions[name] = VcfHeader.__format_list_int32
                 elif format_type == "Integer":
                     expressions[name] = VcfHeader.__format_list_int
+                elif format_type == "Float" and compact:
+                    expressions[name] = VcfHeader.__format_list_float
                 elif format_type == "Float":  # noqa: SIM114 Float isn't already support but in future
                     expressions[name] = VcfHeader.__format_list_str
                 elif format_type in {"String", "Character"}:
@@ -187,7 +417,7 @@ class VcfHeader:
                 else:
                     pass  # Not reachable
 
-        raise NotVcfHeaderError
+        return expressions
 
     @functools.cached_property
     def samples_index(self) -> dict[str, int] | None:
@@ -202,15 +432,10 @@ class VcfHeader:
         Raises:
         NotVcfHeaderError: If all line not start by '#CHR'
         """
-        for line in reversed(self._header):
-            if line.startswith("#CHR"):
-                split_line = line.strip().split("\t")
-                if len(split_line) <= MINIMAL_COL_NUMBER:
-                    return None
-
-                return {sample: i for (i, sample) in enumerate(split_line[SAMPLE_COL_BEGIN:])}
+        if self.model.samples is None:
+            return None
 
-        raise NotVcfHeaderError
+        return {sample: i for (i, sample) in enumerate(self.model.samples)}
 
     @functools.cached_property
     def contigs(self) -> typing.Iterator[str]:
@@ -237,14 +462,24 @@ class VcfHeader:
 
     @staticmethod
     def __format_gt(expr: polars.Expr, /, col_name: str) -> polars.Expr:
-        """Manage gt field."""
-        return expr.str.count_matches("1").cast(polars.UInt8).alias(col_name.lower())
+        """Manage gt field, decode in a struct of number of alternative alleles (gt) and packed allele indexes, phase and ploidy (gt_packed)."""
+        return expr.vcf_format.decode_gt().alias(col_name.lower())  # type: ignore # noqa: PGH003
 
     @staticmethod
     def __format_one_int(expr: polars.Expr, /, col_name: str) -> polars.Expr:
         """Manage integer field."""
         return expr.str.to_integer(base=10, strict=False).cast(polars.UInt32).alias(col_name.lower())
 
+    @staticmethod
+    def __format_one_int32(expr: polars.Expr, /, col_name: str) -> polars.Expr:
+        """Manage integer field as signed 32 bits integer."""
+        return expr.str.to_integer(base=10, strict=False).cast(polars.Int32, strict=False).alias(col_name.lower())
+
+    @staticmethod
+    def __format_one_float(expr: polars.Expr, /, col_name: str) -> polars.Expr:
+        """Manage float field."""
+        return expr.cast(polars.Float32, strict=False).alias(col_name.lower())
+
     @staticmethod
     def __format_one_str(expr: polars.Expr, /, col_name: str) -> polars.Expr:
         """Manage string field."""
@@ -259,6 +494,20 @@ class VcfHeader:
             .alias(col_name.lower())
         )
 
+    @staticmethod
+    def __format_list_int32(expr: polars.Expr, /, col_name: str) -> polars.Expr:
+        """Manage list of integer field as signed 32 bits integer."""
+        return (
+            expr.str.split(",")
+            .list.eval(polars.element().str.to_integer(base=10, strict=False).cast(polars.Int32, strict=False))
+            .alias(col_name.lower())
+        )
+
+    @staticmethod
+    def __format_list_float(expr: polars.Expr, /, col_name: str) -> polars.Expr:
+        """Manage list of float field."""
+        return expr.str.split(",").cast(polars.List(polars.Float32), strict=False).alias(col_name.lower())
+
     @staticmethod
     def __format_list_str(expr: polars.Expr, /, col_name: str) -> polars.Expr:
         """Manag list string field."""
@@ -17,6 +17,9 @@ import polars
 # project import
 import variantplaner
 
+HASHED_ID: int = 1 << 63
+"""Variant id upper or equal to this value are hashed, other are packed"""
+
 logger = logging.getLogger("struct.variants")
 
 
@@ -178,3 +181,69 @@ def merge(
     logger.debug("Star clean tmp file")
     shutil.rmtree(temp_prefix, ignore_errors=True)
     logger.debug("End clean tmp file")
+
+
+def id_counters(paths: list[pathlib.Path]) -> polars.DataFrame:
+    """Count packed and hashed variant id of each variants file.
+
+    Files are read one by one in streaming mode.
+
+    Args:
+        paths: List of variants file.
+
+    Returns:
+        [polars.DataFrame](https://pola-rs.github.io/polars/py-polars/html/reference/dataframe/index.html) with columns file, variants, packed and hashed.
+    """
+    counters = []
+    for path in paths:
+        lf = polars.scan_parquet(path)
+        count = lf.select(
+            variants=polars.len().cast(polars.UInt64),
+            hashed=__is_hashed(lf).sum().cast(polars.UInt64),
+        ).collect(streaming=True)
+        counters.append(count.select(file=polars.lit(str(path)), variants="variants", hashed="hashed"))
+
+    if not counters:
+        return polars.DataFrame(
+            schema={"file": polars.String, "variants": polars.UInt64, "packed": polars.UInt64, "hashed": polars.UInt64}
+        )
+
+    return polars.concat(counters).select(
+        "file",
+        "variants",
+        packed=polars.col("variants") - polars.col("hashed"),
+        hashed="hashed",
+    )
+
+
+def collisions(paths: list[pathlib.Path]) -> polars.LazyFrame:
+    """Find variant id that match more than one allele in variants files.
+
+    Hashed id could collide, packed id could too because reference length and alternative sequence share same bits (A>AC and ACGT>C at same position get same id), packed wide id store only length of reference so alleles with different reference of same length collide (AC>A and AT>A at same position). Alleles are deduplicated on (id, chr, pos, ref, alt) and only id with many alleles are kept, plan could be run in streaming mode.
+
+    Args:
+        paths: List of variants file.
+
+    Returns:
+        [polars.LazyFrame](https://pola-rs.github.io/polars/py-polars/html/reference/lazyframe/index.html) with columns id, hashed, chr, pos, ref and alt, one row by allele of a colliding id.
+    """
+    columns = ["id", "chr", "pos", "ref", "alt"]
+
+    alleles = polars.concat([polars.scan_parquet(path).select(columns) for path in paths]).unique(subset=columns)
+    colliding = alleles.group_by("id").agg(alleles=polars.len()).filter(polars.col("alleles") > 1).select("id")
+
+    return (
+        variantplaner.normalization.join_on_id(alleles, colliding, "inner")
+        .with_columns(hashed=__is_hashed(alleles))
+        .select("id", "hashed", "chr", "pos", "ref", "alt")
+        .sort("id", "chr", "pos", "ref", "alt")
+    )
+
+
+def __is_hashed(lf: polars.LazyFrame) -> polars.Expr:
+    """Expression true if variant id is hashed, `hi` field of a wide id is used."""
+    id_col = polars.col("id")
+    if isinstance(lf.collect_schema()["id"], polars.Struct):
+        id_col = id_col.struct.field("hi")
+
+    return id_col >= polars.lit(HASHED_ID, dtype=polars.UInt64)
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import filecmp
+import json
 import os
 import pathlib
 
@@ -23,7 +24,9 @@ else:
 
 
 # project import
-from variantplaner import cli
+from variantplaner import Vcf, cli
+from variantplaner.io import parquet
+from variantplaner.objects.genotypes import COMPACT_METADATA_KEY
 
 DATA_DIR = pathlib.Path(__file__).parent / "data"
 
@@ -123,6 +126,314 @@ def test_vcf2parquet(tmp_path: pathlib.Path) -> None:
         assert truth.len() == lf.len()
 
 
+def test_vcf2parquet_stdin(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet read vcf from standard input."""
+    variants_path = tmp_path / "variants.parquet"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            "-",
+            "-c",
+            str(DATA_DIR / "grch38.92.csv"),
+            "variants",
+            "-o",
+            str(variants_path),
+        ],
+        input=(DATA_DIR / "no_info.vcf.gz").read_bytes(),
+    )
+
+    assert result.exit_code == 0, result.output
+    polars.testing.assert_frame_equal(
+        polars.scan_parquet(DATA_DIR / "no_info.variants.parquet"),
+        polars.scan_parquet(variants_path),
+        check_row_order=False,
+    )
+
+
+def test_vcf2parquet_batch(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet run on many vcf."""
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "-t",
+            "2",
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "no_info.vcf"),
+            "-i",
+            str(DATA_DIR / "no_genotypes.vcf"),
+            "-c",
+            str(DATA_DIR / "grch38.92.csv"),
+            "-j",
+            "2",
+            "variants",
+            "-o",
+            str(tmp_path / "{name}.variants.parquet"),
+            "headers",
+            "-o",
+            str(tmp_path / "{name}.headers.vcf"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    for name in ("no_info", "no_genotypes"):
+        polars.testing.assert_frame_equal(
+            polars.scan_parquet(DATA_DIR / f"{name}.variants.parquet"),
+            polars.scan_parquet(tmp_path / f"{name}.variants.parquet"),
+            check_row_order=False,
+        )
+        assert (tmp_path / f"{name}.headers.vcf").is_file()
+
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "no_*.vcf"),
+            "variants",
+            "-o",
+            str(tmp_path / "variants.parquet"),
+        ],
+    )
+
+    assert result.exit_code == 15
+
+
+def test_vcf2parquet_gvcf(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet drop reference blocks of gVCF and write coverage intervals."""
+    variants_path = tmp_path / "variants.parquet"
+    coverage_path = tmp_path / "coverage.parquet"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "gvcf.vcf"),
+            "-g",
+            "variants",
+            "-o",
+            str(variants_path),
+            "coverage",
+            "-o",
+            str(coverage_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert polars.read_parquet(variants_path).select("pos", "alt").rows() == [(100, "C"), (201, "CT,G")]
+    assert polars.read_parquet(coverage_path).rows() == [
+        ("chr1", 1, 99, "sample1", 8, 30),
+        ("chr1", 151, 200, "sample1", 18, 60),
+    ]
+
+
+def test_vcf2parquet_stats(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet write samples statistics with variants."""
+    variants_path = tmp_path / "variants.parquet"
+    stats_path = tmp_path / "stats.parquet"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "no_info.vcf"),
+            "-c",
+            str(DATA_DIR / "grch38.92.csv"),
+            "variants",
+            "-o",
+            str(variants_path),
+            "stats",
+            "-o",
+            str(stats_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+
+    value = polars.read_parquet(stats_path)
+    assert value.schema == Vcf.stats_schema()
+    assert value.select("sample", "records", "missing", "het", "hom_alt", "snv", "indel", "ti_tv").rows() == [
+        ("sample_1", 25, 19, 1, 5, 5, 1, None),
+        ("sample_2", 25, 13, 12, 0, 9, 3, 2.0),
+        ("sample_3", 25, 2, 7, 16, 16, 6, 1.0),
+    ]
+
+
+def test_vcf2parquet_compact(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet compact genotypes with variants and store compact schema in metadata sidecar."""
+    variants_path = tmp_path / "variants.parquet"
+    genotypes_path = tmp_path / "genotypes.parquet"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "no_info.vcf"),
+            "-c",
+            str(DATA_DIR / "grch38.92.csv"),
+            "variants",
+            "-o",
+            str(variants_path),
+            "genotypes",
+            "-o",
+            str(genotypes_path),
+            "--compact",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+
+    value = polars.read_parquet(genotypes_path)
+    assert value.schema["gq"] == polars.UInt8
+    assert value.schema["dp"] == polars.UInt16
+    assert value.schema["ad"] == polars.List(polars.UInt16)
+    assert value.height == polars.read_parquet(DATA_DIR / "no_info.genotypes.parquet").height
+    assert (
+        polars.read_parquet(variants_path).height == polars.read_parquet(DATA_DIR / "no_info.variants.parquet").height
+    )
+
+    description = json.loads(parquet.read_metadata(genotypes_path)[COMPACT_METADATA_KEY])
+    assert description["schema"]["gq"] == "UInt8"
+    assert description["format"]["ad"] == ["R", "Integer"]
+
+
+def test_vcf2parquet_compact_append(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet append compact genotypes to a compact output, schema doesn't depend on values."""
+    genotypes_path = tmp_path / "genotypes.parquet"
+
+    command = [
+        "vcf2parquet",
+        "-i",
+        str(DATA_DIR / "no_info.vcf"),
+        "-c",
+        str(DATA_DIR / "grch38.92.csv"),
+        "genotypes",
+        "-o",
+        str(genotypes_path),
+        "--compact",
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli.main, command)
+    assert result.exit_code == 0, result.output
+    first = polars.read_parquet(genotypes_path)
+
+    result = runner.invoke(cli.main, [command[0], "--append", *command[1:]])
+    assert result.exit_code == 0, result.output
+
+    value = polars.read_parquet(genotypes_path)
+    assert value.schema == first.schema
+    assert value.height == 2 * first.height
+
+
+def test_vcf2parquet_quarantine(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet skip malformed records and write them in quarantine file."""
+    variants_path = tmp_path / "variants.parquet"
+    quarantine_path = tmp_path / "quarantine.tsv"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "malformed.vcf"),
+            "-c",
+            str(DATA_DIR / "grch38.92.csv"),
+            "-q",
+            str(quarantine_path),
+            "variants",
+            "-o",
+            str(variants_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert polars.read_parquet(variants_path).height == 5
+    assert len(quarantine_path.read_text().splitlines()) == 3
+
+
+def test_vcf2parquet_cache(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet skip input unchanged since last conversion."""
+    variants_path = tmp_path / "variants.parquet"
+    cache_path = tmp_path / "cache.json"
+
+    args = [
+        "vcf2parquet",
+        "-i",
+        str(DATA_DIR / "no_info.vcf"),
+        "-c",
+        str(DATA_DIR / "grch38.92.csv"),
+        "--cache-path",
+        str(cache_path),
+        "variants",
+        "-o",
+        str(variants_path),
+    ]
+
+    runner = CliRunner()
+    result = runner.invoke(cli.main, args)
+    assert result.exit_code == 0, result.output
+    assert cache_path.exists()
+
+    variants_path.write_bytes(b"not converted")
+    result = runner.invoke(cli.main, args)
+    assert result.exit_code == 0, result.output
+    assert variants_path.read_bytes() == b"not converted"
+
+    result = runner.invoke(cli.main, [*args[:7], "--force", *args[7:]])
+    assert result.exit_code == 0, result.output
+    assert polars.read_parquet(variants_path).height > 0
+
+
+def test_vcf2parquet_wide_id(tmp_path: pathlib.Path) -> None:
+    """vcf2parquet run with wide id."""
+    variants_path = tmp_path / "variants.parquet"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "vcf2parquet",
+            "-i",
+            str(DATA_DIR / "no_info.vcf"),
+            "-c",
+            str(DATA_DIR / "grch38.92.csv"),
+            "--wide-id",
+            "variants",
+            "-o",
+            str(variants_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+
+    variants = polars.read_parquet(variants_path)
+
+    assert variants.schema["id"] == polars.Struct({"hi": polars.UInt64, "lo": polars.UInt64})
+    assert variants.get_column("id").n_unique() == variants.height
+    assert (variants.get_column("id").struct.field("hi") >= 1 << 63).sum() == 1
+    # star alternative is padded to be hashed in wide id too
+    polars.testing.assert_frame_equal(
+        polars.read_parquet(DATA_DIR / "no_info.variants.parquet")
+        .drop("id")
+        .with_columns(alt=polars.col("alt").str.replace(r"^\*+$", "*" * 30)),
+        variants.drop("id"),
+        check_row_order=False,
+    )
+
+
 def test_vcf2parquet_ask_annotations(tmp_path: pathlib.Path) -> None:
     """Ask annotations vcf2parquet run."""
     variants_path = tmp_path / "variants.parquet"
@@ -377,6 +688,34 @@ def test_struct_variants(tmp_path: pathlib.Path) -> None:
     assert set(lf.collect().get_column("id").to_list()) == MERGE_IDS
 
 
+def test_struct_collisions(tmp_path: pathlib.Path) -> None:
+    """Basic struct collisions run."""
+    collisions_path = tmp_path / "collisions.parquet"
+    counters_path = tmp_path / "counters.parquet"
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.main,
+        [
+            "struct",
+            "-i",
+            str(DATA_DIR / "no_genotypes.variants.parquet"),
+            str(DATA_DIR / "no_info.variants.parquet"),
+            "--",
+            "collisions",
+            "-o",
+            str(collisions_path),
+            "-c",
+            str(counters_path),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+
+    assert polars.read_parquet(collisions_path).is_empty()
+    assert polars.read_parquet(counters_path).get_column("hashed").to_list() == [0, 1]
+
+
 @pytest.mark.skipif(
     os.environ.get("GITHUB_REPOSITORY", default="") == "SeqOIA-IT/variantplaner",
     reason="this test failled in github action",
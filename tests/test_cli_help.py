@@ -65,8 +65,9 @@ Options:
   -h, --help              Show this message and exit.
 
 Commands:
-  genotypes  Convert set of genotype parquet in hive like files structures.
-  variants   Merge multiple variants parquet file in one.
+  collisions  Find variant id shared by many alleles in variants files.
+  genotypes   Convert set of genotype parquet in hive like files structures.
+  variants    Merge multiple variants parquet file in one.
 """
     )
 
@@ -106,18 +107,70 @@ def test_show_help_vcf2parquet() -> None:
 
   Convert a vcf in parquet.
 
+  If input is a bgzip vcf with a tabix or csi index, only blocks overlapping
+  regions are read.
+
+  If quarantine path is set, malformed records are skipped and written in it,
+  number of quarantined records is reported at end of conversion.
+
+  With many inputs, subcommands are apply on each vcf by a pool of jobs, contigs
+  length and header parsing are shared between them.
+
+  If cache path is set, inputs with same size, modification time and header than
+  at last conversion are skipped if options are the same and outputs still
+  exist, number of hits and misses is reported.
+
 Options:
-  -i, --input-path FILE         Path to vcf input file.  [required]
+  -i, --input-path TEXT         Path to vcf or bcf input file, could be gzip or
+                                bgzip compressed, - or a FIFO are read as a
+                                stream. Could be repeated or a glob pattern,
+                                with many inputs output paths are template where
+                                {name} is replaced by input file name without
+                                vcf extension.  [required]
   -c, --chrom2length-path FILE  CSV file that associates a chromosome name with
                                 its size.
   -a, --append                  Switch in append mode.
   -s, --keep-star BOOLEAN       Keep variant with * in alt.
+  -m, --split-multiallelic      Split multi-allelic records in biallelic
+                                records, Number=A/R/G fields and GT are re-
+                                indexed.
+  -g, --gvcf                    Input is a gVCF, reference blocks are dropped
+                                and <NON_REF> or <*> allele are removed, blocks
+                                are available for coverage subcommand.
+  --wide-id                     Compute a 128 bits variant id, a struct of two
+                                UInt64 hi and lo, variants with longer alleles
+                                keep a packed id.
+  -f, --reference-path FILE     Trim and left align variants against this
+                                reference fasta, index must be present at same
+                                path with .fai extension.
+  -r, --region TEXT             Only read variants overlapping region chr,
+                                chr:start or chr:start-end (1-based, inclusive),
+                                could be repeated.
+  -R, --regions-file FILE       Only read variants overlapping regions of a bed
+                                file.
+  -q, --quarantine-path FILE    Malformed records didn't stop conversion, they
+                                are written in this file with line number and
+                                reason. With many inputs, path must contains
+                                {name}.
+  --cache-path FILE             Json file where fingerprint of converted inputs
+                                are stored, input unchanged since last
+                                conversion with same options and outputs that
+                                still exist are skipped.
+  --content-hash                Cache fingerprint include a hash of all input
+                                content, modification time is ignored.
+  --force                       Convert inputs even if cache said they are
+                                unchanged, cache is updated.
+  -j, --jobs INTEGER RANGE      Number of vcf converted in parallel with many
+                                inputs, threads are shared between jobs.
+                                [default: 1; x>=1]
   -h, --help                    Show this message and exit.
 
 Commands:
   annotations  Write annotations.
+  coverage     Write coverage intervals of gVCF reference blocks, one row...
   genotypes    Write genotypes.
   headers      Write vcf headers.
+  stats        Write quality control statistics of each sample:...
   variants     Write variants.
 """
     )
@@ -0,0 +1,98 @@
+"""Tests for the `io.cache` module."""
+
+# std import
+from __future__ import annotations
+
+import os
+import pathlib
+import shutil
+
+# 3rd party import
+# project import
+from variantplaner.io import cache
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def test_fingerprint(tmp_path: pathlib.Path) -> None:
+    """Header hash didn't change if only records change."""
+    vcf_path = tmp_path / "input.vcf"
+    shutil.copy(DATA_DIR / "no_info.vcf", vcf_path)
+
+    before = cache.fingerprint(vcf_path, content_hash=True)
+    assert before["size"] == vcf_path.stat().st_size
+    assert before["content"] is not None
+    assert cache.fingerprint(vcf_path)["content"] is None
+
+    with open(vcf_path, "a") as fh:
+        fh.write("2\t1\t.\tA\tT\t.\t.\t.\tGT\t0/1\t0/1\t0/1\n")
+
+    after = cache.fingerprint(vcf_path, content_hash=True)
+    assert after["header"] == before["header"]
+    assert after["content"] != before["content"]
+    assert cache.header_digest(DATA_DIR / "no_info.vcf.gz") == before["header"]
+
+
+def test_conversion_cache(tmp_path: pathlib.Path) -> None:
+    """Unchanged input is a hit, changed input, options or missing output are misses."""
+    vcf_path = tmp_path / "input.vcf"
+    shutil.copy(DATA_DIR / "no_info.vcf", vcf_path)
+    output_path = tmp_path / "variants.parquet"
+    output_path.touch()
+    cache_path = tmp_path / "cache.json"
+    options = cache.options_digest({"behavior": 1, "regions": [("1", 1, 10)], "path": output_path})
+
+    obj = cache.ConversionCache(cache_path)
+    assert not obj.hit(vcf_path, options, [output_path])
+    obj.record(vcf_path, options, [output_path])
+    obj.save()
+
+    obj = cache.ConversionCache(cache_path)
+    assert obj.hit(vcf_path, options, [output_path])
+    assert not obj.hit(vcf_path, cache.options_digest({"behavior": 2}), [output_path])
+    assert not obj.hit(vcf_path, options, [tmp_path / "other.parquet"])
+    assert (obj.hits, obj.misses) == (1, 2)
+
+    assert not cache.ConversionCache(cache_path, force=True).hit(vcf_path, options, [output_path])
+
+    stat = vcf_path.stat()
+    os.utime(vcf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert not obj.hit(vcf_path, options, [output_path])
+
+    output_path.unlink()
+    assert not obj.hit(vcf_path, options, [output_path])
+
+
+def test_conversion_cache_content_hash(tmp_path: pathlib.Path) -> None:
+    """With content hash, a touched input is a hit and a rewritten input with same size is a miss."""
+    vcf_path = tmp_path / "input.vcf"
+    shutil.copy(DATA_DIR / "no_info.vcf", vcf_path)
+    output_path = tmp_path / "variants.parquet"
+    output_path.touch()
+    options = cache.options_digest({})
+
+    obj = cache.ConversionCache(tmp_path / "cache.json", content_hash=True)
+    obj.record(vcf_path, options, [output_path])
+
+    stat = vcf_path.stat()
+    os.utime(vcf_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert obj.hit(vcf_path, options, [output_path])
+
+    content = vcf_path.read_text()
+    vcf_path.write_text(content.replace("\t10146\t", "\t10147\t"))
+    assert not obj.hit(vcf_path, options, [output_path])
+
+
+def test_lru_cache() -> None:
+    """Cache keep only most recently used entries."""
+    lru: cache.LruCache[str, int] = cache.LruCache(max_size=2)
+    lru["a"] = 1
+    lru["b"] = 2
+    assert lru.get("a") == 1
+    lru["c"] = 3
+
+    assert len(lru) == 2
+    assert "b" not in lru
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    assert lru.get("b") is None
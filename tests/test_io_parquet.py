@@ -0,0 +1,35 @@
+"""Tests for the `io.parquet` module."""
+
+# std import
+from __future__ import annotations
+
+import pathlib
+
+# 3rd party import
+import polars
+import polars.testing
+
+# project import
+from variantplaner.io import parquet
+
+DATA_DIR = pathlib.Path(__file__).parent / "data"
+
+
+def test_write_read_metadata(tmp_path: pathlib.Path) -> None:
+    """Metadata are written in a sidecar file and parquet file isn't modified."""
+    output_path = tmp_path / "genotypes.parquet"
+    truth = polars.read_parquet(DATA_DIR / "no_info.genotypes.parquet")
+    truth.write_parquet(output_path, row_group_size=10)
+    content = output_path.read_bytes()
+
+    assert parquet.read_metadata(output_path) == {}
+
+    parquet.write_metadata(output_path, {"key": "value", "other": "1"})
+    parquet.write_metadata(output_path, {"other": "2"})
+
+    assert parquet.read_metadata(output_path) == {"key": "value", "other": "2"}
+    assert parquet.metadata_path(output_path) == tmp_path / "genotypes.parquet.metadata.json"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["genotypes.parquet", "genotypes.parquet.metadata.json"]
+
+    assert output_path.read_bytes() == content
+    polars.testing.assert_frame_equal(polars.read_parquet(output_path), truth)
@@ -7,6 +7,7 @@ import pathlib
 
 # 3rd party import
 import polars
+import polars.testing
 
 try:
     from pytest_cov.embed import cleanup_on_sigterm
@@ -16,7 +17,7 @@ else:
     cleanup_on_sigterm()
 
 # project import
-from variantplaner import normalization
+from variantplaner import VcfHeader, normalization
 
 DATA_DIR = pathlib.Path(__file__).parent / "data"
 
@@ -47,6 +48,18 @@ def __generate_variants() -> polars.DataFrame:
     )
 
 
+def test_contigs_offsets() -> None:
+    """Check contigs offsets and sum of length, an empty table give 0."""
+    offsets, real_pos_max = normalization.__contigs_offsets(__generate_chr2len().lazy())
+
+    assert offsets == {"1": 0, "2": 10_000_000, "3": 10_050_000, "22": 130_050_500, "X": 229_290_316}
+    assert real_pos_max == 229_300_316
+    assert isinstance(real_pos_max, int)
+
+    empty = polars.LazyFrame(schema={"contig": polars.String, "length": polars.UInt64, "offset": polars.UInt64})
+    assert normalization.__contigs_offsets(empty) == ({}, 0)
+
+
 def test_id() -> None:
     """Check id generation."""
     chr2len = __generate_chr2len()
@@ -82,3 +95,210 @@ def test_partition() -> None:
     df = normalization.add_id_part(df.lazy(), number_of_bits=9).collect()
 
     assert df.get_column("id_part").to_list() == [19, 6, 511, 19, 248, 511]
+
+
+def test_decode_id() -> None:
+    """Check chr and pos of packed id are decoded, ref length and alt only if unambiguous."""
+    chr2len = __generate_chr2len()
+
+    ids = normalization.add_variant_id(__generate_variants().lazy(), chr2len.lazy()).select("id")
+    df = normalization.decode_variant_id(ids, chr2len.lazy()).collect()
+
+    assert df.columns == ["id", "chr", "pos", "ref_len", "alt"]
+    assert df.drop("id").rows() == [
+        ("2", 19910, 1, "T"),
+        ("1", 3322992, None, None),
+        (None, None, None, None),
+        ("3", 399941, 1, "G"),
+        ("22", 11111, 1, "C"),
+        (None, None, None, None),
+    ]
+
+
+def test_decode_id_empty_alt() -> None:
+    """Packed id of a deletion without alternative base share its value with a one base substitution."""
+    chr2len = __generate_chr2len()
+    variants = polars.LazyFrame(
+        {"chr": ["1", "1"], "pos": [100, 100], "ref": ["ACGTA", "A"], "alt": ["", "C"]},
+        schema_overrides={"pos": polars.UInt64},
+    )
+
+    ids = normalization.add_variant_id(variants, chr2len.lazy()).select("id")
+    df = normalization.decode_variant_id(ids, chr2len.lazy()).collect()
+
+    assert df.get_column("id").n_unique() == 1
+    assert df.drop("id").rows() == [("1", 100, 1, "C"), ("1", 100, 1, "C")]
+
+
+def test_id_wide() -> None:
+    """Check wide id generation, partition and decoding."""
+    chr2len = __generate_chr2len()
+    df = __generate_variants()
+
+    df = normalization.add_variant_id(df.lazy(), chr2len.lazy(), wide=True).collect()
+
+    assert df.schema["id"] == polars.Struct({"hi": polars.UInt64, "lo": polars.UInt64})
+
+    ids = df.get_column("id").to_list()
+    assert ids[0] == {"hi": 344281486070906881, "lo": 288230376151711746}
+    assert ids[1] == {"hi": 114177135718957096, "lo": 288230376151711745}
+    assert ids[2]["hi"] == 13604463283740165373
+    assert ids[3] == {"hi": 359057238721036289, "lo": 288230376151711747}
+    assert ids[4] == {"hi": 4468882925680590849, "lo": 288230376151711745}
+    assert ids[5]["hi"] >> 63 == 1
+
+    assert normalization.add_id_part(df.lazy()).collect().get_column("id_part").to_list() == [9, 3, 255, 9, 124, 255]
+
+    df = normalization.decode_variant_id(df.lazy().select("id"), chr2len.lazy()).collect()
+
+    assert df.drop("id").rows() == [
+        ("2", 19910, 1, "T"),
+        ("1", 3322992, 40, "C"),
+        (None, None, None, None),
+        ("3", 399941, 1, "G"),
+        ("22", 11111, 1, "C"),
+        (None, None, None, None),
+    ]
+
+
+def test_id_wide_not_acgt() -> None:
+    """Check wide id of alleles with other nucleotides than ACGT are hashed."""
+    df = polars.DataFrame(
+        data={
+            "chr": ["2"] * 5,
+            "pos": [19910] * 5,
+            "ref": ["A", "A", "A", "N", "a"],
+            "alt": ["N", "<DEL>", "G", "G", "g"],
+        },
+        schema_overrides={"pos": polars.UInt64},
+    )
+
+    ids = normalization.add_variant_id(df.lazy(), __generate_chr2len().lazy(), wide=True).collect().get_column("id")
+    his = ids.struct.field("hi").to_list()
+
+    assert [hi >> 63 for hi in his] == [1, 1, 0, 1, 0]
+    assert ids.n_unique() == 4
+    assert ids[2] == ids[4]
+
+
+def test_join_on_id() -> None:
+    """Check join on id and on wide id give same result."""
+    left = polars.DataFrame({"id": [1, 2, 3], "left": ["a", "b", "c"]}, schema_overrides={"id": polars.UInt64})
+    right = polars.DataFrame({"id": [3, 4, 1], "right": [30, 40, 10]}, schema_overrides={"id": polars.UInt64})
+
+    def wide(df: polars.DataFrame) -> polars.DataFrame:
+        return df.with_columns(id=polars.struct(hi=polars.col("id"), lo=polars.col("id") * 2))
+
+    for how in ("inner", "left", "full"):
+        truth = normalization.join_on_id(left, right, how).sort("id")
+        result = normalization.join_on_id(wide(left).lazy(), wide(right).lazy(), how).collect().sort("id")
+
+        assert result.columns == ["id", "left", "right"]
+        assert result.get_column("id").struct.field("hi").to_list() == truth.get_column("id").to_list()
+        assert result.get_column("id").struct.field("lo").to_list() == [
+            None if value is None else value * 2 for value in truth.get_column("id").to_list()
+        ]
+        polars.testing.assert_frame_equal(result.drop("id"), truth.drop("id"))
+
+
+def test_split_multiallelic() -> None:
+    """Check split of multi-allelic records."""
+    header = VcfHeader()
+    header.from_files(DATA_DIR / "multiallelic.vcf")
+
+    lf = polars.scan_csv(
+        DATA_DIR / "multiallelic.vcf",
+        separator="\t",
+        comment_prefix="#",
+        has_header=False,
+        new_columns=list(header.column_name(12)),
+        infer_schema_length=0,
+    )
+
+    df = normalization.split_multiallelic(lf, header).collect()
+
+    assert df.get_column("alt").to_list() == ["C", "T", "A", "G", "C", "*"]
+    assert df.get_column("info").to_list() == [
+        "AC=1;DP=30;ADT=10,5;DB",
+        "AC=2;DP=30;ADT=10,15;DB",
+        "AC=2;DP=12",
+        "AC=1;ADT=3,2",
+        "AC=0;ADT=3,0",
+        "AC=1;ADT=3,1",
+    ]
+    assert df.get_column("sample1").to_list() == [
+        "0/1:5,5:10:10,0,20",
+        "0/0:5,0:10:10,30,50",
+        "0/1:6,6:12",
+        "0/0:4",
+        "0/0:4",
+        "0/1:4",
+    ]
+    assert df.get_column("sample2").to_list() == [
+        "1|0:0,3:7:60,30,40",
+        "0|1:0,4:7:60,20,10",
+        "./.:.:.",
+        "0/1/1:5",
+        "0/0/1:5",
+        "0/0/0:5",
+    ]
+    assert df.get_column("sample3").to_list() == [
+        "0/0:0,0:9:90,80,70",
+        "1/1:0,9:9:90,60,0",
+        "1",
+        ".:.",
+        ".:.",
+        ".:.",
+    ]
+
+
+def test_left_align() -> None:
+    """Check trim and left alignment against reference."""
+    lf = polars.LazyFrame(
+        data={
+            "chr": ["1", "1", "1", "1", "1", "2"],
+            "pos": [6, 12, 13, 3, 3, 6],
+            "ref": ["CAC", "T", "TTCG", "A", "A", "CAC"],
+            "alt": ["C", "TT", "TACG", "T", "<DEL>", "C"],
+        },
+        schema_overrides={"pos": polars.UInt64},
+    )
+
+    df = normalization.left_align(lf, DATA_DIR / "reference.fa").collect()
+
+    assert df.get_column("pos").to_list() == [2, 9, 14, 3, 3, 6]
+    assert df.get_column("ref").to_list() == ["GAC", "A", "T", "A", "A", "CAC"]
+    assert df.get_column("alt").to_list() == ["G", "AT", "A", "T", "<DEL>", "C"]
+
+
+def test_drop_reference_blocks() -> None:
+    """Check reference blocks and symbolic allele are removed from gVCF."""
+    header = VcfHeader()
+    header.from_files(DATA_DIR / "gvcf.vcf")
+
+    lf = polars.scan_csv(
+        DATA_DIR / "gvcf.vcf",
+        separator="\t",
+        comment_prefix="#",
+        has_header=False,
+        new_columns=list(header.column_name(10)),
+        infer_schema_length=0,
+    )
+
+    assert lf.select(normalization.is_reference_block()).collect().to_series().to_list() == [
+        True,
+        False,
+        True,
+        True,
+        False,
+    ]
+
+    df = normalization.drop_reference_blocks(lf, header).collect()
+
+    assert df.get_column("pos").to_list() == ["100", "201"]
+    assert df.get_column("alt").to_list() == ["C", "CT,G"]
+    assert df.get_column("info").to_list() == ["DP=12;MLEAC=1", "DP=10;MLEAC=1,1"]
+    assert df.get_column("sample1").to_list() == [
+        "0/1:6,6:12:40:40,0,50",
+        "1/2:0,5,5:10:50:90,50,80,40,0,70",
+    ]
@@ -67,37 +67,17 @@ MERGE_IDS = {
 }
 
 
-def test_chunk_by_memory() -> None:
+def test_chunk_by_memory(tmp_path: pathlib.Path) -> None:
     """Check by memory."""
-    paths = [
-        DATA_DIR / "no_info.csv",
-        DATA_DIR / "no_info.genotypes.parquet",
-        DATA_DIR / "no_info.parquet",
-        DATA_DIR / "no_info.parquet2vcf.vcf",
-        DATA_DIR / "no_info.parquet2vcf_genotypes.vcf",
-        DATA_DIR / "no_info.tsv",
-        DATA_DIR / "no_info.variants.parquet",
-        DATA_DIR / "no_info.vcf",
-        DATA_DIR / "no_info.vcf2parquet2vcf.vcf",
-    ]
+    paths = []
+    for index, size in enumerate([4000, 3000, 2000, 2000, 9000, 12000, 100]):
+        path = tmp_path / f"{index}.bin"
+        path.write_bytes(b"\0" * size)
+        paths.append(path)
 
     chunks = list(struct.variants.__chunk_by_memory(paths, 10000))
 
-    truth = [
-        [
-            DATA_DIR / "no_info.csv",
-            DATA_DIR / "no_info.genotypes.parquet",
-            DATA_DIR / "no_info.parquet",
-            DATA_DIR / "no_info.parquet2vcf.vcf",
-        ],
-        [
-            DATA_DIR / "no_info.parquet2vcf_genotypes.vcf",
-            DATA_DIR / "no_info.tsv",
-            DATA_DIR / "no_info.variants.parquet",
-            DATA_DIR / "no_info.vcf",
-        ],
-        [DATA_DIR / "no_info.vcf2parquet2vcf.vcf"],
-    ]
+    truth = [paths[0:4], paths[4:6], paths[6:]]
 
     assert chunks == truth
 
@@ -172,3 +152,37 @@ def test_merge_append(tmp_path: pathlib.Path) -> None:
     lf = polars.concat([polars.scan_parquet(entry.path) for entry in os.scandir(out_prefix) if entry.is_file()])
 
     assert set(lf.collect().get_column("id").to_list()) == sv_merge
+
+
+def test_collisions(tmp_path: pathlib.Path) -> None:
+    """Check collisions and id counters."""
+    variants = polars.read_parquet(DATA_DIR / "no_info.variants.parquet")
+    packed = variants.filter(polars.col("id") < polars.lit(struct.variants.HASHED_ID, dtype=polars.UInt64)).head(1)
+    hashed = variants.filter(polars.col("id") >= polars.lit(struct.variants.HASHED_ID, dtype=polars.UInt64))
+
+    collide_path = tmp_path / "collide.parquet"
+    polars.concat(
+        [
+            packed.with_columns(ref=polars.col("ref") + "ACG"),
+            hashed.with_columns(chr=polars.lit("Y")),
+            hashed,
+        ]
+    ).write_parquet(collide_path)
+
+    paths = [DATA_DIR / "no_genotypes.variants.parquet", DATA_DIR / "no_info.variants.parquet"]
+
+    assert struct.variants.collisions(paths).collect(streaming=True).is_empty()
+
+    result = struct.variants.collisions([*paths, collide_path]).collect(streaming=True)
+
+    assert result.columns == ["id", "hashed", "chr", "pos", "ref", "alt"]
+    assert result.height == 4
+    assert set(result.get_column("id").to_list()) == {packed.get_column("id")[0], hashed.get_column("id")[0]}
+    assert result.get_column("hashed").sum() == 2
+
+    counters = struct.variants.id_counters([*paths, collide_path])
+
+    assert counters.get_column("file").to_list() == [str(path) for path in [*paths, collide_path]]
+    assert counters.get_column("variants").to_list() == [23, 25, 3]
+    assert counters.get_column("packed").to_list() == [23, 24, 1]
+    assert counters.get_column("hashed").to_list() == [0, 1, 2]
@@ -3,13 +3,23 @@
 # std import
 from __future__ import annotations
 
+import json
+import os
 import pathlib
+import shutil
+import tempfile
+import threading
+import typing
 
 # 3rd party import
 import polars
+import polars.testing
+import pytest
 
 # project import
-from variantplaner.objects import Vcf, VcfParsingBehavior
+from variantplaner.io.vcf import MAX_POSITION, is_bcf, merge_regions, parse_region, regions_filter
+from variantplaner.objects import Genotypes, Vcf, VcfHeader, VcfParsingBehavior, vcf, vcf_header
+from variantplaner.objects.vcf import INFO_STRUCT_COLUMN
 
 DATA_DIR = pathlib.Path(__file__).parent / "data"
 
@@ -37,3 +47,587 @@ def test_chrom2length_overide_vcf_contig() -> None:
     obj.from_path(vcf_path, DATA_DIR / "grch38.92.csv")
 
     assert obj.lf.null_count().collect().get_column("id").to_list() == [0]
+
+
+def test_native_reader_match_scan_csv() -> None:
+    """Native reader and polars.scan_csv produce same lazyframe."""
+    vcf_path = DATA_DIR / "no_info.vcf"
+
+    native = Vcf()
+    native.from_path(vcf_path, DATA_DIR / "grch38.92.csv")
+
+    scan_csv = Vcf()
+    scan_csv.from_path(vcf_path, DATA_DIR / "grch38.92.csv", native=False)
+
+    polars.testing.assert_frame_equal(native.lf.collect(), scan_csv.lf.collect())
+
+
+class FakeReader:
+    """Replace variantplaner_rs vcf reader, yield batches of records."""
+
+    def __init__(self, batches: list[polars.DataFrame], header: list[str] | None = None) -> None:
+        """Initialize a FakeReader object."""
+        self.batches = batches
+        self.lines = header or []
+        self.info: list[tuple[str, str, str]] | None = None
+
+    def __iter__(self) -> typing.Iterator[polars.DataFrame]:
+        return iter(self.batches)
+
+    def header(self) -> list[str]:
+        """Get header lines."""
+        return self.lines
+
+
+def fake_register_io_source(
+    source: typing.Callable[..., typing.Iterator[polars.DataFrame]],
+    schema: dict[str, polars.PolarsDataType],
+) -> polars.LazyFrame:
+    """Replace polars io plugins, all batches of source are read."""
+    return polars.concat([polars.DataFrame(schema=schema), *source(None, None, None, None)]).lazy()
+
+
+def test_native_reader_without_io_plugins(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Without polars io plugins, vcf are scanned lazily by polars.scan_csv and bcf records are spooled."""
+    truth = Vcf()
+    truth.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv", native=False)
+
+    records = truth.lf.drop("id").collect()
+    reader = FakeReader([records[:10], records[10:]], truth.header._header)
+    calls = []
+
+    def fake_vcf_reader(*args: typing.Any, **_kwargs: typing.Any) -> FakeReader:
+        calls.append(args)
+        return reader
+
+    monkeypatch.setattr(vcf, "vcf_reader", fake_vcf_reader)
+    monkeypatch.setattr(vcf, "register_io_source", None)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    assert calls == []
+    assert list(tmp_path.iterdir()) == []
+    polars.testing.assert_frame_equal(obj.lf.collect(), truth.lf.collect())
+
+    monkeypatch.setattr(vcf, "is_bcf", lambda _path: True)
+
+    bcf = Vcf()
+    bcf.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    assert len(calls) == 2
+    assert len(list(tmp_path.glob("variantplaner_*/records_*/*.parquet"))) == 2
+    polars.testing.assert_frame_equal(bcf.lf.collect(), truth.lf.collect())
+
+
+def test_native_reader_info_struct(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Annotations are taken from INFO decoded by native reader."""
+    vcf_path = tmp_path / "info.vcf"
+    vcf_path.write_text(
+        "##fileformat=VCFv4.2\n"
+        '##INFO=<ID=DP,Number=1,Type=Integer,Description="Depth">\n'
+        '##INFO=<ID=AF,Number=A,Type=Float,Description="Allele frequency">\n'
+        "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n",
+    )
+    info_struct = polars.Series(
+        INFO_STRUCT_COLUMN,
+        [{"DP": 10, "AF": [0.5]}, {"DP": None, "AF": None}],
+        dtype=polars.Struct({"DP": polars.Int64, "AF": polars.List(polars.Float64)}),
+    )
+    records = polars.DataFrame(
+        {
+            "chr": ["1", "1"],
+            "pos": [10, 20],
+            "vid": ["rs1", None],
+            "ref": ["A", "C"],
+            "alt": ["T", "G"],
+            "qual": [None, None],
+            "filter": ["PASS", "PASS"],
+            "info": ["DP=10;AF=0.5", None],
+        },
+        schema_overrides={"pos": polars.UInt64, "qual": polars.String},
+    ).insert_column(8, info_struct)
+    reader = FakeReader([records])
+
+    monkeypatch.setattr(vcf, "vcf_reader", lambda *_args, **_kwargs: reader)
+    monkeypatch.setattr(vcf, "register_io_source", fake_register_io_source)
+
+    obj = Vcf()
+    obj.from_path(vcf_path, DATA_DIR / "grch38.92.csv")
+
+    assert reader.info == [("DP", "1", "Integer"), ("AF", "A", "Float")]
+
+    annotations = obj.annotations().collect()
+    assert annotations.columns == ["vid", "qual", "filter", "id", "DP", "AF"]
+    assert annotations.get_column("DP").to_list() == [10, None]
+    assert annotations.get_column("AF").to_list() == [[0.5], None]
+
+    assert obj.annotations({"DP"}).collect().columns == ["vid", "qual", "filter", "id", "DP"]
+    assert obj.info_struct({"not_an_info"}) is None
+
+    # reader didn't decode INFO when it's rewritten
+    reader = FakeReader([records.drop(INFO_STRUCT_COLUMN)])
+    monkeypatch.setattr(vcf, "vcf_reader", lambda *_args, **_kwargs: reader)
+
+    split = Vcf()
+    split.from_path(vcf_path, DATA_DIR / "grch38.92.csv", VcfParsingBehavior.SPLIT_MULTIALLELIC)
+    assert reader.info is None
+    assert INFO_STRUCT_COLUMN not in split.lf.collect_schema().names()
+
+
+def test_quarantine(tmp_path: pathlib.Path) -> None:
+    """Malformed records are written in quarantine file and other records are read."""
+    for native in (True, False):
+        quarantine_path = tmp_path / f"quarantine_{native}.tsv"
+
+        obj = Vcf()
+        obj.from_path(DATA_DIR / "malformed.vcf", DATA_DIR / "grch38.92.csv", native=native, quarantine=quarantine_path)
+
+        assert obj.lf.collect().get_column("pos").to_list() == [10146, 10492, 47115652, 47117927, 47117929]
+        assert [line.split("\t")[:2] for line in quarantine_path.read_text().splitlines()] == [
+            ["31", "position '10x40' isn't an integer"],
+            ["33", "record is truncated, 12 fields expected"],
+            ["34", "chromosome is empty"],
+        ]
+
+
+def test_bgzip_vcf() -> None:
+    """Bgzip compressed vcf produce same lazyframe than uncompressed vcf."""
+    plain = Vcf()
+    plain.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    for native in (True, False):
+        compressed = Vcf()
+        compressed.from_path(DATA_DIR / "no_info.vcf.gz", DATA_DIR / "grch38.92.csv", native=native, threads=2)
+
+        assert compressed.header._header == plain.header._header
+        polars.testing.assert_frame_equal(compressed.lf.collect(), plain.lf.collect())
+
+
+def test_bcf() -> None:
+    """Bcf produce same variants, genotypes and annotations than the equivalent vcf."""
+    assert is_bcf(DATA_DIR / "multiallelic.bcf")
+    assert not is_bcf(DATA_DIR / "multiallelic.vcf")
+    assert not is_bcf(DATA_DIR / "no_info.vcf.gz")
+
+    vcf = Vcf()
+    vcf.from_path(DATA_DIR / "multiallelic.vcf", None)
+
+    bcf = Vcf()
+    bcf.from_path(DATA_DIR / "multiallelic.bcf", None, native=False)
+
+    assert bcf.header.samples_index == vcf.header.samples_index
+    polars.testing.assert_frame_equal(bcf.variants().collect(), vcf.variants().collect())
+    polars.testing.assert_frame_equal(
+        bcf.genotypes().lf.collect().sort("id", "sample"),
+        vcf.genotypes().lf.collect().sort("id", "sample"),
+    )
+
+    # missing trailing FORMAT values are write by bcf, sample columns aren't compared
+    samples = list(vcf.header.samples_index or {})
+    polars.testing.assert_frame_equal(
+        bcf.annotations().drop(samples).collect(),
+        vcf.annotations().drop(samples).collect(),
+    )
+
+    regions = Vcf()
+    regions.from_path(DATA_DIR / "multiallelic.bcf", None, regions=[("chr1", 150, 250)])
+    assert regions.lf.select("chr", "pos").collect().rows() == [("chr1", 200)]
+
+
+def test_regions() -> None:
+    """Only variants overlapping regions are read, with or without tabix index."""
+    regions = [("1", 10_000, 10_500), ("20", 45_698_966, 45_698_966), ("MT", 16_500, 20_000)]
+    truth = [("1", 10146), ("1", 10440), ("1", 10492), ("20", 45698966), ("MT", 16519)]
+
+    for vcf_path in (DATA_DIR / "no_info.vcf", DATA_DIR / "no_info.vcf.gz"):
+        for native in (True, False):
+            obj = Vcf()
+            obj.from_path(vcf_path, DATA_DIR / "grch38.92.csv", native=native, regions=regions)
+
+            assert obj.lf.select("chr", "pos").collect().rows() == truth
+
+
+def test_many_regions(tmp_path: pathlib.Path) -> None:
+    """More than 10k regions are merged and filtered from file and stream."""
+    regions = [("1", start, start + 4) for start in range(1, 100_000, 8)]
+    regions += [("1", 10_000, 10_500), ("20", 45_698_966, 45_698_966), ("MT", 16_500, 20_000), ("MT", 16_000, 16_600)]
+    assert len(regions) > 10_000
+
+    assert merge_regions([("2", 5, 10), ("1", 20, 30), ("2", 11, 12), ("2", 1, 6), ("1", 32, 40)]) == [
+        ("1", 20, 30),
+        ("1", 32, 40),
+        ("2", 1, 12),
+    ]
+
+    everything = Vcf()
+    everything.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv", native=False)
+    truth = [
+        (chrom, pos)
+        for (chrom, pos, ref) in everything.lf.select("chr", "pos", "ref").collect().rows()
+        if any(c == chrom and start <= pos + len(ref) - 1 and pos <= stop for (c, start, stop) in regions)
+    ]
+    assert len(truth) > 5
+    assert everything.lf.filter(regions_filter([])).collect().height == 0
+
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv", native=False, regions=regions)
+    assert obj.lf.select("chr", "pos").collect().rows() == truth
+
+    fifo_path = tmp_path / "input.vcf"
+    os.mkfifo(fifo_path)
+
+    def writer() -> None:
+        with open(fifo_path, "wb") as fh:
+            fh.write((DATA_DIR / "no_info.vcf").read_bytes())
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+
+    stream = Vcf()
+    stream.from_path(fifo_path, DATA_DIR / "grch38.92.csv", native=False, regions=regions)
+    assert stream.lf.select("chr", "pos").collect().rows() == truth
+    thread.join()
+
+
+def test_parse_region() -> None:
+    """Parse region string and bed file."""
+    assert parse_region("chr1") == ("chr1", 1, MAX_POSITION)
+    assert parse_region("chr1:1,000") == ("chr1", 1000, MAX_POSITION)
+    assert parse_region("chr1:100-200") == ("chr1", 100, 200)
+
+    with pytest.raises(ValueError, match="isn't valid"):
+        parse_region("chr1:a-b")
+
+    with pytest.raises(ValueError, match="lower than start"):
+        parse_region("chr1:200-100")
+
+
+def test_info_struct_match_info_parser() -> None:
+    """Single pass info parsing produce same columns than regex parsing."""
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "all_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    polars.testing.assert_frame_equal(
+        obj.lf.select(obj.header.info_struct()).unnest("info").collect(),
+        obj.lf.select(obj.header.info_parser()).collect(),
+    )
+
+    assert obj.header.info_struct({"not_an_info"}) is None
+
+    # native reader decode INFO in info_struct column
+    assert INFO_STRUCT_COLUMN in obj.lf.collect_schema().names()
+    polars.testing.assert_frame_equal(
+        obj.lf.select(obj.info_struct()).collect(),
+        obj.lf.select(obj.header.info_struct()).collect(),
+    )
+
+
+def test_genotypes_samples_batch() -> None:
+    """Genotypes extract by batch of samples match genotypes extract in one pass."""
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    truth = obj.genotypes().lf.collect().sort("id", "sample")
+
+    for samples_batch_size in (1, 2):
+        polars.testing.assert_frame_equal(
+            obj.genotypes(samples_batch_size=samples_batch_size).lf.collect().sort("id", "sample"),
+            truth,
+        )
+
+    assert (truth.get_column("gt") > 0).all()
+
+
+def test_genotypes_samples_batch_read_once(tmp_path: pathlib.Path) -> None:
+    """Source is read once when genotypes are extract by batch of samples."""
+    vcf_path = tmp_path / "input.vcf"
+    shutil.copy(DATA_DIR / "no_info.vcf", vcf_path)
+
+    obj = Vcf()
+    obj.from_path(vcf_path, DATA_DIR / "grch38.92.csv", native=False)
+    truth = obj.genotypes().lf.collect().sort("id", "sample")
+
+    genotypes = obj.genotypes(samples_batch_size=1)
+    vcf_path.unlink()
+
+    polars.testing.assert_frame_equal(genotypes.lf.collect().sort("id", "sample"), truth)
+
+
+def test_spool(tmp_path: pathlib.Path) -> None:
+    """Spooled records are read instead of source by all next plans."""
+    vcf_path = tmp_path / "input.vcf"
+    shutil.copy(DATA_DIR / "no_info.vcf", vcf_path)
+
+    obj = Vcf()
+    obj.from_path(vcf_path, DATA_DIR / "grch38.92.csv", native=False)
+    variants = obj.variants().collect()
+    genotypes = obj.genotypes().lf.collect().sort("id", "sample")
+
+    obj.spool()
+    vcf_path.unlink()
+
+    polars.testing.assert_frame_equal(obj.variants().collect(), variants)
+    polars.testing.assert_frame_equal(obj.genotypes().lf.collect().sort("id", "sample"), genotypes)
+
+
+def test_genotypes_per_record_format() -> None:
+    """Records with another FORMAT are kept when FORMAT keys are resolved per record."""
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    default = obj.genotypes().lf.collect()
+    per_record = obj.genotypes(per_record_format=True).lf.collect()
+
+    assert per_record.height == default.height + 1
+    assert per_record.join(default, on=["id", "sample"], how="anti").get_column("dp").to_list() == [None]
+
+    subset = obj.genotypes("GT:DP:GQ", per_record_format=True).lf.collect()
+    assert subset.columns == ["id", "sample", "gt", "dp", "gq"]
+    assert subset.height == per_record.height
+
+
+def test_genotypes_compact() -> None:
+    """Compact genotypes use a fixed schema and keep values."""
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    truth = obj.genotypes().lf.collect()
+    compact = obj.genotypes(compact=True)
+
+    schema = compact.lf.collect_schema()
+    assert schema["gq"] == polars.UInt8
+    assert schema["dp"] == polars.UInt16
+    assert schema["ad"] == polars.List(polars.UInt16)
+    assert "variantplaner:genotypes_schema" in compact.metadata
+
+    polars.testing.assert_frame_equal(compact.lf.collect(), truth, check_dtypes=False)
+
+    description = json.loads(compact.metadata["variantplaner:genotypes_schema"])
+    assert description["format"] == {"ad": ["R", "Integer"], "dp": ["1", "Integer"], "gq": ["1", "Integer"]}
+    assert description["quantised"] == {"gq": 255, "dp": 65535, "ad": 65535}
+
+
+def test_genotypes_compact_header(tmp_path: pathlib.Path) -> None:
+    """Compact schema depends only on header, integer are signed or quantised and Float are Float32."""
+    vcf_path = tmp_path / "float.vcf"
+    vcf_path.write_text(
+        "##fileformat=VCFv4.2\n"
+        '##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n'
+        '##FORMAT=<ID=GQ,Number=1,Type=Integer,Description="Genotype quality">\n'
+        '##FORMAT=<ID=PL,Number=G,Type=Integer,Description="Phred-scaled likelihoods">\n'
+        '##FORMAT=<ID=SC,Number=1,Type=Integer,Description="Signed score">\n'
+        '##FORMAT=<ID=AF,Number=A,Type=Float,Description="Allele fraction">\n'
+        '##FORMAT=<ID=VAF,Number=1,Type=Float,Description="Variant allele fraction">\n'
+        "#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tsample\n",
+    )
+    header = VcfHeader()
+    header.from_files(vcf_path)
+
+    values = polars.LazyFrame(
+        {
+            "id": [1, 2],
+            "sample": ["sample", "sample"],
+            "gt": [1, 2],
+            "gq": [300, 12],
+            "pl": [[0, 30, 1000], [None, 5, 0]],
+            "sc": [-5, 1 << 40],
+            "af": [["0.5"], ["."]],
+            "vaf": ["0.25", "."],
+        },
+        schema_overrides={"id": polars.UInt64, "gt": polars.UInt8},
+    )
+
+    genotypes = Genotypes(values)
+    metadata = genotypes.compact(header)
+    compact = genotypes.lf.collect()
+
+    assert compact.schema == {
+        "id": polars.UInt64,
+        "sample": polars.String,
+        "gt": polars.UInt8,
+        "gq": polars.UInt8,
+        "pl": polars.List(polars.UInt8),
+        "sc": polars.Int32,
+        "af": polars.List(polars.Float32),
+        "vaf": polars.Float32,
+    }
+    assert compact.get_column("gq").to_list() == [255, 12]
+    assert compact.get_column("pl").to_list() == [[0, 30, 255], [None, 5, 0]]
+    assert compact.get_column("sc").to_list() == [-5, None]
+    assert compact.get_column("vaf").to_list() == [0.25, None]
+
+    description = json.loads(metadata["variantplaner:genotypes_schema"])
+    assert description["out_of_range"] == "null"
+    assert description["schema"]["sc"] == "Int32"
+    assert description["format"] == {
+        "gq": ["1", "Integer"],
+        "pl": ["G", "Integer"],
+        "sc": ["1", "Integer"],
+        "af": ["A", "Float"],
+        "vaf": ["1", "Float"],
+    }
+
+
+def test_format_parser_compact_signed() -> None:
+    """Compact parser keep negative Integer values."""
+    header = VcfHeader()
+    header.from_files(DATA_DIR / "no_info.vcf")
+    parser = header.format_parser(compact=True)
+
+    value = polars.DataFrame({"value": ["-3", "."], "values": ["-1,2", "3,."]}).select(
+        parser["DP"](polars.col("value"), "DP"),
+        parser["AD"](polars.col("values"), "AD"),
+    )
+
+    assert value.schema == {"dp": polars.Int32, "ad": polars.List(polars.Int32)}
+    assert value.get_column("dp").to_list() == [-3, None]
+    assert value.get_column("ad").to_list() == [[-1, 2], [3, None]]
+
+
+def test_genotypes_quality_filter() -> None:
+    """Quality filters drop calls before unpivot like a filter after extraction."""
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    truth = obj.genotypes().lf.collect().sort("id", "sample")
+    ab = (polars.col("ad").list.sum() - polars.col("ad").list.first()) / polars.col("ad").list.sum()
+    expected = truth.filter((polars.col("gq") >= 60) & (polars.col("dp") >= 10) & (ab >= 0.3))
+
+    polars.testing.assert_frame_equal(
+        obj.genotypes(min_gq=60, min_dp=10, min_ab=0.3).lf.collect().sort("id", "sample"),
+        expected,
+    )
+    polars.testing.assert_frame_equal(
+        obj.genotypes(min_gq=60, min_dp=10, min_ab=0.3, per_record_format=True).lf.collect().sort("id", "sample"),
+        expected,
+    )
+
+    pass_ids = obj.lf.filter(polars.col("filter") == "PASS").select("id")
+    polars.testing.assert_frame_equal(
+        obj.genotypes(pass_only=True).lf.collect().sort("id", "sample"),
+        truth.join(pass_ids.collect(), on="id", how="semi"),
+    )
+
+    with pytest.raises(ValueError, match="GQ"):
+        obj.genotypes("GT:AD:DP", min_gq=60)
+
+
+def test_genotypes_gt_decode() -> None:
+    """GT is decoded in number of alternative alleles and packed genotype, multi-allelic, phased and haploid calls are kept."""
+    obj = Vcf()
+    obj.from_path(DATA_DIR / "multiallelic.vcf", None)
+
+    assert obj.genotypes("GT:DP", per_record_format=True).lf.collect_schema().names() == ["id", "sample", "gt", "dp"]
+
+    value = obj.genotypes("GT:DP", per_record_format=True, gt_packed=True).lf.collect()
+    assert value.columns == ["id", "sample", "gt", "gt_packed", "dp"]
+    assert sorted(value.select("gt", "gt_packed", "dp").rows()) == [
+        (1, 1 | 2 << 8, None),
+        (1, 2 | 1 << 8 | 2 << 16, 10),
+        (1, 2 | 1 << 8 | 2 << 16, 12),
+        (1, 2 | 1 << 8 | 4 << 16, 4),
+        (2, 2 | 1 << 4 | 2 << 8 | 3 << 16, 7),
+        (2, 2 | 3 << 8 | 3 << 16, 9),
+        (3, 3 | 2 << 8 | 2 << 16 | 3 << 24, 5),
+    ]
+
+    encoded = value.select(
+        polars.col("gt_packed").vcf_format.encode_gt(),  # type: ignore[attr-defined]
+    ).get_column("gt_packed")
+    assert sorted(encoded.to_list()) == ["0/1", "0/1", "0/3", "1", "1/1/2", "1|2", "2/2"]
+
+
+def test_header_model(tmp_path: pathlib.Path) -> None:
+    """Header model is parsed once and cached by fingerprint."""
+    first = VcfHeader()
+    first.from_files(DATA_DIR / "no_info.vcf")
+    second = VcfHeader()
+    second.from_files(DATA_DIR / "no_info.vcf.gz")
+
+    assert first.fingerprint == second.fingerprint
+    assert second.model is first.model
+    assert first.model.format["AD"] == ("R", "Integer")
+    assert first.model.samples == list(first.samples_index or {})
+
+    VcfHeader.cache_dir = tmp_path
+    try:
+        vcf_header.MODEL_CACHE.clear()
+        cached = VcfHeader()
+        cached.from_files(DATA_DIR / "all_info.vcf")
+        model = cached.model
+    finally:
+        VcfHeader.cache_dir = None
+
+    assert (tmp_path / f"{cached.fingerprint}.json").is_file()
+    assert (
+        vcf_header.HeaderModel.from_json(
+            json.loads((tmp_path / f"{cached.fingerprint}.json").read_text()),
+        )
+        == model
+    )
+
+
+def test_header_cache_dir_env(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Environment variable VARIANTPLANER_CACHE_DIR is read when model is parsed."""
+    monkeypatch.setenv("VARIANTPLANER_CACHE_DIR", str(tmp_path))
+    vcf_header.MODEL_CACHE.clear()
+
+    header = VcfHeader()
+    header.from_files(DATA_DIR / "all_info.vcf")
+    assert header.model is not None
+
+    assert (tmp_path / f"{header.fingerprint}.json").is_file()
+    assert [path.name for path in tmp_path.iterdir()] == [f"{header.fingerprint}.json"]
+
+
+def test_header_cache_invalid(tmp_path: pathlib.Path) -> None:
+    """Unreadable or invalid disk cache entries are a cache miss and are replaced."""
+    truth = VcfHeader()
+    truth.from_files(DATA_DIR / "all_info.vcf")
+    assert truth.model.info
+    cache_path = tmp_path / f"{truth.fingerprint}.json"
+
+    try:
+        VcfHeader.cache_dir = tmp_path
+        for content in ('{"info": {', '{"info": {}}', "[]"):
+            cache_path.write_text(content)
+            vcf_header.MODEL_CACHE.clear()
+
+            header = VcfHeader()
+            header.from_files(DATA_DIR / "all_info.vcf")
+
+            assert header.model == truth.model
+            assert json.loads(cache_path.read_text())["info"] == {
+                key: list(value) for (key, value) in truth.model.info.items()
+            }
+    finally:
+        VcfHeader.cache_dir = None
+        vcf_header.MODEL_CACHE.clear()
+
+
+def test_stream(tmp_path: pathlib.Path) -> None:
+    """Vcf read from a FIFO produce same lazyframe than vcf read from a file."""
+    fifo_path = tmp_path / "input.vcf"
+    os.mkfifo(fifo_path)
+
+    def writer() -> None:
+        with open(fifo_path, "wb") as fh:
+            fh.write((DATA_DIR / "no_info.vcf.gz").read_bytes())
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+
+    stream = Vcf()
+    stream.from_path(fifo_path, DATA_DIR / "grch38.92.csv")
+    thread.join()
+
+    file = Vcf()
+    file.from_path(DATA_DIR / "no_info.vcf", DATA_DIR / "grch38.92.csv")
+
+    polars.testing.assert_frame_equal(stream.lf.collect(), file.lf.collect())
+    polars.testing.assert_frame_equal(
+        stream.genotypes().lf.collect().sort("id", "sample"),
+        file.genotypes().lf.collect().sort("id", "sample"),
+    )
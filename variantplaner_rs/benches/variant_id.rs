@@ -0,0 +1,101 @@
+//! Benchmark of variant id kernels
+
+/* std use */
+
+/* crate use */
+use criterion::{black_box, criterion_group, criterion_main, BenchmarkId, Criterion, Throughput};
+
+/* polars use */
+use polars_core::prelude::*;
+
+/* project use */
+use variantplaner_rs::variant_id::{local_compute, local_part};
+
+/// Max position of GRCh38
+const MAX_POS: u64 = 3_088_269_832;
+
+/// Number of variants in each benchmark
+const SIZES: [usize; 2] = [1 << 16, 1 << 22];
+
+/// Deterministic variants, one on 64 has a long alt that must be hashed, if `nulls` one on 128 is null
+fn variants(number: usize, nulls: bool) -> (UInt64Chunked, StringChunked, StringChunked) {
+    let nucs = ["A", "C", "G", "T"];
+    let long = "ACGT".repeat(16);
+
+    let mut state: u64 = 42;
+    let mut positions = Vec::with_capacity(number);
+    let mut refs = Vec::with_capacity(number);
+    let mut alts = Vec::with_capacity(number);
+    for index in 0..number {
+        // xorshift
+        state ^= state << 13;
+        state ^= state >> 7;
+        state ^= state << 17;
+
+        let null = nulls && index % 128 == 0;
+        positions.push(if null { None } else { Some(state % MAX_POS) });
+        refs.push(Some(nucs[(state >> 32) as usize % 4].to_string()));
+        alts.push(Some(if index % 64 == 0 {
+            long.clone()
+        } else {
+            nucs[(state >> 40) as usize % 4].to_string()
+        }));
+    }
+
+    (
+        UInt64Chunked::from_iter_options("real_pos", positions.into_iter()),
+        StringChunked::from_iter_options("ref", refs.into_iter()),
+        StringChunked::from_iter_options("alt", alts.into_iter()),
+    )
+}
+
+fn compute(c: &mut Criterion) {
+    let mut group = c.benchmark_group("compute");
+
+    for size in SIZES {
+        group.throughput(Throughput::Elements(size as u64));
+
+        for nulls in [false, true] {
+            let (real_pos, ref_seq, alt_seq) = variants(size, nulls);
+            let name = if nulls { "nulls" } else { "no_null" };
+
+            group.bench_with_input(BenchmarkId::new(name, size), &size, |b, _| {
+                b.iter(|| {
+                    local_compute(
+                        black_box(&real_pos),
+                        black_box(&ref_seq),
+                        black_box(&alt_seq),
+                        MAX_POS,
+                    )
+                    .unwrap()
+                })
+            });
+        }
+    }
+
+    group.finish();
+}
+
+fn partition(c: &mut Criterion) {
+    let mut group = c.benchmark_group("partition");
+
+    for size in SIZES {
+        group.throughput(Throughput::Elements(size as u64));
+
+        for nulls in [false, true] {
+            let (real_pos, ref_seq, alt_seq) = variants(size, nulls);
+            let id = local_compute(&real_pos, &ref_seq, &alt_seq, MAX_POS).unwrap();
+            let id = id.u64().unwrap();
+            let name = if nulls { "nulls" } else { "no_null" };
+
+            group.bench_with_input(BenchmarkId::new(name, size), &size, |b, _| {
+                b.iter(|| local_part(black_box(id), 8).unwrap())
+            });
+        }
+    }
+
+    group.finish();
+}
+
+criterion_group!(benches, compute, partition);
+criterion_main!(benches);
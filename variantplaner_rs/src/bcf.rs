@@ -0,0 +1,818 @@
+//! Native bcf record reader
+//!
+//! Records are decoded in same columns as vcf reader, value are write in vcf text format, all downstream parsing is shared.
+
+/* std use */
+use std::collections::HashMap;
+use std::fmt::Write as _;
+use std::io::{BufRead, Read};
+
+/* crate use */
+
+/* polars use */
+use polars_core::prelude::*;
+
+/* project use */
+use crate::index;
+
+/// First bytes of a bcf file, major version is 2
+pub(crate) const BCF_MAGIC: &[u8] = b"BCF\x02";
+
+/// Typed value types
+const MISSING: u8 = 0;
+const INT8: u8 = 1;
+const INT16: u8 = 2;
+const INT32: u8 = 3;
+const FLOAT: u8 = 5;
+const CHAR: u8 = 7;
+
+/// Float missing and vector end bit pattern
+const FLOAT_MISSING: u32 = 0x7F80_0001;
+const FLOAT_END: u32 = 0x7F80_0002;
+
+pub(crate) fn is_bcf(head: &[u8]) -> bool {
+    head.starts_with(BCF_MAGIC)
+}
+
+/// Associate integer of bcf records to header strings
+#[derive(Debug, Default)]
+struct Dictionary {
+    names: Vec<Option<String>>,
+    index: HashMap<String, usize>,
+}
+
+impl Dictionary {
+    fn insert(&mut self, name: &str, idx: Option<usize>) {
+        match idx {
+            Some(idx) => {
+                if self.names.len() <= idx {
+                    self.names.resize(idx + 1, None);
+                }
+                self.names[idx] = Some(name.to_string());
+                self.index.insert(name.to_string(), idx);
+            }
+            None if !self.index.contains_key(name) => {
+                self.index.insert(name.to_string(), self.names.len());
+                self.names.push(Some(name.to_string()));
+            }
+            None => (),
+        }
+    }
+
+    fn get(&self, idx: i32) -> PolarsResult<&str> {
+        usize::try_from(idx)
+            .ok()
+            .and_then(|idx| self.names.get(idx))
+            .and_then(|name| name.as_deref())
+            .ok_or_else(
+                || polars_err!(ComputeError: "bcf record use index {} absent of header", idx),
+            )
+    }
+}
+
+/// Split attributes of a structured header line, comma in quoted value are ignored
+fn parse_attributes(attributes: &str) -> HashMap<&str, &str> {
+    let mut result = HashMap::new();
+    let mut in_quote = false;
+    let mut begin = 0;
+
+    for (index, c) in attributes
+        .char_indices()
+        .chain(std::iter::once((attributes.len(), ',')))
+    {
+        match c {
+            '"' => in_quote = !in_quote,
+            ',' if !in_quote => {
+                if let Some((key, value)) = attributes[begin..index].split_once('=') {
+                    result.insert(key, value);
+                }
+                begin = index + 1;
+            }
+            _ => (),
+        }
+    }
+
+    result
+}
+
+/// Header of a bcf file
+#[derive(Debug)]
+pub(crate) struct Header {
+    pub(crate) lines: Vec<String>,
+    strings: Dictionary,
+    contigs: Dictionary,
+}
+
+impl Header {
+    /// Read magic and header text of a bcf, records are not consumed
+    pub(crate) fn read<R: BufRead>(input: &mut R) -> PolarsResult<Self> {
+        let mut magic = [0u8; 5];
+        input.read_exact(&mut magic)?;
+        polars_ensure!(is_bcf(&magic), ComputeError: "input isn't a bcf file");
+
+        let mut length = [0u8; 4];
+        input.read_exact(&mut length)?;
+
+        let mut text = vec![0u8; u32::from_le_bytes(length) as usize];
+        input.read_exact(&mut text)?;
+
+        let text = std::str::from_utf8(&text)
+            .map_err(|_| polars_err!(ComputeError: "bcf header isn't valid utf-8"))?;
+
+        Ok(Self::from_text(text.trim_end_matches('\0')))
+    }
+
+    /// Build dictionaries, PASS is always the first string, IDX attribute is respected
+    fn from_text(text: &str) -> Self {
+        let lines: Vec<String> = text
+            .lines()
+            .filter(|line| !line.is_empty())
+            .map(String::from)
+            .collect();
+
+        let mut strings = Dictionary::default();
+        strings.insert("PASS", None);
+        let mut contigs = Dictionary::default();
+
+        for line in lines.iter() {
+            let Some((key, value)) = line
+                .strip_prefix("##")
+                .and_then(|line| line.split_once('='))
+            else {
+                continue;
+            };
+            let Some(attributes) = value
+                .strip_prefix('<')
+                .and_then(|value| value.strip_suffix('>'))
+            else {
+                continue;
+            };
+
+            let attributes = parse_attributes(attributes);
+            let Some(id) = attributes.get("ID") else {
+                continue;
+            };
+            let idx = attributes
+                .get("IDX")
+                .and_then(|idx| idx.parse::<usize>().ok());
+
+            match key {
+                "FILTER" | "INFO" | "FORMAT" => strings.insert(id, idx),
+                "contig" => contigs.insert(id, idx),
+                _ => (),
+            }
+        }
+
+        Self {
+            lines,
+            strings,
+            contigs,
+        }
+    }
+}
+
+/// One value of a typed vector
+enum Value {
+    Int(i32),
+    Float(f32),
+    Missing,
+    End,
+}
+
+fn type_size(value_type: u8) -> PolarsResult<usize> {
+    match value_type {
+        MISSING => Ok(0),
+        INT8 | CHAR => Ok(1),
+        INT16 => Ok(2),
+        INT32 | FLOAT => Ok(4),
+        _ => polars_bail!(ComputeError: "bcf type {} isn't supported", value_type),
+    }
+}
+
+#[inline(always)]
+fn decode(value_type: u8, bytes: &[u8]) -> Value {
+    match value_type {
+        INT8 => match bytes[0] as i8 {
+            i8::MIN => Value::Missing,
+            -127 => Value::End,
+            v => Value::Int(v as i32),
+        },
+        INT16 => match i16::from_le_bytes([bytes[0], bytes[1]]) {
+            i16::MIN => Value::Missing,
+            -32767 => Value::End,
+            v => Value::Int(v as i32),
+        },
+        INT32 => match i32::from_le_bytes([bytes[0], bytes[1], bytes[2], bytes[3]]) {
+            i32::MIN => Value::Missing,
+            -2147483647 => Value::End,
+            v => Value::Int(v),
+        },
+        FLOAT => match u32::from_le_bytes([bytes[0], bytes[1], bytes[2], bytes[3]]) {
+            FLOAT_MISSING => Value::Missing,
+            FLOAT_END => Value::End,
+            v => Value::Float(f32::from_bits(v)),
+        },
+        _ => Value::Missing,
+    }
+}
+
+fn trim_zeros(number: &str) -> &str {
+    if number.contains('.') {
+        number.trim_end_matches('0').trim_end_matches('.')
+    } else {
+        number
+    }
+}
+
+/// Write float like printf %g, format used by htslib to write vcf
+fn write_float(out: &mut String, value: f32) {
+    let value = value as f64;
+    if value == 0.0 {
+        out.push('0');
+        return;
+    }
+    if value.is_nan() {
+        out.push_str("nan");
+        return;
+    }
+    if value.is_infinite() {
+        out.push_str(if value > 0.0 { "inf" } else { "-inf" });
+        return;
+    }
+
+    let scientific = format!("{:.5e}", value);
+    let (mantissa, exponent) = scientific.split_once('e').unwrap_or((&scientific, "0"));
+    let exponent: i32 = exponent.parse().unwrap_or(0);
+
+    if !(-4..6).contains(&exponent) {
+        let sign = if exponent < 0 { '-' } else { '+' };
+        let _ = write!(
+            out,
+            "{}e{}{:02}",
+            trim_zeros(mantissa),
+            sign,
+            exponent.abs()
+        );
+    } else {
+        out.push_str(trim_zeros(&format!(
+            "{:.*}",
+            (5 - exponent) as usize,
+            value
+        )));
+    }
+}
+
+/// Write typed vector, missing value are write as '.' and vector end stop writing
+fn write_values(out: &mut String, value_type: u8, values: &[u8]) -> PolarsResult<()> {
+    let begin = out.len();
+
+    if value_type == CHAR {
+        let end = values.iter().position(|c| *c == 0).unwrap_or(values.len());
+        out.push_str(
+            std::str::from_utf8(&values[..end])
+                .map_err(|_| polars_err!(ComputeError: "bcf string isn't valid utf-8"))?,
+        );
+    } else if value_type != MISSING {
+        for (index, value) in values.chunks_exact(type_size(value_type)?).enumerate() {
+            let value = decode(value_type, value);
+            if matches!(value, Value::End) {
+                break;
+            }
+            if index > 0 {
+                out.push(',');
+            }
+            match value {
+                Value::Int(v) => {
+                    let _ = write!(out, "{}", v);
+                }
+                Value::Float(v) => write_float(out, v),
+                _ => out.push('.'),
+            }
+        }
+    }
+
+    if out.len() == begin {
+        out.push('.');
+    }
+
+    Ok(())
+}
+
+/// Write genotype, allele are store as (allele + 1) << 1 | phased
+fn write_gt(out: &mut String, value_type: u8, values: &[u8]) -> PolarsResult<()> {
+    let begin = out.len();
+
+    if value_type != MISSING && value_type != CHAR && value_type != FLOAT {
+        for (index, value) in values.chunks_exact(type_size(value_type)?).enumerate() {
+            match decode(value_type, value) {
+                Value::Int(v) => {
+                    if index > 0 {
+                        out.push(if v & 1 == 1 { '|' } else { '/' });
+                    }
+                    match (v >> 1) - 1 {
+                        allele if allele < 0 => out.push('.'),
+                        allele => {
+                            let _ = write!(out, "{}", allele);
+                        }
+                    }
+                }
+                Value::Missing => {
+                    if index > 0 {
+                        out.push('/');
+                    }
+                    out.push('.');
+                }
+                _ => break,
+            }
+        }
+    }
+
+    if out.len() == begin {
+        out.push('.');
+    }
+
+    Ok(())
+}
+
+/// Sequential reader of bcf record content
+struct Cursor<'a> {
+    data: &'a [u8],
+    position: usize,
+}
+
+impl<'a> Cursor<'a> {
+    fn new(data: &'a [u8]) -> Self {
+        Self { data, position: 0 }
+    }
+
+    fn take(&mut self, length: usize) -> PolarsResult<&'a [u8]> {
+        polars_ensure!(
+            self.position + length <= self.data.len(),
+            ComputeError: "bcf record is truncated"
+        );
+
+        let slice = &self.data[self.position..self.position + length];
+        self.position += length;
+
+        Ok(slice)
+    }
+
+    fn i32(&mut self) -> PolarsResult<i32> {
+        let bytes = self.take(4)?;
+        Ok(i32::from_le_bytes([bytes[0], bytes[1], bytes[2], bytes[3]]))
+    }
+
+    fn u32(&mut self) -> PolarsResult<u32> {
+        Ok(self.i32()? as u32)
+    }
+
+    /// Read a type descriptor, return type and number of values
+    fn descriptor(&mut self) -> PolarsResult<(u8, usize)> {
+        let byte = self.take(1)?[0];
+        let mut number = (byte >> 4) as usize;
+        if number == 15 {
+            number = usize::try_from(self.typed_int()?)
+                .map_err(|_| polars_err!(ComputeError: "bcf vector length is negative"))?;
+        }
+
+        Ok((byte & 0x0F, number))
+    }
+
+    fn typed_int(&mut self) -> PolarsResult<i32> {
+        let (value_type, number) = self.descriptor()?;
+        polars_ensure!(number == 1, ComputeError: "bcf expect one integer get {}", number);
+
+        match decode(value_type, self.take(type_size(value_type)?)?) {
+            Value::Int(value) => Ok(value),
+            _ => polars_bail!(ComputeError: "bcf expect an integer"),
+        }
+    }
+
+    /// Read a typed vector, return type and raw values
+    fn typed_values(&mut self) -> PolarsResult<(u8, &'a [u8])> {
+        let (value_type, number) = self.descriptor()?;
+
+        Ok((value_type, self.take(number * type_size(value_type)?)?))
+    }
+}
+
+#[inline(always)]
+fn append(builder: Option<&mut StringChunkedBuilder>, value: &str) {
+    if let Some(builder) = builder {
+        if value.is_empty() {
+            builder.append_null()
+        } else {
+            builder.append_value(value)
+        }
+    }
+}
+
+/// Read at most `batch_size` records of `input` in a DataFrame, `header` must be already read.
+///
+/// Output have same layout and same text value than [crate::vcf::read_batch] on the equivalent vcf, column `chr` is a String,
+/// `pos` an UInt64 and all other column are String. Sample column after the last sample of record are set to null.
+/// If `regions` is set, records that didn't overlap a region are skipped.
+pub(crate) fn read_batch<R: BufRead>(
+    input: &mut R,
+    header: &Header,
+    column_names: &[String],
+    batch_size: usize,
+    record_number: &mut usize,
+    regions: Option<&index::Regions>,
+) -> PolarsResult<Option<DataFrame>> {
+    polars_ensure!(column_names.len() >= 2, ComputeError: "bcf reader require at least chr and pos columns");
+
+    let mut chr = StringChunkedBuilder::new(&column_names[0], batch_size);
+    let mut pos = PrimitiveChunkedBuilder::<UInt64Type>::new(&column_names[1], batch_size);
+    let mut others: Vec<StringChunkedBuilder> = column_names[2..]
+        .iter()
+        .map(|name| StringChunkedBuilder::new(name, batch_size))
+        .collect();
+
+    let mut shared = Vec::with_capacity(1024);
+    let mut indiv = Vec::with_capacity(1024);
+    let mut field = String::with_capacity(1024);
+    let mut alt = String::with_capacity(1024);
+    let mut formats = Vec::new();
+
+    let mut records = 0;
+    while records < batch_size {
+        if input.fill_buf()?.is_empty() {
+            break;
+        }
+
+        let mut lengths = [0u8; 8];
+        input.read_exact(&mut lengths)?;
+        *record_number += 1;
+
+        shared.resize(
+            u32::from_le_bytes([lengths[0], lengths[1], lengths[2], lengths[3]]) as usize,
+            0,
+        );
+        input.read_exact(&mut shared)?;
+        indiv.resize(
+            u32::from_le_bytes([lengths[4], lengths[5], lengths[6], lengths[7]]) as usize,
+            0,
+        );
+        input.read_exact(&mut indiv)?;
+
+        let mut cursor = Cursor::new(&shared);
+        let record_chr = header.contigs.get(cursor.i32()?)?;
+        let record_pos = (cursor.i32()? as i64 + 1) as u64;
+        let ref_len = (cursor.i32()?.max(1)) as u64;
+        let qual = cursor.take(4)?;
+        let n_allele_info = cursor.u32()?;
+        let n_fmt_sample = cursor.u32()?;
+
+        if let Some(regions) = regions {
+            if !regions.overlap(record_chr, record_pos, record_pos + ref_len - 1) {
+                continue;
+            }
+        }
+
+        chr.append_value(record_chr);
+        pos.append_value(record_pos);
+        let mut columns = others.iter_mut();
+
+        // ID
+        let (value_type, values) = cursor.typed_values()?;
+        field.clear();
+        write_values(&mut field, value_type, values)?;
+        append(columns.next(), &field);
+
+        // REF and ALT
+        field.clear();
+        alt.clear();
+        for index in 0..(n_allele_info >> 16) {
+            let (value_type, values) = cursor.typed_values()?;
+            match index {
+                0 => write_values(&mut field, value_type, values)?,
+                1 => write_values(&mut alt, value_type, values)?,
+                _ => {
+                    alt.push(',');
+                    write_values(&mut alt, value_type, values)?
+                }
+            }
+        }
+        if alt.is_empty() {
+            alt.push('.');
+        }
+        append(columns.next(), &field);
+        append(columns.next(), &alt);
+
+        // QUAL
+        field.clear();
+        write_values(&mut field, FLOAT, qual)?;
+        append(columns.next(), &field);
+
+        // FILTER
+        let (value_type, values) = cursor.typed_values()?;
+        field.clear();
+        if value_type != MISSING {
+            for value in values.chunks_exact(type_size(value_type)?) {
+                if let Value::Int(idx) = decode(value_type, value) {
+                    if !field.is_empty() {
+                        field.push(';');
+                    }
+                    field.push_str(header.strings.get(idx)?);
+                }
+            }
+        }
+        if field.is_empty() {
+            field.push('.');
+        }
+        append(columns.next(), &field);
+
+        // INFO
+        field.clear();
+        for _ in 0..(n_allele_info & 0xFFFF) {
+            let key = header.strings.get(cursor.typed_int()?)?;
+            let (value_type, values) = cursor.typed_values()?;
+
+            if !field.is_empty() {
+                field.push(';');
+            }
+            field.push_str(key);
+            if value_type != MISSING && !values.is_empty() {
+                field.push('=');
+                write_values(&mut field, value_type, values)?;
+            }
+        }
+        if field.is_empty() {
+            field.push('.');
+        }
+        append(columns.next(), &field);
+
+        // FORMAT and samples
+        let n_sample = (n_fmt_sample & 0x00FF_FFFF) as usize;
+        let mut cursor = Cursor::new(&indiv);
+        formats.clear();
+        for _ in 0..(n_fmt_sample >> 24) {
+            let key = header.strings.get(cursor.typed_int()?)?;
+            let (value_type, number) = cursor.descriptor()?;
+            let size = number * type_size(value_type)?;
+            formats.push((key, value_type, size, cursor.position));
+            cursor.take(size * n_sample)?;
+        }
+
+        field.clear();
+        for (index, (key, _, _, _)) in formats.iter().enumerate() {
+            if index > 0 {
+                field.push(':');
+            }
+            field.push_str(key);
+        }
+        append(columns.next(), &field);
+
+        for (sample, builder) in columns.enumerate() {
+            field.clear();
+            if sample < n_sample {
+                for (index, (key, value_type, size, begin)) in formats.iter().enumerate() {
+                    if index > 0 {
+                        field.push(':');
+                    }
+                    let values = &indiv[begin + sample * size..begin + (sample + 1) * size];
+                    if *key == "GT" {
+                        write_gt(&mut field, *value_type, values)?;
+                    } else {
+                        write_values(&mut field, *value_type, values)?;
+                    }
+                }
+            }
+            append(Some(builder), &field);
+        }
+
+        records += 1;
+    }
+
+    if records == 0 {
+        return Ok(None);
+    }
+
+    let mut columns = Vec::with_capacity(column_names.len());
+    columns.push(chr.finish().into_series());
+    columns.push(pos.finish().into_series());
+    columns.extend(
+        others
+            .into_iter()
+            .map(|builder| builder.finish().into_series()),
+    );
+
+    DataFrame::new(columns).map(Some)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    const HEADER: &str = "##fileformat=VCFv4.3
+##FILTER=<ID=PASS,Description=\"All filters passed\">
+##INFO=<ID=DP,Number=1,Type=Integer,Description=\"Depth, total\">
+##INFO=<ID=DB,Number=0,Type=Flag,Description=\"dbSNP member\">
+##FORMAT=<ID=GT,Number=1,Type=String,Description=\"Genotype\">
+##FORMAT=<ID=AD,Number=R,Type=Integer,Description=\"Allelic depth\">
+##contig=<ID=chr1,length=1000>
+##contig=<ID=chr2,length=500>
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\ts1\ts2
+";
+
+    fn record(shared: &[u8], indiv: &[u8]) -> Vec<u8> {
+        let mut data = Vec::new();
+        data.extend((shared.len() as u32).to_le_bytes());
+        data.extend((indiv.len() as u32).to_le_bytes());
+        data.extend(shared);
+        data.extend(indiv);
+
+        data
+    }
+
+    fn bcf() -> Vec<u8> {
+        let mut data = BCF_MAGIC.to_vec();
+        data.push(2);
+        data.extend((HEADER.len() as u32 + 1).to_le_bytes());
+        data.extend(HEADER.as_bytes());
+        data.push(0);
+
+        // chr2 20 rs1 A C,G 29.5 PASS DP=14;DB GT:AD 0/1:3,2,. 1|2:.
+        let mut shared = Vec::new();
+        shared.extend(1i32.to_le_bytes());
+        shared.extend(19i32.to_le_bytes());
+        shared.extend(1i32.to_le_bytes());
+        shared.extend(29.5f32.to_le_bytes());
+        shared.extend(((3u32 << 16) | 2).to_le_bytes());
+        shared.extend(((2u32 << 24) | 2).to_le_bytes());
+        shared.extend([0x37, b'r', b's', b'1']);
+        shared.extend([0x17, b'A', 0x17, b'C', 0x17, b'G']);
+        shared.extend([0x11, 0]);
+        shared.extend([0x11, 1, 0x11, 14, 0x11, 2, 0x00]);
+
+        let mut indiv = Vec::new();
+        indiv.extend([0x11, 3, 0x21, 2, 4, 4, 7]);
+        indiv.extend([0x11, 4, 0x31, 3, 2, 0x80, 0x80, 0x81, 0x81]);
+
+        data.extend(record(&shared, &indiv));
+
+        // chr1 10 . ACG A . . . without format
+        let mut shared = Vec::new();
+        shared.extend(0i32.to_le_bytes());
+        shared.extend(9i32.to_le_bytes());
+        shared.extend(3i32.to_le_bytes());
+        shared.extend(FLOAT_MISSING.to_le_bytes());
+        shared.extend((2u32 << 16).to_le_bytes());
+        shared.extend(2u32.to_le_bytes());
+        shared.extend([0x07]);
+        shared.extend([0x37, b'A', b'C', b'G', 0x17, b'A']);
+        shared.extend([0x00]);
+
+        data.extend(record(&shared, &[]));
+
+        data
+    }
+
+    fn names() -> Vec<String> {
+        [
+            "chr", "pos", "vid", "ref", "alt", "qual", "filter", "info", "format", "s1", "s2",
+        ]
+        .iter()
+        .map(|n| n.to_string())
+        .collect()
+    }
+
+    fn column(df: &DataFrame, name: &str) -> Vec<Option<String>> {
+        df.column(name)
+            .unwrap()
+            .str()
+            .unwrap()
+            .into_iter()
+            .map(|v| v.map(String::from))
+            .collect()
+    }
+
+    #[test]
+    fn parse_attributes_() {
+        let attributes = parse_attributes("ID=DP,Number=1,Description=\"Depth, total\",IDX=3");
+
+        assert_eq!(attributes["ID"], "DP");
+        assert_eq!(attributes["Description"], "\"Depth, total\"");
+        assert_eq!(attributes["IDX"], "3");
+    }
+
+    #[test]
+    fn header_() {
+        let header = Header::from_text(HEADER);
+
+        assert_eq!(header.lines.len(), 9);
+        assert_eq!(header.strings.get(0).unwrap(), "PASS");
+        assert_eq!(header.strings.get(2).unwrap(), "DB");
+        assert_eq!(header.strings.get(4).unwrap(), "AD");
+        assert_eq!(header.contigs.get(1).unwrap(), "chr2");
+        assert!(header.strings.get(5).is_err());
+
+        let header =
+            Header::from_text("##INFO=<ID=DP,Number=1,Type=Integer,Description=\"Depth\",IDX=2>\n");
+        assert_eq!(header.strings.get(2).unwrap(), "DP");
+        assert!(header.strings.get(1).is_err());
+    }
+
+    #[test]
+    fn write_float_() {
+        let mut out = String::new();
+        for value in [29.5, 0.333, 1e-5, 1234567.0, 100.0, 0.0001, 123456.7, 0.0] {
+            write_float(&mut out, value);
+            out.push(' ');
+        }
+
+        assert_eq!(out, "29.5 0.333 1e-05 1.23457e+06 100 0.0001 123457 0 ");
+    }
+
+    #[test]
+    fn write_gt_() {
+        let mut out = String::new();
+        write_gt(&mut out, INT8, &[2, 4]).unwrap();
+        out.push(' ');
+        write_gt(&mut out, INT8, &[4, 7]).unwrap();
+        out.push(' ');
+        write_gt(&mut out, INT8, &[0, 0]).unwrap();
+        out.push(' ');
+        write_gt(&mut out, INT8, &[4, 0x81]).unwrap();
+        out.push(' ');
+        write_gt(&mut out, INT8, &[0x81, 0x81]).unwrap();
+
+        assert_eq!(out, "0/1 1|2 ./. 1 .");
+    }
+
+    #[test]
+    fn read_batch_() {
+        let data = bcf();
+        let mut input = std::io::Cursor::new(&data[..]);
+        let header = Header::read(&mut input).unwrap();
+        let mut record_number = 0;
+
+        let df = read_batch(&mut input, &header, &names(), 10, &mut record_number, None)
+            .unwrap()
+            .unwrap();
+
+        assert_eq!(df.height(), 2);
+        assert_eq!(record_number, 2);
+        assert_eq!(
+            df.column("pos")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(20), Some(10)]
+        );
+
+        let expected: Vec<(&str, Vec<Option<&str>>)> = vec![
+            ("chr", vec![Some("chr2"), Some("chr1")]),
+            ("vid", vec![Some("rs1"), Some(".")]),
+            ("ref", vec![Some("A"), Some("ACG")]),
+            ("alt", vec![Some("C,G"), Some("A")]),
+            ("qual", vec![Some("29.5"), Some(".")]),
+            ("filter", vec![Some("PASS"), Some(".")]),
+            ("info", vec![Some("DP=14;DB"), Some(".")]),
+            ("format", vec![Some("GT:AD"), None]),
+            ("s1", vec![Some("0/1:3,2,."), None]),
+            ("s2", vec![Some("1|2:."), None]),
+        ];
+        for (name, values) in expected {
+            assert_eq!(
+                column(&df, name),
+                values
+                    .into_iter()
+                    .map(|v| v.map(String::from))
+                    .collect::<Vec<_>>(),
+                "column {}",
+                name
+            );
+        }
+
+        assert!(
+            read_batch(&mut input, &header, &names(), 10, &mut record_number, None)
+                .unwrap()
+                .is_none()
+        );
+    }
+
+    #[test]
+    fn read_batch_regions() {
+        let data = bcf();
+        let mut input = std::io::Cursor::new(&data[..]);
+        let header = Header::read(&mut input).unwrap();
+        let regions = index::Regions::new(vec![("chr1".to_string(), 12, 20)]);
+
+        let df = read_batch(
+            &mut input,
+            &header,
+            &names()[..8],
+            10,
+            &mut 0,
+            Some(&regions),
+        )
+        .unwrap()
+        .unwrap();
+
+        assert_eq!(column(&df, "chr"), vec![Some("chr1".to_string())]);
+    }
+}
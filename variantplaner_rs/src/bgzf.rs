@@ -0,0 +1,322 @@
+//! Block parallel BGZF decompression
+
+/* std use */
+use std::io::{BufRead, Read, Seek};
+
+/* crate use */
+use rayon::prelude::*;
+
+/// Gzip magic number
+pub(crate) const GZIP_MAGIC: [u8; 2] = [0x1f, 0x8b];
+
+/// Size of BGZF block header
+const HEADER_SIZE: usize = 18;
+
+/// Size of BGZF block footer (crc32 + isize)
+const FOOTER_SIZE: usize = 8;
+
+/// Number of block decompress by each threads in one batch
+const BLOCKS_PER_THREAD: usize = 16;
+
+/// Check if begin of a file look like a gzip file
+#[inline(always)]
+pub(crate) fn is_gzip(head: &[u8]) -> bool {
+    head.len() >= 2 && head[..2] == GZIP_MAGIC
+}
+
+/// Check if begin of a file look like a BGZF file
+///
+/// A BGZF file is a gzip file where first member have an extra field `BC`
+#[inline(always)]
+pub(crate) fn is_bgzf(head: &[u8]) -> bool {
+    is_gzip(head) && head.len() >= 16 && head[3] & 0x04 != 0 && head[12] == b'B' && head[13] == b'C'
+}
+
+fn invalid_data(message: &str) -> std::io::Error {
+    std::io::Error::new(std::io::ErrorKind::InvalidData, message.to_string())
+}
+
+/// A BGZF block not decompressed
+pub(crate) struct RawBlock {
+    data: Vec<u8>,
+    crc: u32,
+    size: u32,
+    block_size: u64,
+}
+
+/// Read next BGZF block of inner, return None at end of file
+pub(crate) fn read_block<R: Read>(inner: &mut R) -> std::io::Result<Option<RawBlock>> {
+    let mut header = [0u8; HEADER_SIZE];
+
+    let mut readed = 0;
+    while readed < HEADER_SIZE {
+        match inner.read(&mut header[readed..])? {
+            0 if readed == 0 => return Ok(None),
+            0 => return Err(invalid_data("truncated BGZF block header")),
+            n => readed += n,
+        }
+    }
+
+    if !is_bgzf(&header) {
+        return Err(invalid_data("invalid BGZF block header"));
+    }
+
+    // Block size - 1 is store in BC extra subfield, we assume BC is the first subfield like htslib
+    let xlen = u16::from_le_bytes([header[10], header[11]]) as usize;
+    let block_size = u16::from_le_bytes([header[16], header[17]]) as usize + 1;
+    if block_size < HEADER_SIZE + FOOTER_SIZE || xlen < 6 {
+        return Err(invalid_data("invalid BGZF block size"));
+    }
+
+    // Skip other extra subfield
+    let mut extra = vec![0u8; xlen - 6];
+    inner.read_exact(&mut extra)?;
+
+    let mut data = vec![0u8; block_size - xlen - 12 - FOOTER_SIZE];
+    inner.read_exact(&mut data)?;
+
+    let mut footer = [0u8; FOOTER_SIZE];
+    inner.read_exact(&mut footer)?;
+
+    Ok(Some(RawBlock {
+        data,
+        crc: u32::from_le_bytes([footer[0], footer[1], footer[2], footer[3]]),
+        size: u32::from_le_bytes([footer[4], footer[5], footer[6], footer[7]]),
+        block_size: block_size as u64,
+    }))
+}
+
+/// Decompress a BGZF block and check crc
+pub(crate) fn inflate(block: &RawBlock) -> std::io::Result<Vec<u8>> {
+    let mut out = Vec::with_capacity(block.size as usize);
+    flate2::read::DeflateDecoder::new(&block.data[..]).read_to_end(&mut out)?;
+
+    let mut crc = flate2::Crc::new();
+    crc.update(&out);
+    if out.len() != block.size as usize || crc.sum() != block.crc {
+        return Err(invalid_data("BGZF block crc or size mismatch"));
+    }
+
+    Ok(out)
+}
+
+/// A BufRead that decompress BGZF blocks in parallel
+///
+/// Blocks are read by batch, each block of a batch are decompress by a thread of rayon pool.
+/// With a seekable inner reader, reading could be restricted to an interval of virtual offset.
+pub(crate) struct BgzfReader<R: Read> {
+    inner: R,
+    pool: rayon::ThreadPool,
+    blocks_per_batch: usize,
+    buffer: Vec<u8>,
+    position: usize,
+    eof: bool,
+    coffset: u64,
+    skip: usize,
+    limit: Option<u64>,
+}
+
+impl<R: Read> BgzfReader<R> {
+    /// Create a new BgzfReader, if threads is 0 rayon choose number of threads
+    pub(crate) fn new(inner: R, threads: usize) -> std::io::Result<Self> {
+        let pool = rayon::ThreadPoolBuilder::new()
+            .num_threads(threads)
+            .build()
+            .map_err(std::io::Error::other)?;
+        let blocks_per_batch = pool.current_num_threads() * BLOCKS_PER_THREAD;
+
+        Ok(Self {
+            inner,
+            pool,
+            blocks_per_batch,
+            buffer: Vec::new(),
+            position: 0,
+            eof: false,
+            coffset: 0,
+            skip: 0,
+            limit: None,
+        })
+    }
+
+    fn fill_batch(&mut self) -> std::io::Result<()> {
+        let mut raws = Vec::with_capacity(self.blocks_per_batch);
+        let mut offsets = Vec::with_capacity(self.blocks_per_batch);
+        while raws.len() < self.blocks_per_batch {
+            if self.limit.is_some_and(|limit| self.coffset > limit >> 16) {
+                self.eof = true;
+                break;
+            }
+
+            match read_block(&mut self.inner)? {
+                Some(raw) => {
+                    offsets.push(self.coffset);
+                    self.coffset += raw.block_size;
+                    raws.push(raw);
+                }
+                None => {
+                    self.eof = true;
+                    break;
+                }
+            }
+        }
+
+        let blocks: Vec<std::io::Result<Vec<u8>>> =
+            self.pool.install(|| raws.par_iter().map(inflate).collect());
+
+        self.buffer.clear();
+        self.position = 0;
+        for (offset, block) in offsets.into_iter().zip(blocks) {
+            let block = block?;
+            let mut data = &block[..];
+
+            if let Some(limit) = self.limit {
+                if offset == limit >> 16 {
+                    data = &data[..data.len().min((limit & 0xffff) as usize)];
+                }
+            }
+
+            if self.skip > 0 {
+                data = &data[self.skip.min(data.len())..];
+                self.skip = 0;
+            }
+
+            self.buffer.extend_from_slice(data);
+        }
+
+        Ok(())
+    }
+}
+
+impl<R: Read + Seek> BgzfReader<R> {
+    /// Move to virtual offset `begin`, if `end` is set reading stop at this virtual offset
+    ///
+    /// A virtual offset is compressed offset of block << 16 | offset in uncompressed block.
+    pub(crate) fn seek_virtual(&mut self, begin: u64, end: Option<u64>) -> std::io::Result<()> {
+        self.inner.seek(std::io::SeekFrom::Start(begin >> 16))?;
+
+        self.coffset = begin >> 16;
+        self.skip = (begin & 0xffff) as usize;
+        self.limit = end;
+        self.buffer.clear();
+        self.position = 0;
+        self.eof = false;
+
+        Ok(())
+    }
+}
+
+impl<R: Read> Read for BgzfReader<R> {
+    fn read(&mut self, buf: &mut [u8]) -> std::io::Result<usize> {
+        let available = self.fill_buf()?;
+        let len = available.len().min(buf.len());
+
+        buf[..len].copy_from_slice(&available[..len]);
+        self.consume(len);
+
+        Ok(len)
+    }
+}
+
+impl<R: Read> BufRead for BgzfReader<R> {
+    fn fill_buf(&mut self) -> std::io::Result<&[u8]> {
+        while self.position >= self.buffer.len() && !self.eof {
+            self.fill_batch()?;
+        }
+
+        Ok(&self.buffer[self.position..])
+    }
+
+    fn consume(&mut self, amt: usize) {
+        self.position = (self.position + amt).min(self.buffer.len());
+    }
+}
+
+#[cfg(test)]
+pub(crate) mod tests {
+    use super::*;
+
+    use std::io::Write;
+
+    /// Build a BGZF block like htslib
+    pub(crate) fn bgzf_block(data: &[u8]) -> Vec<u8> {
+        let mut encoder = flate2::write::DeflateEncoder::new(Vec::new(), flate2::Compression::default());
+        encoder.write_all(data).unwrap();
+        let cdata = encoder.finish().unwrap();
+
+        let mut crc = flate2::Crc::new();
+        crc.update(data);
+
+        let block_size = (HEADER_SIZE + cdata.len() + FOOTER_SIZE - 1) as u16;
+
+        let mut block = vec![
+            0x1f, 0x8b, 8, 4, 0, 0, 0, 0, 0, 0xff, 6, 0, b'B', b'C', 2, 0,
+        ];
+        block.extend(block_size.to_le_bytes());
+        block.extend(cdata);
+        block.extend(crc.sum().to_le_bytes());
+        block.extend((data.len() as u32).to_le_bytes());
+
+        block
+    }
+
+    #[test]
+    fn magic() {
+        let block = bgzf_block(b"");
+        assert!(is_gzip(&block));
+        assert!(is_bgzf(&block));
+
+        assert!(!is_gzip(b"##fileformat"));
+        assert!(!is_bgzf(&[0x1f, 0x8b, 8, 0, 0, 0, 0, 0, 0, 0xff, 0, 0, 0, 0, 0, 0]));
+    }
+
+    #[test]
+    fn read_multiple_block() {
+        let mut file = Vec::new();
+        let mut truth = Vec::new();
+        for i in 0..100 {
+            let content = format!("line {}\n", i).repeat(i);
+            file.extend(bgzf_block(content.as_bytes()));
+            truth.extend(content.as_bytes());
+        }
+        file.extend(bgzf_block(b""));
+
+        let mut reader = BgzfReader::new(&file[..], 2).unwrap();
+        let mut result = Vec::new();
+        reader.read_to_end(&mut result).unwrap();
+
+        assert_eq!(result, truth);
+    }
+
+    #[test]
+    fn bad_crc() {
+        let mut block = bgzf_block(b"ACGT");
+        let len = block.len();
+        block[len - 8] ^= 0xff;
+
+        let mut reader = BgzfReader::new(&block[..], 1).unwrap();
+        let mut result = Vec::new();
+
+        assert!(reader.read_to_end(&mut result).is_err());
+    }
+
+    #[test]
+    fn seek_virtual() {
+        let mut file = bgzf_block(b"first block\n");
+        let second = file.len() as u64;
+        file.extend(bgzf_block(b"second block\n"));
+        file.extend(bgzf_block(b"third block\n"));
+        file.extend(bgzf_block(b""));
+
+        let mut reader = BgzfReader::new(std::io::Cursor::new(file), 1).unwrap();
+
+        reader.seek_virtual(6, Some((second << 16) | 6)).unwrap();
+        let mut result = Vec::new();
+        reader.read_to_end(&mut result).unwrap();
+        assert_eq!(result, b"block\nsecond");
+
+        reader.seek_virtual(second << 16, None).unwrap();
+        let mut result = Vec::new();
+        reader.read_to_end(&mut result).unwrap();
+        assert_eq!(result, b"second block\nthird block\n");
+    }
+}
@@ -0,0 +1,109 @@
+//! Resolve position of FORMAT keys for each record
+
+/* std use */
+use std::collections::HashMap;
+
+/* crate use */
+
+/* polars use */
+use polars_core::prelude::*;
+use pyo3_polars::derive::polars_expr;
+
+#[derive(serde::Deserialize)]
+struct FormatKwargs {
+    keys: Vec<String>,
+}
+
+/// For each FORMAT value found position of each keys, null if key is absent
+///
+/// Positions are computed once by distinct FORMAT value.
+fn local_index(format: &StringChunked, keys: &[String]) -> PolarsResult<Series> {
+    polars_ensure!(!keys.is_empty(), ComputeError: "format index require at least one key");
+
+    let mut format2index: HashMap<&str, Vec<Option<u32>>> = HashMap::new();
+    let mut builders: Vec<PrimitiveChunkedBuilder<UInt32Type>> = keys
+        .iter()
+        .map(|key| PrimitiveChunkedBuilder::new(key, format.len()))
+        .collect();
+
+    for value in format {
+        match value {
+            Some(value) => {
+                let indexes = format2index.entry(value).or_insert_with(|| {
+                    let fields: Vec<&str> = value.split(':').collect();
+                    keys.iter()
+                        .map(|key| {
+                            fields
+                                .iter()
+                                .position(|field| *field == key.as_str())
+                                .map(|index| index as u32)
+                        })
+                        .collect()
+                });
+
+                for (builder, index) in builders.iter_mut().zip(indexes.iter()) {
+                    builder.append_option(*index);
+                }
+            }
+            None => builders.iter_mut().for_each(|builder| builder.append_null()),
+        }
+    }
+
+    let fields: Vec<Series> = builders
+        .into_iter()
+        .map(|builder| builder.finish().into_series())
+        .collect();
+
+    Ok(StructChunked::new(format.name(), &fields)?.into_series())
+}
+
+fn index_output(input_fields: &[Field], kwargs: FormatKwargs) -> PolarsResult<Field> {
+    Ok(Field::new(
+        input_fields[0].name(),
+        DataType::Struct(
+            kwargs
+                .keys
+                .iter()
+                .map(|key| Field::new(key, DataType::UInt32))
+                .collect(),
+        ),
+    ))
+}
+
+#[polars_expr(output_type_func_with_kwargs=index_output)]
+fn index(inputs: &[Series], kwargs: FormatKwargs) -> PolarsResult<Series> {
+    let format = inputs[0].str()?;
+
+    local_index(format, &kwargs.keys)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn index_() {
+        let format = StringChunked::new(
+            "format",
+            vec![Some("GT:AD:DP:GQ"), Some("GT:DP:AD"), None, Some("GT:AD:DP:GQ"), Some("GT")],
+        );
+        let keys = vec!["GT".to_string(), "AD".to_string(), "GQ".to_string()];
+
+        let result = local_index(&format, &keys).unwrap();
+        let result = result.struct_().unwrap();
+
+        let get = |name: &str| -> Vec<Option<u32>> {
+            result
+                .field_by_name(name)
+                .unwrap()
+                .u32()
+                .unwrap()
+                .into_iter()
+                .collect()
+        };
+
+        assert_eq!(get("GT"), vec![Some(0), Some(0), None, Some(0), Some(0)]);
+        assert_eq!(get("AD"), vec![Some(1), Some(2), None, Some(1), None]);
+        assert_eq!(get("GQ"), vec![Some(3), None, None, Some(3), None]);
+    }
+}
@@ -0,0 +1,235 @@
+//! Decode and encode GT field of vcf
+//!
+//! A genotype is packed in a u64: ploidy in bits 0-3, phase in bit 4 and allele index + 1 on 8 bits for each allele from bit 8, 0 is a missing allele.
+
+/* std use */
+
+/* crate use */
+
+/* polars use */
+use polars_core::prelude::*;
+use pyo3_polars::derive::polars_expr;
+
+/// Maximal ploidy of a packed genotype
+const MAX_PLOIDY: usize = 7;
+
+/// Maximal allele index of a packed genotype
+const MAX_ALLELE: u64 = 254;
+
+/// Phase bit of a packed genotype
+const PHASED: u64 = 1 << 4;
+
+/// Decode a GT value, return number of alternative alleles and packed genotype
+///
+/// Genotype is phased if all separators are '|', a haploid genotype is phased if it's prefixed by '|'. Packed genotype is None if ploidy is upper than 7 or an allele index upper than 254, None is return if value isn't a valid GT.
+fn decode(value: &str) -> Option<(u8, Option<u64>)> {
+    let bytes = value.as_bytes();
+    let mut alleles: Vec<Option<u64>> = Vec::with_capacity(2);
+    let (mut separators, mut begin) = match bytes.first() {
+        Some(b'|') => (1, 1),
+        _ => (0, 0),
+    };
+    let mut phased = true;
+
+    loop {
+        let end = bytes[begin..]
+            .iter()
+            .position(|c| *c == b'/' || *c == b'|')
+            .map_or(bytes.len(), |position| begin + position);
+
+        alleles.push(match &value[begin..end] {
+            "." => None,
+            allele if !allele.is_empty() && allele.bytes().all(|c| c.is_ascii_digit()) => {
+                Some(allele.parse::<u64>().ok()?)
+            }
+            _ => return None,
+        });
+
+        if end == bytes.len() {
+            break;
+        }
+
+        separators += 1;
+        phased &= bytes[end] == b'|';
+        begin = end + 1;
+    }
+
+    let count = alleles
+        .iter()
+        .filter(|allele| matches!(allele, Some(index) if *index > 0))
+        .count()
+        .min(u8::MAX as usize) as u8;
+
+    if alleles.len() > MAX_PLOIDY || alleles.iter().flatten().any(|index| *index > MAX_ALLELE) {
+        return Some((count, None));
+    }
+
+    let mut packed = alleles.len() as u64;
+    if phased && separators > 0 {
+        packed |= PHASED;
+    }
+    for (index, allele) in alleles.iter().enumerate() {
+        packed |= allele.map_or(0, |allele| allele + 1) << (8 + 8 * index);
+    }
+
+    Some((count, Some(packed)))
+}
+
+/// Write GT value of a packed genotype, None if packed genotype isn't valid
+fn encode(packed: u64) -> Option<String> {
+    let ploidy = (packed & 0xF) as usize;
+    if ploidy == 0 || ploidy > MAX_PLOIDY {
+        return None;
+    }
+
+    let separator = if packed & PHASED != 0 { '|' } else { '/' };
+    let mut value = String::with_capacity(ploidy * 2);
+    if ploidy == 1 && packed & PHASED != 0 {
+        value.push('|');
+    }
+
+    for index in 0..ploidy {
+        if index != 0 {
+            value.push(separator);
+        }
+
+        match (packed >> (8 + 8 * index)) & 0xFF {
+            0 => value.push('.'),
+            allele => value.push_str(&(allele - 1).to_string()),
+        }
+    }
+
+    Some(value)
+}
+
+fn local_decode_gt(gt: &StringChunked) -> PolarsResult<Series> {
+    let mut counts = PrimitiveChunkedBuilder::<UInt8Type>::new("gt", gt.len());
+    let mut packeds = PrimitiveChunkedBuilder::<UInt64Type>::new("gt_packed", gt.len());
+
+    for value in gt {
+        match value.and_then(decode) {
+            Some((count, packed)) => {
+                counts.append_value(count);
+                packeds.append_option(packed);
+            }
+            None => {
+                counts.append_null();
+                packeds.append_null();
+            }
+        }
+    }
+
+    Ok(StructChunked::new(
+        gt.name(),
+        &[
+            counts.finish().into_series(),
+            packeds.finish().into_series(),
+        ],
+    )?
+    .into_series())
+}
+
+fn decode_gt_output(input_fields: &[Field]) -> PolarsResult<Field> {
+    Ok(Field::new(
+        input_fields[0].name(),
+        DataType::Struct(vec![
+            Field::new("gt", DataType::UInt8),
+            Field::new("gt_packed", DataType::UInt64),
+        ]),
+    ))
+}
+
+#[polars_expr(output_type_func=decode_gt_output)]
+fn decode_gt(inputs: &[Series]) -> PolarsResult<Series> {
+    local_decode_gt(inputs[0].str()?)
+}
+
+#[polars_expr(output_type=String)]
+fn encode_gt(inputs: &[Series]) -> PolarsResult<Series> {
+    let packed = inputs[0].cast(&DataType::UInt64)?;
+    let packed = packed.u64()?;
+
+    let mut builder = StringChunkedBuilder::new(packed.name(), packed.len());
+    for value in packed {
+        builder.append_option(value.and_then(encode));
+    }
+
+    Ok(builder.finish().into_series())
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn decode_() {
+        assert_eq!(decode("0/1"), Some((1, Some(2 | 1 << 8 | 2 << 16))));
+        assert_eq!(
+            decode("0|1"),
+            Some((1, Some(2 | PHASED | 1 << 8 | 2 << 16)))
+        );
+        assert_eq!(decode("1/2"), Some((2, Some(2 | 2 << 8 | 3 << 16))));
+        assert_eq!(decode("2/2"), Some((2, Some(2 | 3 << 8 | 3 << 16))));
+        assert_eq!(decode("./."), Some((0, Some(2))));
+        assert_eq!(decode("1"), Some((1, Some(1 | 2 << 8))));
+        assert_eq!(decode("|1"), Some((1, Some(1 | PHASED | 2 << 8))));
+        assert_eq!(
+            decode("0/1|1"),
+            Some((2, Some(3 | 1 << 8 | 2 << 16 | 2 << 24)))
+        );
+        assert_eq!(decode("0/255"), Some((1, None)));
+        assert_eq!(decode("0/0/0/0/0/0/0/1"), Some((1, None)));
+        assert_eq!(decode(""), None);
+        assert_eq!(decode("0/a"), None);
+        assert_eq!(decode("0//1"), None);
+    }
+
+    #[test]
+    fn encode_() {
+        for value in [
+            "0/1", "0|1", "1/2", "2|2", "./.", "1", "|1", "0/1/2", "254|0",
+        ] {
+            assert_eq!(
+                encode(decode(value).unwrap().1.unwrap()).as_deref(),
+                Some(value)
+            );
+        }
+
+        assert_eq!(encode(0), None);
+        assert_eq!(encode(8), None);
+    }
+
+    #[test]
+    fn decode_gt_() {
+        let gt = StringChunked::new("gt", vec![Some("0/1"), Some("1|1"), None, Some("x")]);
+
+        let result = local_decode_gt(&gt).unwrap();
+        let result = result.struct_().unwrap();
+
+        assert_eq!(
+            result
+                .field_by_name("gt")
+                .unwrap()
+                .u8()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(1), Some(2), None, None]
+        );
+        assert_eq!(
+            result
+                .field_by_name("gt_packed")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![
+                Some(2 | 1 << 8 | 2 << 16),
+                Some(2 | PHASED | 2 << 8 | 2 << 16),
+                None,
+                None
+            ]
+        );
+    }
+}
@@ -0,0 +1,463 @@
+//! Tabix and CSI index, to read only BGZF blocks overlapping regions
+
+/* std use */
+use std::collections::HashMap;
+use std::io::{BufRead, Read, Seek};
+
+/* crate use */
+
+/* project use */
+use crate::bgzf;
+
+/// Tabix min_shift
+const TBI_MIN_SHIFT: u32 = 14;
+
+/// Tabix depth
+const TBI_DEPTH: u32 = 5;
+
+fn invalid_data(message: &str) -> std::io::Error {
+    std::io::Error::new(std::io::ErrorKind::InvalidData, message.to_string())
+}
+
+/// Set of genomic regions, 1-based and inclusive, group by chromosome
+#[derive(Debug, Default)]
+pub(crate) struct Regions(HashMap<String, Vec<(u64, u64)>>);
+
+impl Regions {
+    /// Build regions, overlapping regions of same chromosome are merged
+    pub(crate) fn new(regions: Vec<(String, u64, u64)>) -> Self {
+        let mut chr2regions: HashMap<String, Vec<(u64, u64)>> = HashMap::new();
+        for (chr, start, end) in regions {
+            chr2regions.entry(chr).or_default().push((start, end));
+        }
+
+        for intervals in chr2regions.values_mut() {
+            intervals.sort_unstable();
+
+            let mut merged: Vec<(u64, u64)> = Vec::with_capacity(intervals.len());
+            for &(start, end) in intervals.iter() {
+                match merged.last_mut() {
+                    Some(last) if start <= last.1.saturating_add(1) => last.1 = last.1.max(end),
+                    _ => merged.push((start, end)),
+                }
+            }
+
+            *intervals = merged;
+        }
+
+        Self(chr2regions)
+    }
+
+    /// Check if interval [start, end] of chromosome chr overlap a region
+    pub(crate) fn overlap(&self, chr: &str, start: u64, end: u64) -> bool {
+        match self.0.get(chr) {
+            Some(intervals) => {
+                // first region with an end upper or equal to start
+                let index = intervals.partition_point(|&(_, r_end)| r_end < start);
+                intervals.get(index).map(|&(r_start, _)| r_start <= end).unwrap_or(false)
+            }
+            None => false,
+        }
+    }
+
+    /// Iterate over chromosome and regions
+    pub(crate) fn iter(&self) -> impl Iterator<Item = (&String, &Vec<(u64, u64)>)> {
+        self.0.iter()
+    }
+}
+
+/// Bins and linear index of one reference sequence
+#[derive(Debug, Default)]
+struct Reference {
+    bins: HashMap<u32, Vec<(u64, u64)>>,
+    linear: Vec<u64>,
+}
+
+/// A tabix or CSI index
+#[derive(Debug)]
+pub(crate) struct Index {
+    min_shift: u32,
+    depth: u32,
+    names: Vec<String>,
+    references: Vec<Reference>,
+}
+
+/// Little cursor on index content
+struct Cursor<'a> {
+    data: &'a [u8],
+    position: usize,
+}
+
+impl<'a> Cursor<'a> {
+    fn bytes(&mut self, len: usize) -> std::io::Result<&'a [u8]> {
+        let end = self.position + len;
+        if end > self.data.len() {
+            return Err(invalid_data("truncated index"));
+        }
+
+        let bytes = &self.data[self.position..end];
+        self.position = end;
+        Ok(bytes)
+    }
+
+    fn i32(&mut self) -> std::io::Result<i32> {
+        let b = self.bytes(4)?;
+        Ok(i32::from_le_bytes([b[0], b[1], b[2], b[3]]))
+    }
+
+    fn u32(&mut self) -> std::io::Result<u32> {
+        let b = self.bytes(4)?;
+        Ok(u32::from_le_bytes([b[0], b[1], b[2], b[3]]))
+    }
+
+    fn u64(&mut self) -> std::io::Result<u64> {
+        let b = self.bytes(8)?;
+        Ok(u64::from_le_bytes([b[0], b[1], b[2], b[3], b[4], b[5], b[6], b[7]]))
+    }
+
+    fn len(&mut self) -> std::io::Result<usize> {
+        usize::try_from(self.i32()?).map_err(|_| invalid_data("negative length in index"))
+    }
+}
+
+/// Parse tabix header, return sequence names
+fn tabix_names(cursor: &mut Cursor) -> std::io::Result<Vec<String>> {
+    // format, col_seq, col_beg, col_end, meta, skip
+    cursor.bytes(6 * 4)?;
+
+    let l_nm = cursor.len()?;
+    Ok(cursor
+        .bytes(l_nm)?
+        .split(|c| *c == 0)
+        .filter(|n| !n.is_empty())
+        .map(|n| String::from_utf8_lossy(n).into_owned())
+        .collect())
+}
+
+/// Compute bins overlap 0-based half-open interval [beg, end)
+pub(crate) fn reg2bins(beg: u64, end: u64, min_shift: u32, depth: u32) -> Vec<u32> {
+    let mut bins = Vec::new();
+    if end <= beg {
+        return bins;
+    }
+
+    let max = 1u64 << (min_shift + depth * 3);
+    let beg = beg.min(max - 1);
+    let end = end.min(max) - 1;
+
+    let mut offset = 0u64;
+    for level in 0..=depth {
+        let shift = min_shift + (depth - level) * 3;
+        for bin in (offset + (beg >> shift))..=(offset + (end >> shift)) {
+            bins.push(bin as u32);
+        }
+        offset += 1 << (level * 3);
+    }
+
+    bins
+}
+
+impl Index {
+    /// Read a tabix (.tbi) or CSI (.csi) index
+    pub(crate) fn from_path(path: &std::path::Path) -> std::io::Result<Self> {
+        let mut data = Vec::new();
+        flate2::read::MultiGzDecoder::new(std::fs::File::open(path)?).read_to_end(&mut data)?;
+
+        Self::from_bytes(&data)
+    }
+
+    /// Parse an uncompressed tabix or CSI index
+    pub(crate) fn from_bytes(data: &[u8]) -> std::io::Result<Self> {
+        let mut cursor = Cursor { data, position: 0 };
+
+        match cursor.bytes(4)? {
+            b"TBI\x01" => {
+                let n_ref = cursor.len()?;
+                let names = tabix_names(&mut cursor)?;
+
+                let mut references = Vec::with_capacity(n_ref);
+                for _ in 0..n_ref {
+                    let mut reference = Reference::default();
+
+                    for _ in 0..cursor.len()? {
+                        let bin = cursor.u32()?;
+                        let n_chunk = cursor.len()?;
+                        let mut chunks = Vec::with_capacity(n_chunk);
+                        for _ in 0..n_chunk {
+                            chunks.push((cursor.u64()?, cursor.u64()?));
+                        }
+                        reference.bins.insert(bin, chunks);
+                    }
+
+                    for _ in 0..cursor.len()? {
+                        reference.linear.push(cursor.u64()?);
+                    }
+
+                    references.push(reference);
+                }
+
+                Ok(Self {
+                    min_shift: TBI_MIN_SHIFT,
+                    depth: TBI_DEPTH,
+                    names,
+                    references,
+                })
+            }
+            b"CSI\x01" => {
+                let min_shift = cursor.u32()?;
+                let depth = cursor.u32()?;
+
+                let l_aux = cursor.len()?;
+                let names = if l_aux >= 28 {
+                    tabix_names(&mut Cursor {
+                        data: cursor.bytes(l_aux)?,
+                        position: 0,
+                    })?
+                } else {
+                    cursor.bytes(l_aux)?;
+                    Vec::new()
+                };
+
+                let n_ref = cursor.len()?;
+                let mut references = Vec::with_capacity(n_ref);
+                for _ in 0..n_ref {
+                    let mut reference = Reference::default();
+
+                    for _ in 0..cursor.len()? {
+                        let bin = cursor.u32()?;
+                        let _loffset = cursor.u64()?;
+                        let n_chunk = cursor.len()?;
+                        let mut chunks = Vec::with_capacity(n_chunk);
+                        for _ in 0..n_chunk {
+                            chunks.push((cursor.u64()?, cursor.u64()?));
+                        }
+                        reference.bins.insert(bin, chunks);
+                    }
+
+                    references.push(reference);
+                }
+
+                Ok(Self {
+                    min_shift,
+                    depth,
+                    names,
+                    references,
+                })
+            }
+            _ => Err(invalid_data("not a tabix or csi index")),
+        }
+    }
+
+    /// Found index file next to path, `{path}.tbi` or `{path}.csi`
+    pub(crate) fn find(path: &std::path::Path) -> Option<std::path::PathBuf> {
+        ["tbi", "csi"]
+            .iter()
+            .map(|ext| {
+                let mut index_path = path.as_os_str().to_owned();
+                index_path.push(".");
+                index_path.push(ext);
+                std::path::PathBuf::from(index_path)
+            })
+            .find(|index_path| index_path.is_file())
+    }
+
+    /// Set name of reference sequence, required for CSI index without tabix header
+    pub(crate) fn set_names(&mut self, names: Vec<String>) {
+        if self.names.is_empty() {
+            self.names = names;
+        }
+    }
+
+    /// Virtual offset chunks overlap 1-based inclusive interval [start, end] of chromosome
+    pub(crate) fn query(&self, chr: &str, start: u64, end: u64) -> Vec<(u64, u64)> {
+        let Some(reference) = self
+            .names
+            .iter()
+            .position(|name| name == chr)
+            .and_then(|tid| self.references.get(tid))
+        else {
+            return Vec::new();
+        };
+
+        let beg = start.saturating_sub(1);
+        let min_offset = if reference.linear.is_empty() {
+            0
+        } else {
+            let window = ((beg >> self.min_shift) as usize).min(reference.linear.len() - 1);
+            reference.linear[window]
+        };
+
+        reg2bins(beg, end, self.min_shift, self.depth)
+            .iter()
+            .filter_map(|bin| reference.bins.get(bin))
+            .flatten()
+            .filter(|(_, chunk_end)| *chunk_end > min_offset)
+            .copied()
+            .collect()
+    }
+
+    /// Sorted and merged virtual offset chunks overlap all regions
+    pub(crate) fn chunks(&self, regions: &Regions) -> Vec<(u64, u64)> {
+        let mut chunks: Vec<(u64, u64)> = regions
+            .iter()
+            .flat_map(|(chr, intervals)| {
+                intervals
+                    .iter()
+                    .flat_map(move |&(start, end)| self.query(chr, start, end))
+            })
+            .collect();
+        chunks.sort_unstable();
+
+        let mut merged: Vec<(u64, u64)> = Vec::with_capacity(chunks.len());
+        for (begin, end) in chunks {
+            match merged.last_mut() {
+                Some(last) if begin <= last.1 => last.1 = last.1.max(end),
+                _ => merged.push((begin, end)),
+            }
+        }
+
+        merged
+    }
+}
+
+/// A BufRead that read only BGZF data of a list of virtual offset chunks
+pub(crate) struct ChunksReader<R: Read + Seek> {
+    bgzf: bgzf::BgzfReader<R>,
+    chunks: std::vec::IntoIter<(u64, u64)>,
+    active: bool,
+}
+
+impl<R: Read + Seek> ChunksReader<R> {
+    pub(crate) fn new(bgzf: bgzf::BgzfReader<R>, chunks: Vec<(u64, u64)>) -> Self {
+        Self {
+            bgzf,
+            chunks: chunks.into_iter(),
+            active: false,
+        }
+    }
+}
+
+impl<R: Read + Seek> Read for ChunksReader<R> {
+    fn read(&mut self, buf: &mut [u8]) -> std::io::Result<usize> {
+        let available = self.fill_buf()?;
+        let len = available.len().min(buf.len());
+
+        buf[..len].copy_from_slice(&available[..len]);
+        self.consume(len);
+
+        Ok(len)
+    }
+}
+
+impl<R: Read + Seek> BufRead for ChunksReader<R> {
+    fn fill_buf(&mut self) -> std::io::Result<&[u8]> {
+        while !self.active || self.bgzf.fill_buf()?.is_empty() {
+            match self.chunks.next() {
+                Some((begin, end)) => {
+                    self.bgzf.seek_virtual(begin, Some(end))?;
+                    self.active = true;
+                }
+                None => {
+                    self.active = false;
+                    return Ok(&[]);
+                }
+            }
+        }
+
+        self.bgzf.fill_buf()
+    }
+
+    fn consume(&mut self, amt: usize) {
+        if self.active {
+            self.bgzf.consume(amt)
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn reg2bins_() {
+        assert_eq!(reg2bins(0, 1, 14, 5), vec![0, 1, 9, 73, 585, 4681]);
+        assert_eq!(reg2bins(0, 1 << 14, 14, 5), vec![0, 1, 9, 73, 585, 4681]);
+        assert_eq!(
+            reg2bins(0, (1 << 14) + 1, 14, 5),
+            vec![0, 1, 9, 73, 585, 4681, 4682]
+        );
+        assert!(reg2bins(10, 10, 14, 5).is_empty());
+    }
+
+    #[test]
+    fn regions() {
+        let regions = Regions::new(vec![
+            ("1".to_string(), 100, 200),
+            ("1".to_string(), 150, 300),
+            ("1".to_string(), 1000, 1000),
+            ("2".to_string(), 5, 10),
+        ]);
+
+        assert!(regions.overlap("1", 100, 100));
+        assert!(regions.overlap("1", 250, 250));
+        assert!(regions.overlap("1", 90, 110));
+        assert!(!regions.overlap("1", 301, 999));
+        assert!(regions.overlap("1", 1000, 1000));
+        assert!(!regions.overlap("1", 1001, 2000));
+        assert!(!regions.overlap("2", 11, 11));
+        assert!(!regions.overlap("3", 5, 10));
+    }
+
+    fn tabix(chunks: &[(u32, u64, u64)], linear: &[u64]) -> Vec<u8> {
+        let mut data = b"TBI\x01".to_vec();
+        data.extend(1i32.to_le_bytes());
+        for value in [2i32, 1, 2, 0, b'#' as i32, 0] {
+            data.extend(value.to_le_bytes());
+        }
+        data.extend(2i32.to_le_bytes());
+        data.extend(b"1\x00");
+
+        data.extend((chunks.len() as i32).to_le_bytes());
+        for (bin, begin, end) in chunks {
+            data.extend(bin.to_le_bytes());
+            data.extend(1i32.to_le_bytes());
+            data.extend(begin.to_le_bytes());
+            data.extend(end.to_le_bytes());
+        }
+        data.extend((linear.len() as i32).to_le_bytes());
+        for offset in linear {
+            data.extend(offset.to_le_bytes());
+        }
+
+        data
+    }
+
+    #[test]
+    fn query() {
+        let index = Index::from_bytes(&tabix(&[(4681, 0, 100 << 16), (4682, 100 << 16, 200 << 16)], &[0, 100 << 16]))
+            .unwrap();
+
+        assert_eq!(index.query("1", 1, 10), vec![(0, 100 << 16)]);
+        assert_eq!(index.query("1", (1 << 14) + 1, (1 << 14) + 10), vec![(100 << 16, 200 << 16)]);
+        assert!(index.query("2", 1, 10).is_empty());
+
+        let regions = Regions::new(vec![("1".to_string(), 1, 1 << 15)]);
+        assert_eq!(index.chunks(&regions), vec![(0, 200 << 16)]);
+    }
+
+    #[test]
+    fn chunks_reader() {
+        let mut file = crate::bgzf::tests::bgzf_block(b"line 1\nline 2\n");
+        let second_block = file.len() as u64;
+        file.extend(crate::bgzf::tests::bgzf_block(b"line 3\nline 4\n"));
+        file.extend(crate::bgzf::tests::bgzf_block(b""));
+
+        let bgzf = bgzf::BgzfReader::new(std::io::Cursor::new(file), 1).unwrap();
+        let mut reader = ChunksReader::new(bgzf, vec![(7, second_block << 16), ((second_block << 16) | 7, (second_block << 16) | 14)]);
+
+        let mut result = String::new();
+        reader.read_to_string(&mut result).unwrap();
+
+        assert_eq!(result, "line 2\nline 4\n");
+    }
+}
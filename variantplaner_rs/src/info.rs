@@ -0,0 +1,230 @@
+//! Parse vcf INFO column in one pass
+
+/* std use */
+use std::collections::HashMap;
+
+/* crate use */
+
+/* polars use */
+use polars_core::prelude::*;
+use pyo3_polars::derive::polars_expr;
+
+/// Definition of INFO fields, each vector have same length
+#[derive(serde::Deserialize)]
+pub(crate) struct InfoKwargs {
+    names: Vec<String>,
+    numbers: Vec<String>,
+    types: Vec<String>,
+}
+
+impl InfoKwargs {
+    /// Build definitions from (name, number, type) of each INFO field
+    pub(crate) fn new(definitions: Vec<(String, String, String)>) -> Self {
+        let mut kwargs = Self {
+            names: Vec::with_capacity(definitions.len()),
+            numbers: Vec::with_capacity(definitions.len()),
+            types: Vec::with_capacity(definitions.len()),
+        };
+
+        for (name, number, info_type) in definitions {
+            kwargs.names.push(name);
+            kwargs.numbers.push(number);
+            kwargs.types.push(info_type);
+        }
+
+        kwargs
+    }
+
+    fn is_list(&self, index: usize) -> bool {
+        self.numbers[index] != "1"
+    }
+
+    fn dtype(&self, index: usize) -> DataType {
+        let dtype = match self.types[index].as_str() {
+            "Integer" => DataType::Int64,
+            "Float" => DataType::Float64,
+            _ => DataType::String,
+        };
+
+        if self.is_list(index) {
+            DataType::List(Box::new(dtype))
+        } else {
+            dtype
+        }
+    }
+
+    fn fields(&self) -> Vec<Field> {
+        self.names
+            .iter()
+            .enumerate()
+            .map(|(index, name)| Field::new(name, self.dtype(index)))
+            .collect()
+    }
+}
+
+/// Builder of one INFO field
+enum Builder {
+    One(StringChunkedBuilder),
+    List(ListStringChunkedBuilder),
+}
+
+impl Builder {
+    fn append(&mut self, value: Option<&str>) {
+        match (self, value) {
+            (Builder::One(builder), Some(value)) if value != "." => builder.append_value(value),
+            (Builder::One(builder), _) => builder.append_null(),
+            (Builder::List(builder), Some(value)) if value != "." => {
+                builder.append_values_iter(value.split(','))
+            }
+            (Builder::List(builder), _) => builder.append_null(),
+        }
+    }
+
+    fn finish(self) -> Series {
+        match self {
+            Builder::One(mut builder) => builder.finish().into_series(),
+            Builder::List(mut builder) => builder.finish().into_series(),
+        }
+    }
+}
+
+/// Split each INFO string once and dispatch values in a struct, one field by INFO definition
+///
+/// Values are cast in type of definition, value that can't be cast are set to null.
+pub(crate) fn local_parse(info: &StringChunked, kwargs: &InfoKwargs) -> PolarsResult<Series> {
+    polars_ensure!(
+        kwargs.names.len() == kwargs.numbers.len() && kwargs.names.len() == kwargs.types.len(),
+        ComputeError: "info parser require same number of names, numbers and types"
+    );
+
+    let name2index: HashMap<&str, usize> = kwargs
+        .names
+        .iter()
+        .enumerate()
+        .map(|(index, name)| (name.as_str(), index))
+        .collect();
+
+    let mut builders: Vec<Builder> = kwargs
+        .names
+        .iter()
+        .enumerate()
+        .map(|(index, name)| {
+            if kwargs.is_list(index) {
+                Builder::List(ListStringChunkedBuilder::new(name, info.len(), info.len() * 2))
+            } else {
+                Builder::One(StringChunkedBuilder::new(name, info.len()))
+            }
+        })
+        .collect();
+
+    let mut values: Vec<Option<&str>> = vec![None; builders.len()];
+    for row in info {
+        values.iter_mut().for_each(|value| *value = None);
+
+        if let Some(row) = row {
+            for token in row.split(';') {
+                let (key, value) = match token.split_once('=') {
+                    Some((key, value)) => (key, Some(value)),
+                    None => (token, None),
+                };
+
+                if let Some(&index) = name2index.get(key) {
+                    values[index] = value;
+                }
+            }
+        }
+
+        for (builder, value) in builders.iter_mut().zip(values.iter()) {
+            builder.append(*value);
+        }
+    }
+
+    let fields = builders
+        .into_iter()
+        .enumerate()
+        .map(|(index, builder)| builder.finish().cast(&kwargs.dtype(index)))
+        .collect::<PolarsResult<Vec<Series>>>()?;
+
+    Ok(StructChunked::new(info.name(), &fields)?.into_series())
+}
+
+fn info_output(input_fields: &[Field], kwargs: InfoKwargs) -> PolarsResult<Field> {
+    Ok(Field::new(
+        input_fields[0].name(),
+        DataType::Struct(kwargs.fields()),
+    ))
+}
+
+#[polars_expr(output_type_func_with_kwargs=info_output)]
+fn parse(inputs: &[Series], kwargs: InfoKwargs) -> PolarsResult<Series> {
+    let info = inputs[0].str()?;
+
+    local_parse(info, &kwargs)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn kwargs() -> InfoKwargs {
+        InfoKwargs {
+            names: vec!["DP".to_string(), "AF".to_string(), "AC".to_string(), "CSQ".to_string()],
+            numbers: vec!["1".to_string(), "A".to_string(), "A".to_string(), ".".to_string()],
+            types: vec![
+                "Integer".to_string(),
+                "Float".to_string(),
+                "Integer".to_string(),
+                "String".to_string(),
+            ],
+        }
+    }
+
+    #[test]
+    fn parse_info() {
+        let info = StringChunked::new(
+            "info",
+            vec![
+                Some("DP=10;AF=0.5,0.25;MAC=4;AC=1,2;DB;CSQ=a|b,c|d"),
+                Some("AC=3;DP=."),
+                Some("."),
+                None,
+            ],
+        );
+
+        let result = local_parse(&info, &kwargs()).unwrap();
+        let result = result.struct_().unwrap();
+
+        assert_eq!(
+            result.field_by_name("DP").unwrap().i64().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![Some(10), None, None, None]
+        );
+
+        let ac = result.field_by_name("AC").unwrap();
+        assert_eq!(ac.dtype(), &DataType::List(Box::new(DataType::Int64)));
+        assert_eq!(
+            ac.list()
+                .unwrap()
+                .get_as_series(0)
+                .unwrap()
+                .i64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(1), Some(2)]
+        );
+        assert_eq!(ac.null_count(), 2);
+
+        let csq = result.field_by_name("CSQ").unwrap();
+        assert_eq!(
+            csq.list()
+                .unwrap()
+                .get_as_series(0)
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("a|b"), Some("c|d")]
+        );
+    }
+}
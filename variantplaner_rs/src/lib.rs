@@ -1,4 +1,12 @@
-mod variant_id;
+mod bcf;
+mod bgzf;
+mod format;
+mod genotype;
+mod index;
+mod info;
+mod normalize;
+pub mod variant_id;
+mod vcf;
 
 #[cfg(target_os = "linux")]
 use jemallocator::Jemalloc;
@@ -7,11 +15,12 @@ use jemallocator::Jemalloc;
 #[cfg(target_os = "linux")]
 static ALLOC: Jemalloc = Jemalloc;
 
-use pyo3::types::PyModule;
+use pyo3::types::{PyModule, PyModuleMethods};
 use pyo3::{pymodule, Bound, PyResult};
 
 #[pymodule]
 fn variantplaner_rs(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add("__version__", env!("CARGO_PKG_VERSION"))?;
+    m.add_class::<vcf::VcfReader>()?;
     Ok(())
 }
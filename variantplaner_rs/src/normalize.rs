@@ -0,0 +1,397 @@
+//! Trim and left align variant against a reference genome
+
+/* std use */
+use std::collections::HashMap;
+use std::sync::{Arc, Mutex, OnceLock};
+
+/* crate use */
+
+/* polars use */
+use polars_core::prelude::*;
+use pyo3_polars::derive::polars_expr;
+
+/// One line of a samtools faidx index
+#[derive(Debug, Clone, PartialEq)]
+struct FaiRecord {
+    length: u64,
+    offset: u64,
+    line_bases: u64,
+    line_width: u64,
+}
+
+/// Fasta file memory mapped with its index
+pub(crate) struct Reference {
+    sequence: memmap2::Mmap,
+    index: HashMap<String, FaiRecord>,
+}
+
+impl Reference {
+    /// Open fasta at path, index must be at path + '.fai'
+    pub(crate) fn open(path: &str) -> PolarsResult<Self> {
+        let index = parse_fai(&std::fs::read_to_string(format!("{}.fai", path))?)?;
+        let file = std::fs::File::open(path)?;
+
+        // Safety: reference file is expected to stay untouched during normalization
+        let sequence = unsafe { memmap2::Mmap::map(&file)? };
+
+        Ok(Self { sequence, index })
+    }
+
+    /// Upper case base of chromosome at 1-based position, None if position is outside of chromosome
+    pub(crate) fn base(&self, chr: &str, pos: u64) -> Option<u8> {
+        let record = self.index.get(chr)?;
+        if pos == 0 || pos > record.length {
+            return None;
+        }
+
+        let pos = pos - 1;
+        let offset =
+            record.offset + (pos / record.line_bases) * record.line_width + pos % record.line_bases;
+
+        self.sequence
+            .get(offset as usize)
+            .map(|base| base.to_ascii_uppercase())
+    }
+}
+
+/// Parse content of a fasta index
+fn parse_fai(content: &str) -> PolarsResult<HashMap<String, FaiRecord>> {
+    let mut index = HashMap::new();
+
+    for (line_number, line) in content.lines().enumerate() {
+        if line.is_empty() {
+            continue;
+        }
+
+        let fields: Vec<&str> = line.split('\t').collect();
+        let values: Vec<u64> = fields
+            .iter()
+            .skip(1)
+            .take(4)
+            .map(|field| field.parse::<u64>())
+            .collect::<Result<_, _>>()
+            .map_err(
+                |_| polars_err!(ComputeError: "fasta index line {} isn't valid", line_number + 1),
+            )?;
+
+        if values.len() != 4 || values[2] == 0 {
+            polars_bail!(ComputeError: "fasta index line {} isn't valid", line_number + 1);
+        }
+
+        index.insert(
+            fields[0].to_string(),
+            FaiRecord {
+                length: values[0],
+                offset: values[1],
+                line_bases: values[2],
+                line_width: values[3],
+            },
+        );
+    }
+
+    Ok(index)
+}
+
+/// Reference already open, polars call plugin on each batch
+static REFERENCES: OnceLock<Mutex<HashMap<String, Arc<Reference>>>> = OnceLock::new();
+
+fn reference(path: &str) -> PolarsResult<Arc<Reference>> {
+    let mut references = REFERENCES
+        .get_or_init(|| Mutex::new(HashMap::new()))
+        .lock()
+        .map_err(|_| polars_err!(ComputeError: "reference cache is poisoned"))?;
+
+    if let Some(reference) = references.get(path) {
+        return Ok(reference.clone());
+    }
+
+    let reference = Arc::new(Reference::open(path)?);
+    references.insert(path.to_string(), reference.clone());
+
+    Ok(reference)
+}
+
+#[inline(always)]
+fn is_nucleotides(seq: &[u8]) -> bool {
+    seq.iter().all(|nuc| b"ACGTNacgtn".contains(nuc))
+}
+
+/// Trim shared bases and left align a variant, return None if variant can't or didn't need to be normalized
+fn normalize(
+    reference: &Reference,
+    chr: &str,
+    pos: u64,
+    ref_seq: &[u8],
+    alt_seq: &[u8],
+) -> Option<(u64, Vec<u8>, Vec<u8>)> {
+    // snv and symbolic alleles are left untouched
+    if (ref_seq.len() == 1 && alt_seq.len() == 1)
+        || ref_seq.eq_ignore_ascii_case(alt_seq)
+        || !is_nucleotides(ref_seq)
+        || !is_nucleotides(alt_seq)
+    {
+        return None;
+    }
+
+    let mut pos = pos;
+    let mut ref_seq = ref_seq.to_ascii_uppercase();
+    let mut alt_seq = alt_seq.to_ascii_uppercase();
+
+    loop {
+        let mut changed = false;
+
+        if !ref_seq.is_empty() && !alt_seq.is_empty() && ref_seq.last() == alt_seq.last() {
+            ref_seq.pop();
+            alt_seq.pop();
+            changed = true;
+        }
+
+        if ref_seq.is_empty() || alt_seq.is_empty() {
+            pos = pos.checked_sub(1)?;
+            let base = reference.base(chr, pos)?;
+            ref_seq.insert(0, base);
+            alt_seq.insert(0, base);
+            changed = true;
+        }
+
+        if !changed {
+            break;
+        }
+    }
+
+    let shared = ref_seq
+        .iter()
+        .zip(alt_seq.iter())
+        .take(ref_seq.len().min(alt_seq.len()) - 1)
+        .take_while(|(r, a)| r == a)
+        .count();
+
+    Some((
+        pos + shared as u64,
+        ref_seq.split_off(shared),
+        alt_seq.split_off(shared),
+    ))
+}
+
+fn local_left_align(
+    reference: &Reference,
+    chr: &StringChunked,
+    pos: &UInt64Chunked,
+    ref_seq: &StringChunked,
+    alt_seq: &StringChunked,
+) -> PolarsResult<Series> {
+    let mut out_pos = PrimitiveChunkedBuilder::<UInt64Type>::new("pos", pos.len());
+    let mut out_ref = StringChunkedBuilder::new("ref", ref_seq.len());
+    let mut out_alt = StringChunkedBuilder::new("alt", alt_seq.len());
+
+    for (((c, p), r), a) in chr.into_iter().zip(pos).zip(ref_seq).zip(alt_seq) {
+        match (c, p, r, a) {
+            (Some(c), Some(p), Some(r), Some(a)) => {
+                match normalize(reference, c, p, r.as_bytes(), a.as_bytes()) {
+                    Some((new_pos, new_ref, new_alt)) => {
+                        // Bases read from reference aren't validated
+                        let invalid = |_| polars_err!(ComputeError: "reference sequence of {}:{} isn't valid utf8", c, p);
+
+                        out_pos.append_value(new_pos);
+                        out_ref.append_value(std::str::from_utf8(&new_ref).map_err(invalid)?);
+                        out_alt.append_value(std::str::from_utf8(&new_alt).map_err(invalid)?);
+                    }
+                    None => {
+                        out_pos.append_value(p);
+                        out_ref.append_value(r);
+                        out_alt.append_value(a);
+                    }
+                }
+            }
+            _ => {
+                out_pos.append_option(p);
+                out_ref.append_option(r);
+                out_alt.append_option(a);
+            }
+        }
+    }
+
+    Ok(StructChunked::new(
+        chr.name(),
+        &[
+            out_pos.finish().into_series(),
+            out_ref.finish().into_series(),
+            out_alt.finish().into_series(),
+        ],
+    )?
+    .into_series())
+}
+
+#[derive(serde::Deserialize)]
+struct LeftAlignKwargs {
+    fasta: String,
+}
+
+fn left_align_output(input_fields: &[Field], _kwargs: LeftAlignKwargs) -> PolarsResult<Field> {
+    Ok(Field::new(
+        input_fields[0].name(),
+        DataType::Struct(vec![
+            Field::new("pos", DataType::UInt64),
+            Field::new("ref", DataType::String),
+            Field::new("alt", DataType::String),
+        ]),
+    ))
+}
+
+#[polars_expr(output_type_func_with_kwargs=left_align_output)]
+fn left_align(inputs: &[Series], kwargs: LeftAlignKwargs) -> PolarsResult<Series> {
+    let chr = inputs[0].str()?;
+    let pos = inputs[1].cast(&DataType::UInt64)?;
+    let ref_seq = inputs[2].str()?;
+    let alt_seq = inputs[3].str()?;
+
+    local_left_align(
+        &reference(&kwargs.fasta)?,
+        chr,
+        pos.u64()?,
+        ref_seq,
+        alt_seq,
+    )
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::io::Write;
+
+    fn reference_file(name: &str) -> Reference {
+        reference_sequence(name, b"GGACACACAT\nTTTTCG\n")
+    }
+
+    fn reference_sequence(name: &str, sequence: &[u8]) -> Reference {
+        let directory =
+            std::env::temp_dir().join(format!("variantplaner_{}_{}", std::process::id(), name));
+        std::fs::create_dir_all(&directory).unwrap();
+
+        let path = directory.join("ref.fa");
+        let mut fasta = std::fs::File::create(&path).unwrap();
+        fasta.write_all(b">chr1\n").unwrap();
+        fasta.write_all(sequence).unwrap();
+
+        let mut fai = std::fs::File::create(directory.join("ref.fa.fai")).unwrap();
+        fai.write_all(b"chr1\t16\t6\t10\t11\n").unwrap();
+
+        Reference::open(path.to_str().unwrap()).unwrap()
+    }
+
+    #[test]
+    fn parse_fai_() {
+        let index = parse_fai("chr1\t16\t6\t10\t11\nchr2\t4\t30\t60\t61\n").unwrap();
+
+        assert_eq!(
+            index["chr2"],
+            FaiRecord {
+                length: 4,
+                offset: 30,
+                line_bases: 60,
+                line_width: 61
+            }
+        );
+        assert!(parse_fai("chr1\t16\tsix\t10\t11\n").is_err());
+        assert!(parse_fai("chr1\t16\t6\t0\t1\n").is_err());
+    }
+
+    #[test]
+    fn base_() {
+        let reference = reference_file("base");
+
+        assert_eq!(reference.base("chr1", 1), Some(b'G'));
+        assert_eq!(reference.base("chr1", 10), Some(b'T'));
+        assert_eq!(reference.base("chr1", 11), Some(b'T'));
+        assert_eq!(reference.base("chr1", 16), Some(b'G'));
+        assert_eq!(reference.base("chr1", 17), None);
+        assert_eq!(reference.base("chr1", 0), None);
+        assert_eq!(reference.base("chr2", 1), None);
+    }
+
+    #[test]
+    fn normalize_() {
+        let reference = reference_file("normalize");
+
+        // deletion of AC in repeat is shift to first copy
+        assert_eq!(
+            normalize(&reference, "chr1", 6, b"CAC", b"C"),
+            Some((2, b"GAC".to_vec(), b"G".to_vec()))
+        );
+        // insertion without anchor base
+        assert_eq!(
+            normalize(&reference, "chr1", 12, b"T", b"TT"),
+            Some((9, b"A".to_vec(), b"AT".to_vec()))
+        );
+        // shared prefix and suffix are trimmed
+        assert_eq!(
+            normalize(&reference, "chr1", 13, b"TTCG", b"TACG"),
+            Some((15, b"T".to_vec(), b"A".to_vec()))
+        );
+        // snv, symbolic and unknown chromosome are untouched
+        assert_eq!(normalize(&reference, "chr1", 3, b"A", b"T"), None);
+        assert_eq!(normalize(&reference, "chr1", 3, b"A", b"<DEL>"), None);
+        assert_eq!(normalize(&reference, "chr2", 6, b"CAC", b"C"), None);
+    }
+
+    #[test]
+    fn left_align_() {
+        let reference = reference_file("left_align");
+
+        let mut chr = StringChunked::new("chr", vec!["chr1", "chr1"]);
+        let mut pos = UInt64Chunked::new_vec("pos", vec![6, 3]);
+        let mut ref_seq = StringChunked::new("ref", vec!["cac", "A"]);
+        let mut alt_seq = StringChunked::new("alt", vec!["c", "T"]);
+
+        chr.extend(&StringChunked::full_null("", 1));
+        pos.extend(&UInt64Chunked::full_null("", 1));
+        ref_seq.extend(&StringChunked::full_null("", 1));
+        alt_seq.extend(&StringChunked::full_null("", 1));
+
+        let result = local_left_align(&reference, &chr, &pos, &ref_seq, &alt_seq).unwrap();
+        let result = result.struct_().unwrap();
+
+        assert_eq!(
+            result
+                .field_by_name("pos")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(2), Some(3), None]
+        );
+        assert_eq!(
+            result
+                .field_by_name("ref")
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("GAC"), Some("A"), None]
+        );
+        assert_eq!(
+            result
+                .field_by_name("alt")
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("G"), Some("T"), None]
+        );
+    }
+
+    #[test]
+    fn left_align_invalid_reference() {
+        let reference = reference_sequence("invalid_reference", b"G\xffACACACAT\nTTTTCG\n");
+
+        let chr = StringChunked::new("chr", vec!["chr1"]);
+        let pos = UInt64Chunked::new_vec("pos", vec![6]);
+        let ref_seq = StringChunked::new("ref", vec!["CAC"]);
+        let alt_seq = StringChunked::new("alt", vec!["C"]);
+
+        assert!(local_left_align(&reference, &chr, &pos, &ref_seq, &alt_seq).is_err());
+    }
+}
@@ -1,13 +1,21 @@
 //! Function required to compute variant id
 
 /* std use */
+use std::collections::HashMap;
 
 /* crate use */
+use rayon::prelude::*;
 
 /* polars use */
+use polars_core::export::arrow::array::{PrimitiveArray, Utf8ViewArray};
 use polars_core::prelude::*;
+use polars_core::utils::{align_chunks_binary, align_chunks_ternary};
+use polars_core::POOL;
 use pyo3_polars::derive::polars_expr;
 
+/// Maximal number of rows process by one task, larger chunks are split to keep all threads busy
+const TASK_SIZE: usize = 1 << 18;
+
 #[inline(always)]
 pub(crate) fn nuc2bit(nuc: u8) -> u64 {
     (nuc as u64 >> 1) & 0b11
@@ -30,43 +38,134 @@ pub(crate) fn ref_alt_space_usage(refs: &[u8], alts: &[u8]) -> u64 {
     (64 - (refs.len() as u64).leading_zeros()) as u64 + (alts.len() as u64 * 2)
 }
 
-fn local_compute(
+/// Hasher use for variant that can't be packed
+pub(crate) fn id_hasher() -> ahash::RandomState {
+    ahash::RandomState::with_seeds(42, 42, 42, 42)
+}
+
+/// Compute id of one variant, `key` is a buffer reuse between variants to build hash key
+#[inline(always)]
+pub(crate) fn variant_id(
+    pos: u64,
+    refs: &[u8],
+    alts: &[u8],
+    pos_mov: u64,
+    hasher: &ahash::RandomState,
+    key: &mut Vec<u8>,
+) -> u64 {
+    if ref_alt_space_usage(refs, alts) > pos_mov {
+        key.clear();
+
+        key.extend(pos.to_be_bytes());
+        key.extend(refs);
+        key.extend(alts);
+
+        (1 << 63) | (hasher.hash_one(&*key) >> 1)
+    } else {
+        let mut hash = 0;
+        hash |= pos << pos_mov;
+        hash |= (refs.len() as u64) << (alts.len() * 2);
+        hash |= seq2bit(alts);
+
+        hash
+    }
+}
+
+/// Range of rows of each task, a chunk of `length` rows is split in tasks of at most TASK_SIZE rows, an empty chunk produce one empty task
+fn tasks(length: usize) -> impl Iterator<Item = (usize, usize)> {
+    (0..length.max(1))
+        .step_by(TASK_SIZE)
+        .map(move |offset| (offset, TASK_SIZE.min(length - offset)))
+}
+
+/// Compute id of an arrow chunk, if chunk didn't contain null values buffers are read directly
+fn compute_chunk(
+    real_pos: &PrimitiveArray<u64>,
+    ref_seq: &Utf8ViewArray,
+    alt_seq: &Utf8ViewArray,
+    pos_mov: u64,
+    hasher: &ahash::RandomState,
+) -> PrimitiveArray<u64> {
+    let mut key = Vec::with_capacity(128);
+
+    if real_pos.null_count() == 0 && ref_seq.null_count() == 0 && alt_seq.null_count() == 0 {
+        let values: Vec<u64> = real_pos
+            .values()
+            .iter()
+            .zip(ref_seq.values_iter())
+            .zip(alt_seq.values_iter())
+            .map(|((p, r), a)| {
+                variant_id(*p, r.as_bytes(), a.as_bytes(), pos_mov, hasher, &mut key)
+            })
+            .collect();
+
+        return PrimitiveArray::from_vec(values);
+    }
+
+    real_pos
+        .iter()
+        .zip(ref_seq.iter())
+        .zip(alt_seq.iter())
+        .map(|((p, r), a)| match (p, r, a) {
+            (Some(p), Some(r), Some(a)) => Some(variant_id(
+                *p,
+                r.as_bytes(),
+                a.as_bytes(),
+                pos_mov,
+                hasher,
+                &mut key,
+            )),
+            _ => None,
+        })
+        .collect()
+}
+
+/// Align chunks of variants columns and split them in tasks
+fn variant_tasks(
+    real_pos: &UInt64Chunked,
+    ref_seq: &StringChunked,
+    alt_seq: &StringChunked,
+) -> Vec<(PrimitiveArray<u64>, Utf8ViewArray, Utf8ViewArray)> {
+    let (real_pos, ref_seq, alt_seq) = align_chunks_ternary(real_pos, ref_seq, alt_seq);
+
+    let mut inputs = Vec::new();
+    for ((p, r), a) in real_pos
+        .downcast_iter()
+        .zip(ref_seq.downcast_iter())
+        .zip(alt_seq.downcast_iter())
+    {
+        for (offset, length) in tasks(p.len()) {
+            inputs.push((
+                p.clone().sliced(offset, length),
+                r.clone().sliced(offset, length),
+                a.clone().sliced(offset, length),
+            ));
+        }
+    }
+
+    inputs
+}
+
+/// Compute variant id, chunks are split in tasks run in parallel, output chunks follow tasks
+pub fn local_compute(
     real_pos: &UInt64Chunked,
     ref_seq: &StringChunked,
     alt_seq: &StringChunked,
     max_pos: u64,
 ) -> PolarsResult<Series> {
     let pos_mov = max_pos.leading_zeros() as u64 - 1;
-    let hasher = ahash::RandomState::with_seeds(42, 42, 42, 42);
-    let mut key = Vec::with_capacity(128);
+    let hasher = id_hasher();
 
-    let out: ChunkedArray<UInt64Type> = real_pos
-        .into_iter()
-        .zip(ref_seq)
-        .zip(alt_seq)
-        .map(|((p, r), a)| match (p, r, a) {
-            (Some(p), Some(r), Some(a)) => {
-                let mut hash = 0;
-                if ref_alt_space_usage(r.as_bytes(), a.as_bytes()) > pos_mov {
-                    key.clear();
-
-                    key.extend(p.to_be_bytes());
-                    key.extend(r.as_bytes());
-                    key.extend(a.as_bytes());
-
-                    hash = (1 << 63) | (hasher.hash_one(&key) >> 1);
-                } else {
-                    hash |= p << pos_mov;
-                    hash |= (r.len() as u64) << (a.len() * 2);
-                    hash |= seq2bit(a.as_bytes());
-                }
-                Some(hash)
-            }
-            _ => None,
-        })
-        .collect();
+    let inputs = variant_tasks(real_pos, ref_seq, alt_seq);
+
+    let chunks: Vec<PrimitiveArray<u64>> = POOL.install(|| {
+        inputs
+            .par_iter()
+            .map(|(p, r, a)| compute_chunk(p, r, a, pos_mov, &hasher))
+            .collect()
+    });
 
-    Ok(out.into_series())
+    Ok(UInt64Chunked::from_chunk_iter(real_pos.name(), chunks).into_series())
 }
 
 #[polars_expr(output_type=UInt64)]
@@ -79,15 +178,469 @@ fn compute(inputs: &[Series]) -> PolarsResult<Series> {
     local_compute(real_pos, ref_seq, alt_seq, max_pos)
 }
 
-fn local_part(id: &UInt64Chunked, number_of_bits: u8) -> PolarsResult<Series> {
-    Ok(id
-        .into_iter()
-        .map(|i| match i {
-            Some(i) if i >> 63 == 0b1 => Some((1 << number_of_bits) - 1),
-            Some(i) => Some((i << 1) >> (64 - number_of_bits)),
-            _ => None,
+/// Compute position of variants on the concatenation of all contigs, null if contig isn't in `offsets`
+///
+/// Records are usually sorted, offset of the last contig is reused without lookup.
+fn local_real_pos(
+    chr: &StringChunked,
+    pos: &UInt64Chunked,
+    offsets: &HashMap<String, u64>,
+) -> UInt64Chunked {
+    let (chr, pos) = align_chunks_binary(chr, pos);
+
+    let mut last: Option<(&str, Option<u64>)> = None;
+    let chunks: Vec<PrimitiveArray<u64>> = chr
+        .downcast_iter()
+        .zip(pos.downcast_iter())
+        .map(|(c, p)| {
+            c.iter()
+                .zip(p.iter())
+                .map(|(c, p)| {
+                    let c = c?;
+                    let offset = match last {
+                        Some((name, offset)) if name == c => offset,
+                        _ => {
+                            let offset = offsets.get(c).copied();
+                            last = Some((c, offset));
+                            offset
+                        }
+                    };
+
+                    Some(offset? + p?)
+                })
+                .collect()
+        })
+        .collect();
+
+    UInt64Chunked::from_chunk_iter(pos.name(), chunks)
+}
+
+/// Compute variant id from contig name and position, contig offsets are resolved in kernel
+pub fn local_compute_contig(
+    chr: &StringChunked,
+    pos: &UInt64Chunked,
+    ref_seq: &StringChunked,
+    alt_seq: &StringChunked,
+    offsets: &HashMap<String, u64>,
+    max_pos: u64,
+) -> PolarsResult<Series> {
+    let real_pos = local_real_pos(chr, pos, offsets);
+
+    local_compute(&real_pos, ref_seq, alt_seq, max_pos)
+}
+
+#[derive(serde::Deserialize)]
+struct ContigsKwargs {
+    contigs: Vec<String>,
+    offsets: Vec<u64>,
+    max_pos: u64,
+}
+
+/// Map contig name to offset
+fn contigs_offsets(contigs: Vec<String>, offsets: Vec<u64>) -> PolarsResult<HashMap<String, u64>> {
+    polars_ensure!(
+        contigs.len() == offsets.len(),
+        ComputeError: "contigs and offsets must have same length"
+    );
+
+    Ok(contigs.into_iter().zip(offsets).collect())
+}
+
+#[polars_expr(output_type=UInt64)]
+fn compute_contig(inputs: &[Series], kwargs: ContigsKwargs) -> PolarsResult<Series> {
+    let chr = inputs[0].str()?;
+    let pos = inputs[1].cast(&DataType::UInt64)?;
+    let ref_seq = inputs[2].str()?;
+    let alt_seq = inputs[3].str()?;
+
+    let offsets = contigs_offsets(kwargs.contigs, kwargs.offsets)?;
+
+    local_compute_contig(chr, pos.u64()?, ref_seq, alt_seq, &offsets, kwargs.max_pos)
+}
+
+/// Maximal length of alternative sequence packed in a wide id, 6 bits store length and 58 bits store sequence
+const WIDE_ALT_LEN: usize = 29;
+
+/// Hashers use for wide variant id that can't be packed, first one is [id_hasher] so `hi` of a hashed wide id is equal to hashed id
+pub(crate) fn wide_id_hashers() -> (ahash::RandomState, ahash::RandomState) {
+    (id_hasher(), ahash::RandomState::with_seeds(43, 43, 43, 43))
+}
+
+/// Check if a sequence contains only A, C, G or T in any case, other bytes (N, *, symbolic allele) can't be packed without loss
+#[inline(always)]
+fn is_acgt(seq: &[u8]) -> bool {
+    seq.iter()
+        .all(|nuc| matches!(nuc, b'A' | b'C' | b'G' | b'T' | b'a' | b'c' | b'g' | b't'))
+}
+
+/// Compute wide id of one variant, `hi` store position and reference length, `lo` store alternative length and sequence
+///
+/// Reference length use all bits not used by position, alternative sequence up to WIDE_ALT_LEN bases is packed if reference and alternative contains only ACGT, other variants are hashed with two seeds.
+#[inline(always)]
+pub(crate) fn wide_variant_id(
+    pos: u64,
+    refs: &[u8],
+    alts: &[u8],
+    pos_mov: u64,
+    hashers: &(ahash::RandomState, ahash::RandomState),
+    key: &mut Vec<u8>,
+) -> (u64, u64) {
+    if (refs.len() as u64) >> pos_mov != 0
+        || alts.len() > WIDE_ALT_LEN
+        || !is_acgt(refs)
+        || !is_acgt(alts)
+    {
+        key.clear();
+
+        key.extend(pos.to_be_bytes());
+        key.extend(refs);
+        key.extend(alts);
+
+        (
+            (1 << 63) | (hashers.0.hash_one(&*key) >> 1),
+            hashers.1.hash_one(&*key),
+        )
+    } else {
+        (
+            (pos << pos_mov) | refs.len() as u64,
+            ((alts.len() as u64) << 58) | seq2bit(alts),
+        )
+    }
+}
+
+/// Compute `hi` and `lo` of wide id of an arrow chunk, if chunk didn't contain null values buffers are read directly
+fn compute_wide_chunk(
+    real_pos: &PrimitiveArray<u64>,
+    ref_seq: &Utf8ViewArray,
+    alt_seq: &Utf8ViewArray,
+    pos_mov: u64,
+    hashers: &(ahash::RandomState, ahash::RandomState),
+) -> (PrimitiveArray<u64>, PrimitiveArray<u64>) {
+    let mut key = Vec::with_capacity(128);
+
+    if real_pos.null_count() == 0 && ref_seq.null_count() == 0 && alt_seq.null_count() == 0 {
+        let (hi, lo): (Vec<u64>, Vec<u64>) = real_pos
+            .values()
+            .iter()
+            .zip(ref_seq.values_iter())
+            .zip(alt_seq.values_iter())
+            .map(|((p, r), a)| {
+                wide_variant_id(*p, r.as_bytes(), a.as_bytes(), pos_mov, hashers, &mut key)
+            })
+            .unzip();
+
+        return (PrimitiveArray::from_vec(hi), PrimitiveArray::from_vec(lo));
+    }
+
+    let (hi, lo): (Vec<Option<u64>>, Vec<Option<u64>>) = real_pos
+        .iter()
+        .zip(ref_seq.iter())
+        .zip(alt_seq.iter())
+        .map(|((p, r), a)| match (p, r, a) {
+            (Some(p), Some(r), Some(a)) => {
+                let (hi, lo) =
+                    wide_variant_id(*p, r.as_bytes(), a.as_bytes(), pos_mov, hashers, &mut key);
+                (Some(hi), Some(lo))
+            }
+            _ => (None, None),
+        })
+        .unzip();
+
+    (PrimitiveArray::from(hi), PrimitiveArray::from(lo))
+}
+
+/// Compute wide variant id, a struct of two UInt64 `hi` and `lo`, chunks are split in tasks run in parallel
+pub fn local_compute_wide(
+    real_pos: &UInt64Chunked,
+    ref_seq: &StringChunked,
+    alt_seq: &StringChunked,
+    max_pos: u64,
+) -> PolarsResult<Series> {
+    let pos_mov = max_pos.leading_zeros() as u64 - 1;
+    let hashers = wide_id_hashers();
+
+    let inputs = variant_tasks(real_pos, ref_seq, alt_seq);
+
+    let (hi, lo): (Vec<PrimitiveArray<u64>>, Vec<PrimitiveArray<u64>>) = POOL.install(|| {
+        inputs
+            .par_iter()
+            .map(|(p, r, a)| compute_wide_chunk(p, r, a, pos_mov, &hashers))
+            .unzip()
+    });
+
+    Ok(StructChunked::new(
+        real_pos.name(),
+        &[
+            UInt64Chunked::from_chunk_iter("hi", hi).into_series(),
+            UInt64Chunked::from_chunk_iter("lo", lo).into_series(),
+        ],
+    )?
+    .into_series())
+}
+
+/// Compute wide variant id from contig name and position, contig offsets are resolved in kernel
+pub fn local_compute_contig_wide(
+    chr: &StringChunked,
+    pos: &UInt64Chunked,
+    ref_seq: &StringChunked,
+    alt_seq: &StringChunked,
+    offsets: &HashMap<String, u64>,
+    max_pos: u64,
+) -> PolarsResult<Series> {
+    let real_pos = local_real_pos(chr, pos, offsets);
+
+    local_compute_wide(&real_pos, ref_seq, alt_seq, max_pos)
+}
+
+fn wide_id_output(input_fields: &[Field]) -> PolarsResult<Field> {
+    Ok(Field::new(
+        input_fields[0].name(),
+        DataType::Struct(vec![
+            Field::new("hi", DataType::UInt64),
+            Field::new("lo", DataType::UInt64),
+        ]),
+    ))
+}
+
+#[polars_expr(output_type_func=wide_id_output)]
+fn compute_contig_wide(inputs: &[Series], kwargs: ContigsKwargs) -> PolarsResult<Series> {
+    let chr = inputs[0].str()?;
+    let pos = inputs[1].cast(&DataType::UInt64)?;
+    let ref_seq = inputs[2].str()?;
+    let alt_seq = inputs[3].str()?;
+
+    let offsets = contigs_offsets(kwargs.contigs, kwargs.offsets)?;
+
+    local_compute_contig_wide(chr, pos.u64()?, ref_seq, alt_seq, &offsets, kwargs.max_pos)
+}
+
+/// Nucleotide of a 2 bits value, N is encoded like G and decoded as G
+const BIT2NUC: [&str; 4] = ["A", "C", "T", "G"];
+
+/// Decode a packed id, return real position and, if they could be found without ambiguity, reference length and alternative sequence
+///
+/// Reference length and alternative bits share low bits of id, with a not empty reference and alternative only a value lower than 16 has one interpretation: reference of 1 to 3 bases and alternative of one base. Hashed id return None.
+/// A variant with an empty alternative and a reference of 4 to 15 bases get same id than a substitution of one base and is decoded as this substitution.
+#[inline(always)]
+pub(crate) fn decode_id(id: u64, pos_mov: u64) -> Option<(u64, Option<(u64, &'static str)>)> {
+    if id >> 63 == 0b1 {
+        return None;
+    }
+
+    let low = id & ((1 << pos_mov) - 1);
+    let ref_alt = if (4..16).contains(&low) {
+        Some((low >> 2, BIT2NUC[(low & 0b11) as usize]))
+    } else {
+        None
+    };
+
+    Some((id >> pos_mov, ref_alt))
+}
+
+/// Find contig of a real position, `offsets` must be sorted, a contig cover positions from offset + 1 to next offset
+#[inline(always)]
+fn real_pos2contig(real_pos: u64, offsets: &[u64]) -> Option<usize> {
+    offsets
+        .partition_point(|offset| *offset < real_pos)
+        .checked_sub(1)
+}
+
+/// Decode a packed wide id, return real position, reference length and alternative sequence, hashed id return None
+#[inline(always)]
+pub(crate) fn decode_wide_id(hi: u64, lo: u64, pos_mov: u64) -> Option<(u64, u64, String)> {
+    if hi >> 63 == 0b1 {
+        return None;
+    }
+
+    let alt = (0..lo >> 58)
+        .rev()
+        .map(|index| BIT2NUC[((lo >> (2 * index)) & 0b11) as usize])
+        .collect();
+
+    Some((hi >> pos_mov, hi & ((1 << pos_mov) - 1), alt))
+}
+
+/// Build decoded struct from real position and, if they are known, reference length and alternative sequence of each id
+fn build_decoded<S: AsRef<str>>(
+    name: &str,
+    length: usize,
+    decoded: impl Iterator<Item = Option<(u64, Option<(u64, S)>)>>,
+    contigs: &[String],
+    offsets: &[u64],
+) -> PolarsResult<Series> {
+    let mut chr = StringChunkedBuilder::new("chr", length);
+    let mut pos = PrimitiveChunkedBuilder::<UInt64Type>::new("pos", length);
+    let mut ref_len = PrimitiveChunkedBuilder::<UInt64Type>::new("ref_len", length);
+    let mut alt = StringChunkedBuilder::new("alt", length);
+
+    for value in decoded {
+        let contig = value
+            .as_ref()
+            .and_then(|(real_pos, _)| real_pos2contig(*real_pos, offsets));
+
+        match (value, contig) {
+            (Some((real_pos, ref_alt)), Some(index)) => {
+                chr.append_value(&contigs[index]);
+                pos.append_value(real_pos - offsets[index]);
+                match ref_alt {
+                    Some((ref_length, seq)) => {
+                        ref_len.append_value(ref_length);
+                        alt.append_value(seq.as_ref());
+                    }
+                    None => {
+                        ref_len.append_null();
+                        alt.append_null();
+                    }
+                }
+            }
+            _ => {
+                chr.append_null();
+                pos.append_null();
+                ref_len.append_null();
+                alt.append_null();
+            }
+        }
+    }
+
+    Ok(StructChunked::new(
+        name,
+        &[
+            chr.finish().into_series(),
+            pos.finish().into_series(),
+            ref_len.finish().into_series(),
+            alt.finish().into_series(),
+        ],
+    )?
+    .into_series())
+}
+
+fn local_decode(
+    id: &UInt64Chunked,
+    contigs: &[String],
+    offsets: &[u64],
+    max_pos: u64,
+) -> PolarsResult<Series> {
+    let pos_mov = max_pos.leading_zeros() as u64 - 1;
+
+    build_decoded(
+        id.name(),
+        id.len(),
+        id.into_iter()
+            .map(|value| value.and_then(|value| decode_id(value, pos_mov))),
+        contigs,
+        offsets,
+    )
+}
+
+fn local_decode_wide(
+    id: &StructChunked,
+    contigs: &[String],
+    offsets: &[u64],
+    max_pos: u64,
+) -> PolarsResult<Series> {
+    let pos_mov = max_pos.leading_zeros() as u64 - 1;
+
+    let hi = id.field_by_name("hi")?;
+    let lo = id.field_by_name("lo")?;
+
+    build_decoded(
+        id.name(),
+        id.len(),
+        hi.u64()?
+            .into_iter()
+            .zip(lo.u64()?)
+            .map(|value| match value {
+                (Some(hi), Some(lo)) => decode_wide_id(hi, lo, pos_mov)
+                    .map(|(real_pos, length, seq)| (real_pos, Some((length, seq)))),
+                _ => None,
+            }),
+        contigs,
+        offsets,
+    )
+}
+
+fn decode_output(input_fields: &[Field]) -> PolarsResult<Field> {
+    Ok(Field::new(
+        input_fields[0].name(),
+        DataType::Struct(vec![
+            Field::new("chr", DataType::String),
+            Field::new("pos", DataType::UInt64),
+            Field::new("ref_len", DataType::UInt64),
+            Field::new("alt", DataType::String),
+        ]),
+    ))
+}
+
+#[polars_expr(output_type_func=decode_output)]
+fn decode(inputs: &[Series], kwargs: ContigsKwargs) -> PolarsResult<Series> {
+    polars_ensure!(
+        kwargs.contigs.len() == kwargs.offsets.len(),
+        ComputeError: "contigs and offsets must have same length"
+    );
+    polars_ensure!(
+        kwargs.offsets.windows(2).all(|w| w[0] <= w[1]),
+        ComputeError: "contigs offsets must be sorted"
+    );
+
+    match inputs[0].dtype() {
+        DataType::Struct(_) => local_decode_wide(
+            inputs[0].struct_()?,
+            &kwargs.contigs,
+            &kwargs.offsets,
+            kwargs.max_pos,
+        ),
+        _ => local_decode(
+            inputs[0].u64()?,
+            &kwargs.contigs,
+            &kwargs.offsets,
+            kwargs.max_pos,
+        ),
+    }
+}
+
+/// Partition of one id, all hashed id are in last partition, partition of a wide id is partition of its `hi`
+#[inline(always)]
+fn id_part(id: u64, number_of_bits: u8) -> u64 {
+    if id >> 63 == 0b1 {
+        (1 << number_of_bits) - 1
+    } else {
+        (id << 1) >> (64 - number_of_bits)
+    }
+}
+
+/// Compute partition of an arrow chunk, if chunk didn't contain null values buffer is read directly
+fn part_chunk(id: &PrimitiveArray<u64>, number_of_bits: u8) -> PrimitiveArray<u64> {
+    if id.null_count() == 0 {
+        return PrimitiveArray::from_vec(
+            id.values()
+                .iter()
+                .map(|i| id_part(*i, number_of_bits))
+                .collect(),
+        );
+    }
+
+    id.iter()
+        .map(|i| i.map(|i| id_part(*i, number_of_bits)))
+        .collect()
+}
+
+/// Compute partition of variant id, chunks are split in tasks run in parallel, output chunks follow tasks
+pub fn local_part(id: &UInt64Chunked, number_of_bits: u8) -> PolarsResult<Series> {
+    let inputs: Vec<PrimitiveArray<u64>> = id
+        .downcast_iter()
+        .flat_map(|chunk| {
+            tasks(chunk.len()).map(|(offset, length)| chunk.clone().sliced(offset, length))
         })
-        .collect())
+        .collect();
+
+    let chunks: Vec<PrimitiveArray<u64>> = POOL.install(|| {
+        inputs
+            .par_iter()
+            .map(|chunk| part_chunk(chunk, number_of_bits))
+            .collect()
+    });
+
+    Ok(UInt64Chunked::from_chunk_iter(id.name(), chunks).into_series())
 }
 
 #[derive(serde::Deserialize)]
@@ -97,9 +650,12 @@ struct PartitionsKwargs {
 
 #[polars_expr(output_type=UInt64)]
 fn partition(inputs: &[Series], kwargs: PartitionsKwargs) -> PolarsResult<Series> {
-    let id = inputs[0].u64()?;
+    let id = match inputs[0].dtype() {
+        DataType::Struct(_) => inputs[0].struct_()?.field_by_name("hi")?,
+        _ => inputs[0].clone(),
+    };
 
-    local_part(id, kwargs.number_of_bits)
+    local_part(id.u64()?, kwargs.number_of_bits)
 }
 
 #[cfg(test)]
@@ -189,6 +745,428 @@ mod tests {
         assert_eq!(ids.len(), 24);
     }
 
+    #[test]
+    fn tasks_() {
+        assert_eq!(tasks(0).collect::<Vec<_>>(), vec![(0, 0)]);
+        assert_eq!(tasks(10).collect::<Vec<_>>(), vec![(0, 10)]);
+        assert_eq!(
+            tasks(2 * TASK_SIZE + 3).collect::<Vec<_>>(),
+            vec![(0, TASK_SIZE), (TASK_SIZE, TASK_SIZE), (2 * TASK_SIZE, 3)]
+        );
+    }
+
+    #[test]
+    fn compute_id_chunks() {
+        let length = 2 * TASK_SIZE + 7;
+        let alts = ["A", "CG", "TTTTTTTTTTTTTTTTTTTTTTTTTTTTTTTT", ""];
+        let refs = ["A", "C", "GT"];
+
+        let positions: Vec<u64> = (0..length as u64).map(|i| i * 7).collect();
+        let ref_values: Vec<&str> = (0..length).map(|i| refs[i % refs.len()]).collect();
+        let alt_values: Vec<&str> = (0..length).map(|i| alts[i % alts.len()]).collect();
+
+        let hasher = id_hasher();
+        let pos_mov = 326512443305_u64.leading_zeros() as u64 - 1;
+        let mut key = Vec::new();
+        let truth: Vec<Option<u64>> = (0..length)
+            .map(|i| {
+                Some(variant_id(
+                    positions[i],
+                    ref_values[i].as_bytes(),
+                    alt_values[i].as_bytes(),
+                    pos_mov,
+                    &hasher,
+                    &mut key,
+                ))
+            })
+            .collect();
+
+        // one chunk without null
+        let real_pos = UInt64Chunked::from_vec("real_pos", positions.clone());
+        let ref_seq = StringChunked::new("ref", ref_values.clone());
+        let alt_seq = StringChunked::new("alt", alt_values.clone());
+
+        let id = local_compute(&real_pos, &ref_seq, &alt_seq, 326512443305).unwrap();
+        assert_eq!(id.u64().unwrap().into_iter().collect::<Vec<_>>(), truth);
+
+        // columns with unaligned chunks and a null
+        let split = TASK_SIZE + 11;
+        let mut real_pos = UInt64Chunked::from_vec("real_pos", positions[..split].to_vec());
+        real_pos.extend(&UInt64Chunked::from_vec("", positions[split..].to_vec()));
+        real_pos.extend(&UInt64Chunked::full_null("", 1));
+        let mut ref_seq = StringChunked::new("ref", ref_values[..3].to_vec());
+        ref_seq.extend(&StringChunked::new("", ref_values[3..].to_vec()));
+        ref_seq.extend(&StringChunked::new("", vec!["A"]));
+        let mut alt_seq = StringChunked::new("alt", alt_values.clone());
+        alt_seq.extend(&StringChunked::new("", vec!["T"]));
+
+        let id = local_compute(&real_pos, &ref_seq, &alt_seq, 326512443305).unwrap();
+        let mut truth_null = truth.clone();
+        truth_null.push(None);
+        assert_eq!(
+            id.u64().unwrap().into_iter().collect::<Vec<_>>(),
+            truth_null
+        );
+
+        let partition = local_part(id.u64().unwrap(), 8).unwrap();
+        assert_eq!(
+            partition.u64().unwrap().into_iter().collect::<Vec<_>>(),
+            truth_null
+                .iter()
+                .map(|id| id.map(|id| id_part(id, 8)))
+                .collect::<Vec<_>>()
+        );
+    }
+
+    #[test]
+    fn compute_id_contig() {
+        let offsets: HashMap<String, u64> = [("1".to_string(), 0), ("2".to_string(), 248956422)]
+            .into_iter()
+            .collect();
+
+        let mut chr = StringChunked::new("chr", vec!["1", "1", "2", "2", "3", "1"]);
+        chr.extend(&StringChunked::full_null("", 1));
+        let pos = UInt64Chunked::new_vec("pos", vec![10, 50, 110, 3, 5, 7, 8]);
+        let ref_seq = StringChunked::new("ref", vec!["A", "C", "T", "G", "G", "A", "C"]);
+        let alt_seq = StringChunked::new(
+            "alt",
+            vec![
+                "G",
+                "T",
+                "C",
+                "A",
+                "A",
+                "CATGAGCGGACTGACCATGAGCGGACTGACC",
+                "T",
+            ],
+        );
+
+        let real_pos = UInt64Chunked::new(
+            "real_pos",
+            &[
+                Some(10),
+                Some(50),
+                Some(248956532),
+                Some(248956425),
+                None,
+                Some(7),
+                None,
+            ],
+        );
+
+        let id =
+            local_compute_contig(&chr, &pos, &ref_seq, &alt_seq, &offsets, 3088269832).unwrap();
+        let truth = local_compute(&real_pos, &ref_seq, &alt_seq, 3088269832).unwrap();
+
+        assert_eq!(
+            id.u64().unwrap().into_iter().collect::<Vec<_>>(),
+            truth.u64().unwrap().into_iter().collect::<Vec<_>>()
+        );
+        assert_eq!(id.null_count(), 2);
+    }
+
+    #[test]
+    fn decode_id_() {
+        let max_pos = 3088269832;
+        let pos_mov = max_pos.leading_zeros() as u64 - 1;
+        let hasher = id_hasher();
+        let mut key = Vec::new();
+
+        for (refs, alts) in [
+            ("A", "G"),
+            ("C", "T"),
+            ("G", "A"),
+            ("T", "C"),
+            ("AC", "A"),
+            ("ACG", "T"),
+        ] {
+            let id = variant_id(
+                1000,
+                refs.as_bytes(),
+                alts.as_bytes(),
+                pos_mov,
+                &hasher,
+                &mut key,
+            );
+            assert_eq!(
+                decode_id(id, pos_mov),
+                Some((1000, Some((refs.len() as u64, alts))))
+            );
+        }
+
+        // insertion is ambiguous with a longer reference
+        let id = variant_id(1000, b"A", b"AC", pos_mov, &hasher, &mut key);
+        assert_eq!(
+            id,
+            variant_id(1000, b"ACGT", b"C", pos_mov, &hasher, &mut key)
+        );
+        assert_eq!(decode_id(id, pos_mov), Some((1000, None)));
+
+        // empty alternative can't be distinguished from a one base substitution
+        let id = variant_id(1000, b"ACGTA", b"", pos_mov, &hasher, &mut key);
+        assert_eq!(
+            id,
+            variant_id(1000, b"A", b"C", pos_mov, &hasher, &mut key)
+        );
+        assert_eq!(decode_id(id, pos_mov), Some((1000, Some((1, "C")))));
+
+        let id = variant_id(
+            1000,
+            b"A",
+            "ACGT".repeat(16).as_bytes(),
+            pos_mov,
+            &hasher,
+            &mut key,
+        );
+        assert_eq!(decode_id(id, pos_mov), None);
+    }
+
+    #[test]
+    fn decode_() {
+        let contigs = vec!["1".to_string(), "2".to_string()];
+        let offsets = vec![0, 248956422];
+        let max_pos = 3088269832;
+
+        let chr = StringChunked::new("chr", vec!["1", "2", "2", "1"]);
+        let pos = UInt64Chunked::new_vec("pos", vec![10, 1, 5000, 248956422]);
+        let ref_seq = StringChunked::new("ref", vec!["A", "CT", "A", "G"]);
+        let alt_seq = StringChunked::new("alt", vec!["G", "C", "AC", "T"]);
+        let map: HashMap<String, u64> = contigs
+            .iter()
+            .cloned()
+            .zip(offsets.iter().copied())
+            .collect();
+
+        let mut id = local_compute_contig(&chr, &pos, &ref_seq, &alt_seq, &map, max_pos).unwrap();
+        id.append(&UInt64Chunked::full_null("", 1).into_series())
+            .unwrap();
+
+        let decoded = local_decode(id.u64().unwrap(), &contigs, &offsets, max_pos).unwrap();
+        let decoded = decoded.struct_().unwrap();
+
+        assert_eq!(
+            decoded
+                .field_by_name("chr")
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("1"), Some("2"), Some("2"), Some("1"), None]
+        );
+        assert_eq!(
+            decoded
+                .field_by_name("pos")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(10), Some(1), Some(5000), Some(248956422), None]
+        );
+        assert_eq!(
+            decoded
+                .field_by_name("ref_len")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(1), Some(2), None, Some(1), None]
+        );
+        assert_eq!(
+            decoded
+                .field_by_name("alt")
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("G"), Some("C"), None, Some("T"), None]
+        );
+    }
+
+    #[test]
+    fn compute_wide_id() {
+        let max_pos = 3088269832;
+        let pos_mov = max_pos.leading_zeros() as u64 - 1;
+        let long_ref = "A".repeat(1000);
+        let long_alt = "ACGT".repeat(8);
+
+        let mut real_pos = UInt64Chunked::new_vec("real_pos", vec![10, 50, 110, 224, 224]);
+        let mut ref_seq =
+            StringChunked::new("ref", vec!["A", "A", long_ref.as_str(), "AC", "ACGT"]);
+        let mut alt_seq = StringChunked::new(
+            "alt",
+            vec![
+                "G",
+                "ACGTACGTACGTACGTACGTACGTACGTA",
+                "A",
+                long_alt.as_str(),
+                "C",
+            ],
+        );
+
+        real_pos.extend(&UInt64Chunked::full_null("", 1));
+        ref_seq.extend(&StringChunked::full_null("", 1));
+        alt_seq.extend(&StringChunked::full_null("", 1));
+
+        let id = local_compute_wide(&real_pos, &ref_seq, &alt_seq, max_pos).unwrap();
+        let id = id.struct_().unwrap();
+        let hi: Vec<Option<u64>> = id
+            .field_by_name("hi")
+            .unwrap()
+            .u64()
+            .unwrap()
+            .into_iter()
+            .collect();
+        let lo: Vec<Option<u64>> = id
+            .field_by_name("lo")
+            .unwrap()
+            .u64()
+            .unwrap()
+            .into_iter()
+            .collect();
+
+        assert_eq!(hi[0], Some(10 << pos_mov | 1));
+        assert_eq!(lo[0], Some(1 << 58 | 0b11));
+        assert_eq!(hi[1], Some(50 << pos_mov | 1));
+        assert_eq!(lo[1].unwrap() >> 58, 29);
+        assert_eq!(hi[2], Some(110 << pos_mov | 1000));
+        assert_eq!(lo[2], Some(1 << 58));
+        assert_eq!((hi[5], lo[5]), (None, None));
+
+        // alternative too long is hashed, hi is equal to hashed id
+        let mut key = Vec::new();
+        assert_eq!(
+            hi[3],
+            Some(variant_id(
+                224,
+                b"AC",
+                long_alt.as_bytes(),
+                pos_mov,
+                &id_hasher(),
+                &mut key
+            ))
+        );
+        assert_eq!(hi[3].unwrap() >> 63, 1);
+
+        // packed id collision of narrow id didn't exist in wide id
+        assert_ne!((hi[3], lo[3]), (hi[4], lo[4]));
+        assert_ne!(
+            wide_variant_id(224, b"A", b"AC", pos_mov, &wide_id_hashers(), &mut key),
+            wide_variant_id(224, b"ACGT", b"C", pos_mov, &wide_id_hashers(), &mut key)
+        );
+
+        // sequence with other nucleotide than ACGT are hashed, case is ignored
+        for (refs, alts) in [("A", "N"), ("N", "G"), ("A", "*"), ("A", "<DEL>")] {
+            let (refs, alts) = (refs.as_bytes(), alts.as_bytes());
+            let hashed_key = [&224_u64.to_be_bytes()[..], refs, alts].concat();
+
+            let (hi, lo) = wide_variant_id(224, refs, alts, pos_mov, &wide_id_hashers(), &mut key);
+            assert_eq!(hi >> 63, 1);
+            assert_eq!(hi, variant_id(224, refs, alts, 0, &id_hasher(), &mut key));
+            assert_eq!(lo, wide_id_hashers().1.hash_one(&hashed_key[..]));
+        }
+        assert_ne!(
+            wide_variant_id(224, b"A", b"N", pos_mov, &wide_id_hashers(), &mut key),
+            wide_variant_id(224, b"A", b"G", pos_mov, &wide_id_hashers(), &mut key)
+        );
+        assert_eq!(
+            wide_variant_id(224, b"a", b"acgt", pos_mov, &wide_id_hashers(), &mut key),
+            wide_variant_id(224, b"A", b"ACGT", pos_mov, &wide_id_hashers(), &mut key)
+        );
+
+        // partition of wide id follow partition of id, except for alternative only packed in wide id
+        let narrow = local_compute(&real_pos, &ref_seq, &alt_seq, max_pos).unwrap();
+        let part: Vec<Option<u64>> = local_part(narrow.u64().unwrap(), 8)
+            .unwrap()
+            .u64()
+            .unwrap()
+            .into_iter()
+            .collect();
+        let wide_part: Vec<Option<u64>> =
+            local_part(id.field_by_name("hi").unwrap().u64().unwrap(), 8)
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect();
+
+        assert_eq!((part[1], wide_part[1]), (Some(255), Some(0)));
+        for index in [0, 2, 3, 4, 5] {
+            assert_eq!(part[index], wide_part[index]);
+        }
+    }
+
+    #[test]
+    fn decode_wide() {
+        let contigs = vec!["1".to_string(), "2".to_string()];
+        let offsets = vec![0, 248956422];
+        let max_pos = 3088269832;
+        let long_ref = "ACGT".repeat(100);
+
+        let chr = StringChunked::new("chr", vec!["1", "2", "2", "1"]);
+        let pos = UInt64Chunked::new_vec("pos", vec![10, 1, 5000, 248956422]);
+        let ref_seq = StringChunked::new("ref", vec!["A", long_ref.as_str(), "A", "G"]);
+        let alt_seq = StringChunked::new(
+            "alt",
+            vec!["G", "", "ACTGACTG", "ACGTACGTACGTACGTACGTACGTACGTACGT"],
+        );
+        let map: HashMap<String, u64> = contigs
+            .iter()
+            .cloned()
+            .zip(offsets.iter().copied())
+            .collect();
+
+        let id = local_compute_contig_wide(&chr, &pos, &ref_seq, &alt_seq, &map, max_pos).unwrap();
+
+        let decoded =
+            local_decode_wide(id.struct_().unwrap(), &contigs, &offsets, max_pos).unwrap();
+        let decoded = decoded.struct_().unwrap();
+
+        assert_eq!(
+            decoded
+                .field_by_name("chr")
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("1"), Some("2"), Some("2"), None]
+        );
+        assert_eq!(
+            decoded
+                .field_by_name("pos")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(10), Some(1), Some(5000), None]
+        );
+        assert_eq!(
+            decoded
+                .field_by_name("ref_len")
+                .unwrap()
+                .u64()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some(1), Some(400), Some(1), None]
+        );
+        assert_eq!(
+            decoded
+                .field_by_name("alt")
+                .unwrap()
+                .str()
+                .unwrap()
+                .into_iter()
+                .collect::<Vec<_>>(),
+            vec![Some("G"), Some(""), Some("ACTGACTG"), None]
+        );
+    }
+
     #[test]
     fn compute_part() {
         let mut real_pos = UInt64Chunked::new_vec(
@@ -0,0 +1,685 @@
+//! Native vcf record reader
+
+/* std use */
+use std::io::BufRead;
+use std::io::Write;
+
+/* crate use */
+use pyo3::prelude::*;
+use pyo3_polars::error::PyPolarsErr;
+use pyo3_polars::PyDataFrame;
+
+/* polars use */
+use polars_core::prelude::*;
+
+/* project use */
+use crate::bcf;
+use crate::bgzf;
+use crate::index;
+use crate::info;
+
+/// Default number of records in each batch
+pub(crate) const DEFAULT_BATCH_SIZE: usize = 1 << 16;
+
+/// Name of typed INFO column, insert after info column
+pub(crate) const INFO_STRUCT_COLUMN: &str = "info_struct";
+
+#[inline(always)]
+pub(crate) fn trim_newline(line: &[u8]) -> &[u8] {
+    let mut end = line.len();
+    while end > 0 && (line[end - 1] == b'\n' || line[end - 1] == b'\r') {
+        end -= 1;
+    }
+
+    &line[..end]
+}
+
+#[inline(always)]
+fn field2str(field: Option<&[u8]>, line_number: usize) -> PolarsResult<Option<&str>> {
+    match field {
+        Some(f) if !f.is_empty() => std::str::from_utf8(f)
+            .map(Some)
+            .map_err(|_| polars_err!(ComputeError: "vcf line {} isn't valid utf-8", line_number)),
+        _ => Ok(None),
+    }
+}
+
+#[inline(always)]
+fn field2pos(field: Option<&[u8]>, line_number: usize) -> PolarsResult<Option<u64>> {
+    match field2str(field, line_number)? {
+        Some(f) => f
+            .parse::<u64>()
+            .map(Some)
+            .map_err(|_| polars_err!(ComputeError: "vcf line {} position '{}' isn't an integer", line_number, f)),
+        None => Ok(None),
+    }
+}
+
+/// Reason why a record can't be read, None if record is valid
+///
+/// A record is rejected if it isn't valid utf-8, if chromosome or position is empty, if position isn't an integer or if it has less than `column_number` fields.
+fn check_record(record: &[u8], column_number: usize) -> Option<String> {
+    let Ok(record) = std::str::from_utf8(record) else {
+        return Some("record isn't valid utf-8".to_string());
+    };
+
+    let mut fields = record.split('\t');
+    if fields.next().unwrap_or_default().is_empty() {
+        return Some("chromosome is empty".to_string());
+    }
+
+    match fields.next() {
+        None | Some("") => return Some("position is empty".to_string()),
+        Some(pos) if pos.parse::<u64>().is_err() => {
+            return Some(format!("position '{}' isn't an integer", pos))
+        }
+        _ => (),
+    }
+
+    if 2 + fields.count() < column_number {
+        return Some(format!(
+            "record is truncated, {} fields expected",
+            column_number
+        ));
+    }
+
+    None
+}
+
+/// Side file where malformed records are written, one line by record: line number, reason and raw record separate by tabulation
+pub(crate) struct Quarantine {
+    output: std::io::BufWriter<std::fs::File>,
+    count: usize,
+}
+
+impl Quarantine {
+    /// Create quarantine file, previous content is erased
+    pub(crate) fn create(path: &std::path::Path) -> std::io::Result<Self> {
+        Ok(Self {
+            output: std::io::BufWriter::new(std::fs::File::create(path)?),
+            count: 0,
+        })
+    }
+
+    /// Write a rejected record
+    pub(crate) fn reject(&mut self, line_number: usize, reason: &str, record: &[u8]) -> std::io::Result<()> {
+        write!(self.output, "{}\t{}\t", line_number, reason)?;
+        self.output.write_all(record)?;
+        self.output.write_all(b"\n")?;
+        self.count += 1;
+
+        Ok(())
+    }
+
+    /// Number of rejected records
+    pub(crate) fn count(&self) -> usize {
+        self.count
+    }
+
+    /// Flush rejected records on disk
+    pub(crate) fn flush(&mut self) -> std::io::Result<()> {
+        self.output.flush()
+    }
+}
+
+/// Path that designate standard input
+pub(crate) const STDIN_PATH: &str = "-";
+
+/// Open a vcf file, gzip and BGZF file are decompressed on the fly
+///
+/// If path is `-` standard input is read. Input is read sequentially, FIFO and pipe are supported.
+/// BGZF blocks are decompressed in parallel with `threads` threads, 0 let rayon choose.
+pub(crate) fn open(path: &std::path::Path, threads: usize) -> std::io::Result<Box<dyn BufRead + Send>> {
+    if path == std::path::Path::new(STDIN_PATH) {
+        decompress(
+            std::io::BufReader::with_capacity(1 << 20, std::io::stdin()),
+            threads,
+        )
+    } else {
+        decompress(
+            std::io::BufReader::with_capacity(1 << 20, std::fs::File::open(path)?),
+            threads,
+        )
+    }
+}
+
+/// Detect compression of input with its first bytes and wrap it in matching decoder
+fn decompress<R: BufRead + Send + 'static>(
+    mut input: R,
+    threads: usize,
+) -> std::io::Result<Box<dyn BufRead + Send>> {
+    let (is_bgzf, is_gzip) = {
+        let head = input.fill_buf()?;
+        (bgzf::is_bgzf(head), bgzf::is_gzip(head))
+    };
+
+    if is_bgzf {
+        Ok(Box::new(bgzf::BgzfReader::new(input, threads)?))
+    } else if is_gzip {
+        Ok(Box::new(std::io::BufReader::with_capacity(
+            1 << 20,
+            flate2::bufread::MultiGzDecoder::new(input),
+        )))
+    } else {
+        Ok(Box::new(input))
+    }
+}
+
+/// Open a vcf file and read only records in regions
+///
+/// If file is BGZF compressed and a tabix or csi index is present only blocks overlapping regions are read,
+/// otherwise all file is read. In both case records must be filtered by [read_batch].
+pub(crate) fn open_regions(
+    path: &std::path::Path,
+    threads: usize,
+    regions: &index::Regions,
+) -> std::io::Result<Box<dyn BufRead + Send>> {
+    if path == std::path::Path::new(STDIN_PATH) {
+        return open(path, threads);
+    }
+
+    let mut file = std::io::BufReader::with_capacity(1 << 20, std::fs::File::open(path)?);
+
+    let is_bgzf = bgzf::is_bgzf(file.fill_buf()?);
+    match index::Index::find(path) {
+        Some(index_path) if is_bgzf => {
+            let chunks = index::Index::from_path(&index_path)?.chunks(regions);
+            Ok(Box::new(index::ChunksReader::new(
+                bgzf::BgzfReader::new(file, threads)?,
+                chunks,
+            )))
+        }
+        _ => open(path, threads),
+    }
+}
+
+/// Read header lines of `input`, reading stop after `#CHROM` line, records are not consumed.
+pub(crate) fn read_header<R: BufRead>(input: &mut R, line_number: &mut usize) -> PolarsResult<Vec<String>> {
+    let mut header = Vec::new();
+    let mut line = Vec::with_capacity(1024);
+    loop {
+        polars_ensure!(
+            input.fill_buf()?.first() == Some(&b'#'),
+            ComputeError: "vcf header must end by a #CHROM line"
+        );
+
+        line.clear();
+        input.read_until(b'\n', &mut line)?;
+        *line_number += 1;
+
+        let text = field2str(Some(trim_newline(&line)), *line_number)?.unwrap_or_default();
+        header.push(text.to_string());
+
+        if text.starts_with("#CHROM") {
+            return Ok(header);
+        }
+    }
+}
+
+/// Read at most `batch_size` records of `input` in a DataFrame.
+///
+/// Column `chr` is a String, `pos` an UInt64 and all other column are kept as String, empty field are set to null.
+/// Comment line are skipped, field after the last column name are ignored.
+/// If `regions` is set, records that didn't overlap a region are skipped.
+/// If `quarantine` is set, malformed records are written in it and skipped instead of failing.
+pub(crate) fn read_batch<R: BufRead>(
+    input: &mut R,
+    column_names: &[String],
+    batch_size: usize,
+    line_number: &mut usize,
+    regions: Option<&index::Regions>,
+    mut quarantine: Option<&mut Quarantine>,
+) -> PolarsResult<Option<DataFrame>> {
+    polars_ensure!(column_names.len() >= 2, ComputeError: "vcf reader require at least chr and pos columns");
+
+    let mut chr = StringChunkedBuilder::new(&column_names[0], batch_size);
+    let mut pos = PrimitiveChunkedBuilder::<UInt64Type>::new(&column_names[1], batch_size);
+    let mut others: Vec<StringChunkedBuilder> = column_names[2..]
+        .iter()
+        .map(|name| StringChunkedBuilder::new(name, batch_size))
+        .collect();
+
+    let mut line = Vec::with_capacity(1024);
+    let mut records = 0;
+    while records < batch_size {
+        line.clear();
+        if input.read_until(b'\n', &mut line)? == 0 {
+            break;
+        }
+        *line_number += 1;
+
+        let record = trim_newline(&line);
+        if record.is_empty() || record[0] == b'#' {
+            continue;
+        }
+
+        if let Some(quarantine) = quarantine.as_deref_mut() {
+            if let Some(reason) = check_record(record, column_names.len()) {
+                quarantine.reject(*line_number, &reason, record)?;
+                continue;
+            }
+        }
+
+        if let Some(regions) = regions {
+            let mut fields = record.split(|c| *c == b'\t');
+            let record_chr = field2str(fields.next(), *line_number)?.unwrap_or_default();
+            let record_pos = field2pos(fields.next(), *line_number)?.unwrap_or_default();
+            let ref_len = fields.nth(1).map(|f| f.len() as u64).unwrap_or(1).max(1);
+
+            if !regions.overlap(record_chr, record_pos, record_pos + ref_len - 1) {
+                continue;
+            }
+        }
+
+        let mut fields = record.split(|c| *c == b'\t');
+        chr.append_option(field2str(fields.next(), *line_number)?);
+        pos.append_option(field2pos(fields.next(), *line_number)?);
+        for builder in others.iter_mut() {
+            builder.append_option(field2str(fields.next(), *line_number)?);
+        }
+
+        records += 1;
+    }
+
+    if records == 0 {
+        return Ok(None);
+    }
+
+    let mut columns = Vec::with_capacity(column_names.len());
+    columns.push(chr.finish().into_series());
+    columns.push(pos.finish().into_series());
+    columns.extend(others.into_iter().map(|builder| builder.finish().into_series()));
+
+    DataFrame::new(columns).map(Some)
+}
+
+/// Decode info column of batch in a struct, one field by INFO definition, and insert it after info column
+///
+/// Batch without info column isn't modified.
+pub(crate) fn add_info_struct(mut batch: DataFrame, definitions: &info::InfoKwargs) -> PolarsResult<DataFrame> {
+    let Some(index) = batch.get_column_index("info") else {
+        return Ok(batch);
+    };
+
+    let info_struct = info::local_parse(batch.column("info")?.str()?, definitions)?.with_name(INFO_STRUCT_COLUMN);
+    batch.insert_column(index + 1, info_struct)?;
+
+    Ok(batch)
+}
+
+/// Iterator over batch of vcf records, each batch is a polars DataFrame
+///
+/// BCF input is detected by its magic number, records are decoded in same columns and same text value as vcf.
+/// If `quarantine` is set, malformed vcf records are written in this file and skipped, `rejected` count them.
+/// If `info` is set (name, number and type of INFO fields), INFO is also decoded in a typed struct column `info_struct` insert after info column.
+#[pyclass(module = "variantplaner_rs")]
+pub struct VcfReader {
+    input: Box<dyn BufRead + Send>,
+    #[pyo3(get, set)]
+    column_names: Vec<String>,
+    batch_size: usize,
+    line_number: usize,
+    regions: Option<index::Regions>,
+    #[pyo3(get)]
+    is_bcf: bool,
+    bcf_header: Option<bcf::Header>,
+    quarantine: Option<Quarantine>,
+    info: Option<info::InfoKwargs>,
+}
+
+#[pymethods]
+impl VcfReader {
+    #[new]
+    #[pyo3(signature = (path, column_names, batch_size=DEFAULT_BATCH_SIZE, threads=1, regions=None, quarantine=None))]
+    fn new(
+        path: std::path::PathBuf,
+        column_names: Vec<String>,
+        batch_size: usize,
+        threads: usize,
+        regions: Option<Vec<(String, u64, u64)>>,
+        quarantine: Option<std::path::PathBuf>,
+    ) -> PyResult<Self> {
+        let regions = regions.map(index::Regions::new);
+        let quarantine = quarantine
+            .map(|quarantine| Quarantine::create(&quarantine))
+            .transpose()?;
+        let mut input = open(&path, threads)?;
+        let is_bcf = bcf::is_bcf(input.fill_buf()?);
+
+        // bcf index store contig index not name, bcf records are filtered during decoding
+        if let Some(regions) = &regions {
+            if !is_bcf && path != std::path::Path::new(STDIN_PATH) {
+                input = open_regions(&path, threads, regions)?;
+            }
+        }
+
+        Ok(Self {
+            input,
+            column_names,
+            batch_size: batch_size.max(1),
+            line_number: 0,
+            regions,
+            is_bcf,
+            bcf_header: None,
+            quarantine,
+            info: None,
+        })
+    }
+
+    /// Number of records write in quarantine file
+    #[getter]
+    fn rejected(&self) -> usize {
+        self.quarantine.as_ref().map_or(0, Quarantine::count)
+    }
+
+    /// Set name, number and type of INFO fields decoded in `info_struct` column, None to keep only info column
+    #[setter]
+    fn set_info(&mut self, info: Option<Vec<(String, String, String)>>) {
+        self.info = info.map(info::InfoKwargs::new);
+    }
+
+    /// Read header lines, must be call before first batch, useful when input can be read only once
+    fn header(mut slf: PyRefMut<'_, Self>) -> PyResult<Vec<String>> {
+        let this = &mut *slf;
+
+        if this.is_bcf {
+            let header = bcf::Header::read(&mut this.input).map_err(PyPolarsErr::from)?;
+            let lines = header.lines.clone();
+            this.bcf_header = Some(header);
+
+            return Ok(lines);
+        }
+
+        Ok(read_header(&mut this.input, &mut this.line_number).map_err(PyPolarsErr::from)?)
+    }
+
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(mut slf: PyRefMut<'_, Self>) -> PyResult<Option<PyDataFrame>> {
+        let py = slf.py();
+        let this = &mut *slf;
+
+        let batch = py
+            .allow_threads(|| {
+                let batch = if !this.is_bcf {
+                    let batch = read_batch(
+                        &mut this.input,
+                        &this.column_names,
+                        this.batch_size,
+                        &mut this.line_number,
+                        this.regions.as_ref(),
+                        this.quarantine.as_mut(),
+                    );
+                    if let Some(quarantine) = this.quarantine.as_mut() {
+                        quarantine.flush()?;
+                    }
+
+                    batch?
+                } else {
+                    if this.bcf_header.is_none() {
+                        this.bcf_header = Some(bcf::Header::read(&mut this.input)?);
+                    }
+
+                    bcf::read_batch(
+                        &mut this.input,
+                        this.bcf_header.as_ref().unwrap(),
+                        &this.column_names,
+                        this.batch_size,
+                        &mut this.line_number,
+                        this.regions.as_ref(),
+                    )?
+                };
+
+                match (batch, this.info.as_ref()) {
+                    (Some(batch), Some(definitions)) => add_info_struct(batch, definitions).map(Some),
+                    (batch, _) => Ok(batch),
+                }
+            })
+            .map_err(PyPolarsErr::from)?;
+
+        Ok(batch.map(PyDataFrame))
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    use std::io::Read;
+
+    fn names(number: usize) -> Vec<String> {
+        ["chr", "pos", "vid", "ref", "alt", "qual", "filter", "info", "format", "sample"]
+            .iter()
+            .take(number)
+            .map(|n| n.to_string())
+            .collect()
+    }
+
+    #[test]
+    fn trim_newline_() {
+        assert_eq!(trim_newline(b"abc\n"), b"abc");
+        assert_eq!(trim_newline(b"abc\r\n"), b"abc");
+        assert_eq!(trim_newline(b"abc"), b"abc");
+        assert_eq!(trim_newline(b"\n"), b"");
+    }
+
+    #[test]
+    fn read_batch_() {
+        let data = b"##fileformat=VCFv4.3
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\tsample
+1\t10\t.\tA\tT\t.\tPASS\tDP=10\tGT:DP\t0/1:10
+2\t20\trs1\tAC\tA\t50\t\t.\tGT:DP\t1/1:3
+X\t30\t.\tG\tC\t.\tPASS\t.\tGT
+";
+        let mut input = std::io::Cursor::new(&data[..]);
+        let mut line_number = 0;
+
+        let df = read_batch(&mut input, &names(10), 2, &mut line_number, None, None)
+            .unwrap()
+            .unwrap();
+
+        assert_eq!(df.height(), 2);
+        assert_eq!(df.width(), 10);
+        assert_eq!(df.column("pos").unwrap().dtype(), &DataType::UInt64);
+        assert_eq!(
+            df.column("pos").unwrap().u64().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![Some(10), Some(20)]
+        );
+        assert_eq!(
+            df.column("filter").unwrap().str().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![Some("PASS"), None]
+        );
+
+        let df = read_batch(&mut input, &names(10), 2, &mut line_number, None, None)
+            .unwrap()
+            .unwrap();
+
+        assert_eq!(df.height(), 1);
+        assert_eq!(
+            df.column("sample").unwrap().str().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![None]
+        );
+        assert_eq!(line_number, 5);
+
+        assert!(read_batch(&mut input, &names(10), 2, &mut line_number, None, None)
+            .unwrap()
+            .is_none());
+    }
+
+    #[test]
+    fn read_header_() {
+        let data = b"##fileformat=VCFv4.3
+#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO
+1\t10\t.\tA\tT\t.\tPASS\tDP=10
+";
+        let mut input = std::io::Cursor::new(&data[..]);
+        let mut line_number = 0;
+
+        let header = read_header(&mut input, &mut line_number).unwrap();
+        assert_eq!(header.len(), 2);
+        assert!(header[1].starts_with("#CHROM"));
+        assert_eq!(line_number, 2);
+
+        let df = read_batch(&mut input, &names(8), 2, &mut line_number, None, None)
+            .unwrap()
+            .unwrap();
+        assert_eq!(df.height(), 1);
+
+        let mut input = std::io::Cursor::new(&b"##fileformat=VCFv4.3\n1\t10\n"[..]);
+        assert!(read_header(&mut input, &mut 0).is_err());
+    }
+
+    #[test]
+    fn open_compressed() {
+        let content = b"#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\n1\t10\t.\tA\tT\t.\tPASS\t.\n";
+        let dir = std::env::temp_dir();
+
+        let plain_path = dir.join("variantplaner_rs_open.vcf");
+        std::fs::write(&plain_path, content).unwrap();
+
+        let bgzf_path = dir.join("variantplaner_rs_open.vcf.bgz");
+        let mut data = crate::bgzf::tests::bgzf_block(&content[..20]);
+        data.extend(crate::bgzf::tests::bgzf_block(&content[20..]));
+        data.extend(crate::bgzf::tests::bgzf_block(b""));
+        std::fs::write(&bgzf_path, data).unwrap();
+
+        let gzip_path = dir.join("variantplaner_rs_open.vcf.gz");
+        let mut encoder = flate2::write::GzEncoder::new(Vec::new(), flate2::Compression::default());
+        std::io::Write::write_all(&mut encoder, content).unwrap();
+        std::fs::write(&gzip_path, encoder.finish().unwrap()).unwrap();
+
+        for path in [plain_path, bgzf_path, gzip_path] {
+            let mut result = Vec::new();
+            open(&path, 2).unwrap().read_to_end(&mut result).unwrap();
+            assert_eq!(result, content);
+
+            std::fs::remove_file(path).unwrap();
+        }
+    }
+
+    #[test]
+    fn add_info_struct_() {
+        let data = b"1\t10\t.\tA\tT\t.\tPASS\tDP=10;AF=0.5\tGT\t0/1
+2\t20\t.\tAC\tA\t.\tPASS\t.\tGT\t1/1
+";
+        let mut input = std::io::Cursor::new(&data[..]);
+        let definitions = info::InfoKwargs::new(vec![
+            ("DP".to_string(), "1".to_string(), "Integer".to_string()),
+            ("AF".to_string(), "A".to_string(), "Float".to_string()),
+        ]);
+
+        let df = read_batch(&mut input, &names(10), 10, &mut 0, None, None)
+            .unwrap()
+            .unwrap();
+        let df = add_info_struct(df, &definitions).unwrap();
+
+        assert_eq!(
+            df.get_column_names(),
+            vec!["chr", "pos", "vid", "ref", "alt", "qual", "filter", "info", "info_struct", "format", "sample"]
+        );
+        let info_struct = df.column(INFO_STRUCT_COLUMN).unwrap().struct_().unwrap();
+        assert_eq!(
+            info_struct.field_by_name("DP").unwrap().i64().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![Some(10), None]
+        );
+        assert_eq!(
+            info_struct.field_by_name("AF").unwrap().dtype(),
+            &DataType::List(Box::new(DataType::Float64))
+        );
+
+        let sites = read_batch(&mut std::io::Cursor::new(&b"1\t10\n"[..]), &names(2), 10, &mut 0, None, None)
+            .unwrap()
+            .unwrap();
+        assert_eq!(add_info_struct(sites, &definitions).unwrap().width(), 2);
+    }
+
+    #[test]
+    fn read_batch_bad_pos() {
+        let data = b"1\tten\t.\tA\tT\t.\tPASS\t.\n";
+        let mut input = std::io::Cursor::new(&data[..]);
+        let mut line_number = 0;
+
+        assert!(read_batch(&mut input, &names(8), 2, &mut line_number, None, None).is_err());
+    }
+
+    #[test]
+    fn check_record_() {
+        assert_eq!(check_record(b"1\t10\t.\tA\tT\t.\tPASS\t.", 8), None);
+        assert_eq!(
+            check_record(b"1\tten\t.\tA\tT\t.\tPASS\t.", 8).as_deref(),
+            Some("position 'ten' isn't an integer")
+        );
+        assert_eq!(
+            check_record(b"1\t\t.\tA\tT\t.\tPASS\t.", 8).as_deref(),
+            Some("position is empty")
+        );
+        assert_eq!(
+            check_record(b"\t10\t.\tA\tT\t.\tPASS\t.", 8).as_deref(),
+            Some("chromosome is empty")
+        );
+        assert_eq!(
+            check_record(b"1\t10\t.\tA\tT", 8).as_deref(),
+            Some("record is truncated, 8 fields expected")
+        );
+        assert_eq!(
+            check_record(b"1\t10\t.\tA\t\xff\t.\tPASS\t.", 8).as_deref(),
+            Some("record isn't valid utf-8")
+        );
+    }
+
+    #[test]
+    fn read_batch_quarantine() {
+        let data = b"1\t10\t.\tA\tT\t.\tPASS\t.
+1\tten\t.\tA\tT\t.\tPASS\t.
+1\t20\t.\tA\tT
+1\t30\t.\tG\tC\t.\tPASS\t.
+";
+        let path = std::env::temp_dir().join(format!("variantplaner_rs_quarantine_{}.tsv", std::process::id()));
+        let mut quarantine = Quarantine::create(&path).unwrap();
+        let mut input = std::io::Cursor::new(&data[..]);
+        let mut line_number = 0;
+
+        let df = read_batch(&mut input, &names(8), 10, &mut line_number, None, Some(&mut quarantine))
+            .unwrap()
+            .unwrap();
+        quarantine.flush().unwrap();
+
+        assert_eq!(
+            df.column("pos").unwrap().u64().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![Some(10), Some(30)]
+        );
+        assert_eq!(quarantine.count(), 2);
+        assert_eq!(
+            std::fs::read_to_string(&path).unwrap(),
+            "2\tposition 'ten' isn't an integer\t1\tten\t.\tA\tT\t.\tPASS\t.
+3\trecord is truncated, 8 fields expected\t1\t20\t.\tA\tT
+"
+        );
+
+        std::fs::remove_file(path).unwrap();
+    }
+
+    #[test]
+    fn read_batch_regions() {
+        let data = b"1\t10\t.\tA\tT\t.\tPASS\t.
+1\t18\t.\tACGT\tA\t.\tPASS\t.
+1\t30\t.\tG\tC\t.\tPASS\t.
+2\t20\t.\tG\tC\t.\tPASS\t.
+";
+        let mut input = std::io::Cursor::new(&data[..]);
+        let mut line_number = 0;
+        let regions = index::Regions::new(vec![("1".to_string(), 20, 29), ("2".to_string(), 20, 20)]);
+
+        let df = read_batch(&mut input, &names(8), 10, &mut line_number, Some(&regions), None)
+            .unwrap()
+            .unwrap();
+
+        assert_eq!(
+            df.column("pos").unwrap().u64().unwrap().into_iter().collect::<Vec<_>>(),
+            vec![Some(18), Some(20)]
+        );
+        assert_eq!(line_number, 4);
+    }
+}
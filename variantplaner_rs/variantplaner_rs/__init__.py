@@ -15,6 +15,40 @@ class VariantId:
             args=[self._expr, ref, alt, max_pos],
         )
 
+    def compute_contig(
+        self,
+        pos: polars.Expr,
+        ref: polars.Expr,
+        alt: polars.Expr,
+        offsets: dict[str, int],
+        max_pos: int,
+        *,
+        wide: bool = False,
+    ) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="compute_contig_wide" if wide else "compute_contig",
+            args=[self._expr, pos, ref, alt],
+            kwargs={
+                "contigs": list(offsets.keys()),
+                "offsets": list(offsets.values()),
+                "max_pos": max_pos,
+            },
+        )
+
+    def decode(self, offsets: dict[str, int], max_pos: int) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="decode",
+            args=[self._expr],
+            kwargs={
+                "contigs": list(offsets.keys()),
+                "offsets": list(offsets.values()),
+                "max_pos": max_pos,
+            },
+            is_elementwise=True,
+        )
+
     def partition(self, number_of_bits: int = 8) -> polars.Expr:
         return register_plugin_function(
             plugin_path=pathlib.Path(__file__).parent,
@@ -26,5 +60,94 @@ class VariantId:
         )
 
 
+@polars.api.register_expr_namespace("vcf_info")
+class VcfInfo:
+    def __init__(self, expr: polars.Expr):
+        self._expr = expr
+
+    def parse(self, names: list[str], numbers: list[str], types: list[str]) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="parse",
+            args=[self._expr],
+            kwargs={
+                "names": names,
+                "numbers": numbers,
+                "types": types,
+            },
+            is_elementwise=True,
+        )
+
+
+@polars.api.register_expr_namespace("vcf_format")
+class VcfFormat:
+    def __init__(self, expr: polars.Expr):
+        self._expr = expr
+
+    def index(self, keys: list[str]) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="index",
+            args=[self._expr],
+            kwargs={
+                "keys": keys,
+            },
+            is_elementwise=True,
+        )
+
+    def decode_gt(self) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="decode_gt",
+            args=[self._expr],
+            is_elementwise=True,
+        )
+
+    def encode_gt(self) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="encode_gt",
+            args=[self._expr],
+            is_elementwise=True,
+        )
+
+
+@polars.api.register_expr_namespace("vcf_reference")
+class VcfReference:
+    def __init__(self, expr: polars.Expr):
+        self._expr = expr
+
+    def left_align(self, pos: IntoExpr, ref: IntoExpr, alt: IntoExpr, fasta: pathlib.Path) -> polars.Expr:
+        return register_plugin_function(
+            plugin_path=pathlib.Path(__file__).parent,
+            function_name="left_align",
+            args=[self._expr, pos, ref, alt],
+            kwargs={
+                "fasta": str(fasta),
+            },
+            is_elementwise=True,
+        )
+
+
+def vcf_reader(
+    path: pathlib.Path,
+    column_names: list[str],
+    batch_size: int = 65_536,
+    threads: int = 1,
+    regions: list[tuple[str, int, int]] | None = None,
+    quarantine: pathlib.Path | None = None,
+):
+    from variantplaner_rs.variantplaner_rs import VcfReader
+
+    return VcfReader(
+        str(path),
+        column_names,
+        batch_size,
+        threads,
+        regions,
+        None if quarantine is None else str(quarantine),
+    )
+
+
 __version__: str = "0.5.0"
-__all__: list[str] = ["VariantId"]
+__all__: list[str] = ["VariantId", "VcfFormat", "VcfInfo", "VcfReference", "vcf_reader"]